@@ -0,0 +1,6 @@
+"""
+CA6003 Energy and CO2 Analysis Benchmarks
+Synthetic MER-format data and timing of the analysis pipeline.
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
@@ -0,0 +1,322 @@
+"""
+Benchmark Suite Module
+Time the pipeline on synthetic data and flag regressions.
+
+Each step (load, prepare, analyze, figures) is timed repeat times per size
+on data from synthetic.generate_dataset. With --startup, the time a fresh
+interpreter takes to import the modules of each main.py command is timed
+too (size "startup"). Results are appended to a JSON-lines history file and
+compared against a stored baseline; a step whose best time exceeds the
+baseline by more than the tolerance is flagged as a regression.
+
+Usage:
+    python -m benchmarks.suite [--sizes small medium] [--steps load prepare]
+                               [--granularity {annual,monthly}] [--repeat N]
+                               [--startup] [--save-baseline] [--tolerance 0.25]
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.data_loader import load_raw_data
+from src.data_preparation import prepare_full_dataset
+from src.analysis import run_full_analysis
+from src.visualization import generate_all_figures
+from .synthetic import BENCHMARK_SIZES, generate_dataset
+
+
+STEPS = ("load", "prepare", "analyze", "figures")
+DEFAULT_SIZES = ("small", "medium")
+
+BENCHMARK_DIR = Path(__file__).parent
+DATA_DIR = BENCHMARK_DIR / "data"
+HISTORY_FILE = BENCHMARK_DIR / "results" / "history.jsonl"
+BASELINE_FILE = BENCHMARK_DIR / "results" / "baseline.json"
+
+# Allowed slowdown of a step's best time relative to the baseline
+REGRESSION_TOLERANCE = 0.25
+
+# Modules main.py imports before running each command (see main.main)
+_PREPARE_IMPORTS = [
+    "main", "src.pipeline", "src.data_loader", "src.sources", "src.profiling",
+    "src.validation", "src.data_preparation", "src.incremental"
+]
+_ANALYZE_IMPORTS = _PREPARE_IMPORTS + ["src.analysis", "src.decomposition", "src.screening"]
+STARTUP_IMPORTS = {
+    "help": ["main"],
+    "prepare": _PREPARE_IMPORTS,
+    "analyze": _ANALYZE_IMPORTS,
+    "all": _ANALYZE_IMPORTS + ["src.visualization"]
+}
+
+# Everything the analysis and plots use, as main.py used to import at startup
+EAGER_IMPORTS = STARTUP_IMPORTS["all"] + ["scipy.stats", "sklearn.ensemble", "sklearn.tree", "seaborn"]
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> Tuple[Any, List[float]]:
+    """Call func repeat times; return the last result and the wall time of each call."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def run_benchmarks(
+    sizes: Sequence[str] = DEFAULT_SIZES,
+    steps: Sequence[str] = STEPS,
+    granularity: str = "annual",
+    repeat: int = 3,
+    data_dir: Path = DATA_DIR,
+    workers: int = 1
+) -> pd.DataFrame:
+    """
+    Time the pipeline steps on synthetic data of each size.
+
+    Steps that a selected step depends on are run once, untimed, when
+    they are not selected themselves.
+
+    Parameters
+    ----------
+    sizes : Sequence[str]
+        Keys of BENCHMARK_SIZES
+    steps : Sequence[str]
+        Steps to time (subset of STEPS)
+    granularity : str
+        "annual" or "monthly"
+    repeat : int
+        Timed calls per step
+    data_dir : Path
+        Directory for the generated data (one subdirectory per size)
+    workers : int
+        Processes for cross-validation and figure rendering
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per size and step with raw_rows, rows (of the step's
+        input), repeat, min_seconds and median_seconds
+    """
+    records: List[Dict[str, Any]] = []
+    for size in sizes:
+        raw_dir = Path(data_dir) / size
+        generate_dataset(raw_dir, **BENCHMARK_SIZES[size])
+
+        def record(step, rows, times):
+            records.append({
+                "size": size, "step": step, "raw_rows": raw_rows, "rows": rows, "repeat": len(times),
+                "min_seconds": min(times), "median_seconds": statistics.median(times)
+            })
+
+        with warnings.catch_warnings(), contextlib.redirect_stdout(io.StringIO()), \
+                tempfile.TemporaryDirectory() as figure_dir:
+            warnings.simplefilter("ignore")
+
+            (energy_df, co2_df), times = time_call(lambda: load_raw_data(str(raw_dir)), repeat if "load" in steps else 1)
+            raw_rows = len(energy_df) + len(co2_df)
+            if "load" in steps:
+                record("load", raw_rows, times)
+            if not set(steps) - {"load"}:
+                continue
+
+            df, times = time_call(lambda: prepare_full_dataset(energy_df, co2_df, granularity), repeat if "prepare" in steps else 1)
+            if "prepare" in steps:
+                record("prepare", raw_rows, times)
+
+            results = None
+            if "analyze" in steps or "figures" in steps:
+                results, times = time_call(
+                    lambda: run_full_analysis(df, granularity, workers=workers), repeat if "analyze" in steps else 1
+                )
+                if "analyze" in steps:
+                    record("analyze", len(df), times)
+
+            if "figures" in steps:
+                _, times = time_call(
+                    lambda: generate_all_figures(
+                        df, figure_dir, granularity, results=results, workers=workers, force=True
+                    ),
+                    repeat
+                )
+                record("figures", len(df), times)
+
+    return pd.DataFrame(records)
+
+
+def time_startup(repeat: int = 3) -> pd.DataFrame:
+    """
+    Time fresh interpreters importing the modules of each main.py command.
+
+    The "eager" row imports every heavy dependency up front, for comparison
+    with the lazily importing commands.
+
+    Parameters
+    ----------
+    repeat : int
+        Interpreter launches per command
+
+    Returns
+    -------
+    pd.DataFrame
+        Rows in the format of run_benchmarks, with size "startup" and the
+        command as step
+    """
+    project_dir = BENCHMARK_DIR.parent
+    records = []
+    for command, modules in {**STARTUP_IMPORTS, "eager": EAGER_IMPORTS}.items():
+        code = "; ".join(f"import {module}" for module in modules)
+        _, times = time_call(
+            lambda: subprocess.run([sys.executable, "-c", code], cwd=project_dir, check=True), repeat
+        )
+        records.append({
+            "size": "startup", "step": command, "raw_rows": 0, "rows": 0, "repeat": repeat,
+            "min_seconds": min(times), "median_seconds": statistics.median(times)
+        })
+    return pd.DataFrame(records)
+
+
+def environment_info() -> Dict[str, Any]:
+    """Commit, Python version and platform of the current run."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BENCHMARK_DIR, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform()}
+
+
+def append_history(results: pd.DataFrame, path: Path = HISTORY_FILE, info: Optional[Dict[str, Any]] = None) -> Path:
+    """Append one JSON line per result row, stamped with the run time and environment."""
+    stamp = {"timestamp": datetime.now().isoformat(timespec="seconds"), **(info or environment_info())}
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for record in results.to_dict(orient="records"):
+            f.write(json.dumps({**stamp, **record}) + "\n")
+    return path
+
+
+def load_history(path: Path = HISTORY_FILE) -> pd.DataFrame:
+    """Read the history file (empty frame if it does not exist)."""
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
+
+
+def save_baseline(results: pd.DataFrame, granularity: str, path: Path = BASELINE_FILE) -> Path:
+    """
+    Store the best time of each size and step as the baseline.
+
+    Entries of sizes and steps not in results are kept.
+    """
+    baseline = load_baseline(path)
+    if baseline.get("granularity") != granularity:
+        baseline = {"granularity": granularity, "steps": {}}
+    baseline.update(environment_info())
+    for record in results.to_dict(orient="records"):
+        baseline["steps"].setdefault(record["size"], {})[record["step"]] = record["min_seconds"]
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2))
+    return path
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Dict[str, Any]:
+    """Read the baseline (empty dict if it does not exist)."""
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def compare_to_baseline(
+    results: pd.DataFrame,
+    baseline: Dict[str, Any],
+    granularity: str,
+    tolerance: float = REGRESSION_TOLERANCE
+) -> pd.DataFrame:
+    """
+    Compare best times with the baseline.
+
+    Parameters
+    ----------
+    results : pd.DataFrame
+        Output of run_benchmarks
+    baseline : Dict[str, Any]
+        Output of load_baseline
+    granularity : str
+        Granularity of results; a baseline of another granularity is ignored
+    tolerance : float
+        Allowed relative slowdown
+
+    Returns
+    -------
+    pd.DataFrame
+        results with baseline_seconds, ratio (min_seconds / baseline) and
+        regression columns (baseline columns are NaN / False where the
+        baseline has no entry)
+    """
+    steps = baseline.get("steps", {}) if baseline.get("granularity") == granularity else {}
+    compared = results.copy()
+    compared["baseline_seconds"] = [
+        steps.get(size, {}).get(step, float("nan")) for size, step in zip(results["size"], results["step"])
+    ]
+    compared["ratio"] = compared["min_seconds"] / compared["baseline_seconds"]
+    compared["regression"] = compared["ratio"] > 1 + tolerance
+    return compared
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic MER data")
+    parser.add_argument("--sizes", nargs="+", choices=list(BENCHMARK_SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--steps", nargs="+", choices=STEPS, default=list(STEPS))
+    parser.add_argument("--granularity", choices=["annual", "monthly"], default="annual")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per step (default: 3)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--startup", action="store_true", help="Also time the imports of each main.py command")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help=f"Allowed slowdown against the baseline (default: {REGRESSION_TOLERANCE})")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run's times as the baseline")
+    parser.add_argument("--no-history", action="store_true", help="Do not append to the history file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.steps, args.granularity, args.repeat, workers=args.workers)
+    if args.startup:
+        results = pd.concat([results, time_startup(args.repeat)], ignore_index=True)
+    if not args.no_history:
+        append_history(results)
+
+    compared = compare_to_baseline(results, load_baseline(), args.granularity, args.tolerance)
+    columns = ["size", "step", "raw_rows", "rows", "min_seconds", "median_seconds", "baseline_seconds", "ratio"]
+    print(compared[columns].to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+    if args.save_baseline:
+        print(f"\nBaseline saved to {save_baseline(results, args.granularity)}")
+    elif compared["baseline_seconds"].isna().all():
+        print("\nNo baseline for these steps; run with --save-baseline to store one")
+
+    regressions = compared[compared["regression"]]
+    if len(regressions) and not args.save_baseline:
+        print(f"\nREGRESSIONS (slower than baseline by more than {args.tolerance:.0%}):")
+        for row in regressions.itertuples():
+            print(f"  {row.size}/{row.step}: {row.min_seconds:.4f}s vs {row.baseline_seconds:.4f}s ({row.ratio:.2f}x)")
+        sys.exit(1)
@@ -0,0 +1,255 @@
+"""
+Synthetic Data Module
+Generator of MER-format tables at configurable sizes.
+
+The generated MER_T01_01.csv and MER_T11_01.csv have the layout of the EIA
+files (MSN, YYYYMM, Value, Column_Order, Description, Unit) and contain
+every series the pipeline reads, with consistent relations between them
+(fossil + renewable + nuclear = total energy, per-fuel CO2 sums to total
+CO2 minus a small remainder, annual rows are the sums of their months).
+Size is scaled by adding filler series, earlier years and regions; a
+region is the two-letter suffix of an MSN ("US" is the national total).
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import csv
+import itertools
+import json
+import string
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Any, Union
+
+
+# Last year of generated data; every year has months 01-12 and annual code 13
+END_YEAR = 2024
+
+# Series the pipeline reads, by table: MSN stem -> description
+ENERGY_SERIES = {
+    "TETCB": "Total Primary Energy Consumption",
+    "FFTCB": "Total Fossil Fuels Consumption",
+    "RETCB": "Total Renewable Energy Consumption",
+    "NUETB": "Nuclear Electric Power Consumption"
+}
+CO2_SERIES = {
+    "TETCE": "Total Energy CO2 Emissions",
+    "CKTCE": "Coal, Including Coal Coke Net Imports, CO2 Emissions",
+    "NNTCE": "Natural Gas, Excluding Supplemental Gaseous Fuels, CO2 Emissions",
+    "PMTCE": "Petroleum, Excluding Biofuels, CO2 Emissions"
+}
+
+TABLE_UNITS = {
+    "MER_T01_01": "Quadrillion Btu",
+    "MER_T11_01": "Million Metric Tons of Carbon Dioxide"
+}
+
+# Share of filler values written as "Not Available"
+MISSING_RATE = 0.01
+
+# Generator parameters of the benchmark sizes
+BENCHMARK_SIZES: Dict[str, Dict[str, Any]] = {
+    # About the size of the bundled files
+    "small": {"msns": 16, "start_year": 1973, "regions": 1},
+    # Deeper history and a few regions
+    "medium": {"msns": 32, "start_year": 1950, "regions": 10},
+    # Century of monthly data across many regions (~200 MB per table)
+    "large": {"msns": 64, "start_year": 1900, "regions": 25}
+}
+
+
+def _logistic(years: np.ndarray, midpoint: float, scale: float) -> np.ndarray:
+    return 1 / (1 + np.exp(-(years - midpoint) / scale))
+
+
+def region_codes(regions: int) -> List[str]:
+    """Return "US" followed by regions - 1 synthetic two-letter region codes."""
+    others = ("".join(pair) for pair in itertools.product(string.ascii_uppercase, repeat=2))
+    return ["US"] + list(itertools.islice((code for code in others if code != "US"), regions - 1))
+
+
+def monthly_series(start_year: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Simulate the national monthly series of both tables.
+
+    Parameters
+    ----------
+    start_year : int
+        First year
+    rng : np.random.Generator
+        Random source
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        MSN stem -> (years x 12) monthly values
+    """
+    years = np.arange(start_year, END_YEAR + 1, dtype=np.float64)[:, None]
+    months = np.arange(12)[None, :]
+    shape = (len(years), 12)
+
+    # Energy: logistic growth with winter/summer peaks, nuclear and renewable ramps
+    seasonal = 1 + 0.08 * np.cos(2 * np.pi * months / 6)
+    total = (30 + 70 * _logistic(years, 1960, 15)) / 12 * seasonal * rng.normal(1, 0.01, shape)
+    nuclear = total * 0.09 * _logistic(years, 1980, 5) * rng.normal(1, 0.02, shape)
+    renewable = total * (0.04 + 0.05 * _logistic(years, 2012, 5)) * rng.normal(1, 0.03, shape)
+    fossil = total - nuclear - renewable
+
+    # CO2: declining carbon factor of fossil energy, coal giving way to gas
+    co2 = fossil * (75 - 10 * _logistic(years, 2008, 6)) * rng.normal(1, 0.005, shape)
+    coal_share = 0.35 - 0.2 * _logistic(years, 2010, 4)
+    gas_share = 0.2 + 0.15 * _logistic(years, 2010, 4)
+
+    return {
+        "TETCB": total,
+        "FFTCB": fossil,
+        "RETCB": renewable,
+        "NUETB": nuclear,
+        "TETCE": co2,
+        "CKTCE": co2 * coal_share,
+        "NNTCE": co2 * gas_share,
+        "PMTCE": co2 * (0.995 - coal_share - gas_share)
+    }
+
+
+def build_table(
+    name: str,
+    series: Dict[str, np.ndarray],
+    descriptions: Dict[str, str],
+    msns: int,
+    regions: int,
+    start_year: int,
+    rng: np.random.Generator
+) -> pd.DataFrame:
+    """
+    Assemble one MER table in long format.
+
+    Parameters
+    ----------
+    name : str
+        Table name (key of TABLE_UNITS)
+    series : Dict[str, np.ndarray]
+        MSN stem -> (years x 12) national monthly values
+    descriptions : Dict[str, str]
+        MSN stem -> description of the series in this table
+    msns : int
+        Series stems in the table; stems beyond the required ones are
+        random-walk fillers with some "Not Available" values
+    regions : int
+        Number of regions (each stem appears once per region)
+    start_year : int
+        First year
+    rng : np.random.Generator
+        Random source
+
+    Returns
+    -------
+    pd.DataFrame
+        MSN, YYYYMM, Value, Column_Order, Description, Unit (Value is NaN
+        where "Not Available" is written)
+    """
+    stems = list(descriptions)
+    n_years = END_YEAR - start_year + 1
+    monthly = np.stack([series[stem] for stem in stems])
+
+    fillers = max(msns - len(stems), 0)
+    if fillers:
+        walks = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, (fillers, n_years * 12)), axis=1))
+        filler_values = walks.reshape(fillers, n_years, 12)
+        filler_values[rng.random(filler_values.shape) < MISSING_RATE] = np.nan
+        monthly = np.concatenate([monthly, filler_values])
+        stems += [f"S{i:04d}" for i in range(fillers)]
+        descriptions = {**descriptions, **{stem: f"Synthetic Series {stem[1:]}" for stem in stems[-fillers:]}}
+
+    # Append the annual total as month code 13 (missing if any month is missing)
+    values = np.concatenate([monthly, monthly.sum(axis=2, keepdims=True)], axis=2)
+    codes = (np.arange(start_year, END_YEAR + 1)[:, None] * 100 + np.arange(1, 14)[None, :]).ravel()
+
+    # Other regions are scaled-down, noisier copies of the national series
+    codes_per_stem = len(codes)
+    scales = np.concatenate([[1.0], rng.uniform(0.005, 0.05, regions - 1)])
+    region_values = scales[:, None, None] * values.reshape(len(stems), codes_per_stem)[None]
+    region_values[1:] *= rng.normal(1, 0.02, region_values[1:].shape)
+
+    msn_names = [stem + region for region in region_codes(regions) for stem in stems]
+    rows_per_msn = np.full(len(msn_names), codes_per_stem)
+    column_order = np.tile(np.arange(1, len(stems) + 1), regions)
+    return pd.DataFrame({
+        "MSN": np.repeat(msn_names, rows_per_msn),
+        "YYYYMM": np.tile(codes, len(msn_names)),
+        "Value": region_values.ravel().round(6),
+        "Column_Order": np.repeat(column_order, rows_per_msn),
+        "Description": np.repeat([descriptions[msn[:5]] for msn in msn_names], rows_per_msn),
+        "Unit": TABLE_UNITS[name]
+    })
+
+
+def generate_dataset(
+    output_dir: Union[str, Path],
+    msns: int = 16,
+    start_year: int = 1973,
+    regions: int = 1,
+    seed: int = 0
+) -> Dict[str, Path]:
+    """
+    Write synthetic MER_T01_01.csv and MER_T11_01.csv.
+
+    The files are only rewritten when the parameters differ from those of
+    the files already in output_dir (recorded in params.json).
+
+    Parameters
+    ----------
+    output_dir : Union[str, Path]
+        Directory for the generated files
+    msns : int
+        Series stems per table (at least the 4 the pipeline reads)
+    start_year : int
+        First year of monthly and annual data
+    regions : int
+        Number of regions per series
+    seed : int
+        Random seed
+
+    Returns
+    -------
+    Dict[str, Path]
+        Table name -> path of the generated file
+
+    Example
+    -------
+    >>> generate_dataset("benchmarks/data/medium", **BENCHMARK_SIZES["medium"])
+    """
+    output_dir = Path(output_dir)
+    params = {"msns": msns, "start_year": start_year, "end_year": END_YEAR, "regions": regions, "seed": seed}
+    paths = {name: output_dir / f"{name}.csv" for name in TABLE_UNITS}
+
+    params_path = output_dir / "params.json"
+    if params_path.exists() and json.loads(params_path.read_text()) == params and all(p.exists() for p in paths.values()):
+        return paths
+
+    rng = np.random.default_rng(seed)
+    series = monthly_series(start_year, rng)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, descriptions in (("MER_T01_01", ENERGY_SERIES), ("MER_T11_01", CO2_SERIES)):
+        table = build_table(name, series, descriptions, msns, regions, start_year, rng)
+        table.to_csv(
+            paths[name], index=False, quoting=csv.QUOTE_ALL,
+            float_format="%.6f", na_rep="Not Available"
+        )
+    params_path.write_text(json.dumps(params))
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic MER-format tables")
+    parser.add_argument("--size", choices=list(BENCHMARK_SIZES), default="small")
+    parser.add_argument("--output-dir", default=None, help="Default: benchmarks/data/<size>")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_dataset(args.output_dir or f"benchmarks/data/{args.size}", seed=args.seed, **BENCHMARK_SIZES[args.size])
+    for name, path in paths.items():
+        print(f"{name}: {path} ({path.stat().st_size / 2 ** 20:.1f} MB)")
@@ -9,20 +9,47 @@ Course: CA6003 - Best Practices in Data Governance, Preparation and Analytics
 Institution: Nanyang Technological University (NTU)
 
 Usage:
-    python main.py [--output-dir OUTPUT_DIR]
+    python main.py [{load,prepare,analyze,plot,all}] [--output-dir OUTPUT_DIR] [--cache-dir CACHE_DIR]
+                   [--rebuild-cache] [--granularity {annual,monthly}] [--incremental] [--dpi DPI]
+                   [--explain] [--workers WORKERS] [--screen] [--trace TRACE]
+                   [--chrome-trace CHROME_TRACE]
+
+Each command runs the pipeline up to its step (earlier steps are reused from
+the stage cache) and imports only the modules those steps need; "all" (the
+default) also prints the summary and saves the incremental state.
 """
 
 import argparse
+import math
 import sys
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.data_loader import load_raw_data, profile_data
-from src.data_preparation import prepare_full_dataset
-from src.visualization import generate_all_figures, set_plot_style, plot_final_summary
-from src.analysis import run_full_analysis, train_linear_regression
+# Pipeline modules are imported by the steps that use them (see main), so
+# "--help" and data-only commands do not load scikit-learn or matplotlib
+from src import instrumentation
+
+
+# Commands in pipeline order; each runs every step up to its own
+COMMANDS = ["load", "prepare", "analyze", "plot", "all"]
+
+# Figures written by the visualize stage
+FIGURE_STEMS = [
+    "fig1_energy_structure",
+    "fig2_co2_intensity_trend",
+    "fig3_energy_vs_co2",
+    "fig4_correlation_matrix",
+    "fig5_scatter_shares_vs_intensity",
+    "fig6_distributions",
+    "fig7_outliers",
+    "fig8_decision_tree",
+    "fig9_model_comparison",
+    "fig10_actual_vs_predicted",
+    "fig11_residual_analysis",
+    "fig12_final_summary"
+]
 
 
 def print_header():
@@ -36,15 +63,75 @@ def print_header():
     print("=" * 70)
 
 
-def main(output_dir: str = "outputs"):
+def period_label(df, row: int, granularity: str) -> str:
+    """Format the period of a dataset row as YYYY or YYYY-MM."""
+    if granularity == "monthly":
+        return f"{df['Year'].iloc[row]}-{df['Month'].iloc[row]:02d}"
+    return str(df["Year"].iloc[row])
+
+
+def print_stage_cache(runner):
+    """Print which stages hit or missed the cache."""
+    print("\n" + "-" * 50)
+    print("STAGE CACHE")
+    print("-" * 50)
+    print(runner.explain())
+
+
+def main(
+    output_dir: str = "outputs",
+    cache_dir: str = "data/cache",
+    rebuild_cache: bool = False,
+    granularity: str = "annual",
+    incremental: bool = False,
+    dpi: int = 150,
+    explain: bool = False,
+    workers: int = 1,
+    screen: bool = False,
+    command: str = "all",
+    n_replicates: int = 10_000,
+    cross_validate: bool = True
+):
     """
-    Run the complete analysis pipeline.
+    Run the analysis pipeline up to the step of the given command.
+
+    Each step runs as a cached stage (see src.pipeline.StageRunner): a step
+    is re-run only when its inputs or parameters changed.
 
     Parameters
     ----------
     output_dir : str
         Directory for output files
+    cache_dir : str
+        Directory for the parsed raw data and stage caches
+    rebuild_cache : bool
+        Re-parse the raw CSV files and re-run every stage
+    granularity : str
+        "annual" (one row per year) or "monthly" (one row per month)
+    incremental : bool
+        Recompute only the periods changed since the last incremental run,
+        and stop early if nothing changed
+    dpi : int
+        Resolution of the saved figures
+    explain : bool
+        Print which stages hit or missed the cache
+    workers : int
+        Number of processes for figure rendering and the cross-validation sweep
+    screen : bool
+        Also rank every MSN series, share and intensity against CO2 intensity
+    command : str
+        Last step to run: "load", "prepare", "analyze", "plot" or "all"
+        (plot plus the summary and the incremental state)
+    n_replicates : int
+        Bootstrap and permutation replicates for the confidence intervals
+        (0 skips them)
+    cross_validate : bool
+        Run the walk-forward cross-validation sweep
     """
+    from src.data_loader import file_fingerprint
+    from src.pipeline import StageRunner
+    from src.sources import source_files, load_sources
+
     print_header()
 
     # Create output directories
@@ -55,39 +142,154 @@ def main(output_dir: str = "outputs"):
     figures_path.mkdir(parents=True, exist_ok=True)
     data_path.mkdir(parents=True, exist_ok=True)
 
+    runner = StageRunner(str(Path(cache_dir) / "stages"), force=rebuild_cache)
+    raw_files = source_files("data/raw")
+
+    def finish_early():
+        if explain:
+            print_stage_cache(runner)
+        print(f"\nDone: ran the pipeline through the {command} step")
+        return 0
+
     # Step 1: Load Data
     print("\n[1/5] Loading raw data...")
     try:
-        energy_df, co2_df = load_raw_data("data/raw")
+        # rebuild_cache only forces re-parsing, which does not change the output
+        def load_stage(sources, data_dir, cache_dir):
+            return load_sources(data_dir, cache_dir=cache_dir, rebuild_cache=rebuild_cache)
+
+        tables = runner.run(
+            "load", load_stage,
+            params={
+                "sources": {name: file_fingerprint(path) for name, path in raw_files.items()},
+                "data_dir": "data/raw",
+                "cache_dir": cache_dir
+            }
+        )
+        energy_df, co2_df = tables["MER_T01_01"], tables["MER_T11_01"]
         print(f"  Energy data: {energy_df.shape}")
         print(f"  CO2 data: {co2_df.shape}")
+        for name in [name for name in tables if name not in ("MER_T01_01", "MER_T11_01")]:
+            print(f"  {name}: {tables[name].shape}")
     except FileNotFoundError as e:
         print(f"  ERROR: Data files not found. Please ensure data/raw/ contains:")
-        print("    - MER_T01_01.csv (Energy data)")
-        print("    - MER_T11_01.csv (CO2 data)")
+        for path in raw_files.values():
+            print(f"    - {path.name}")
         return 1
 
+    if command == "load":
+        return finish_early()
+
+    from src.profiling import profile_sources, check_quality, write_report
+    from src.validation import validate_dataset
+    from src.data_preparation import prepare_full_dataset
+    from src.incremental import load_state, save_state, build_state, incremental_refresh
+    from src.sources import build_source_dataset, source_coverage
+
+    state_dir = str(Path(cache_dir) / "incremental" / granularity)
+    refresh = None
+    if incremental:
+        state = load_state(state_dir)
+        if state is None:
+            print("  No previous incremental state: running a full refresh")
+        else:
+            try:
+                refresh = incremental_refresh(state, tables, granularity)
+            except ValueError as e:
+                print(f"  {e}: running a full refresh")
+        if refresh is not None and not refresh["changed"]:
+            print("  No changes since last run: skipping profiling, preparation, analysis and figures")
+            return 0
+
     # Step 2: Profile Data
     print("\n[2/5] Profiling raw data...")
-    energy_profile = profile_data(energy_df, "Energy")
-    co2_profile = profile_data(co2_df, "CO2")
-    print(f"  Energy data issues found: {energy_profile.get('not_available_count', 0)} 'Not Available' values")
-    print(f"  CO2 data issues found: {co2_profile.get('not_available_count', 0)} 'Not Available' values")
-    print(f"  Mixed granularity: {energy_profile.get('has_mixed_granularity', False)}")
+    profiles = runner.run("profile", profile_sources, inputs={"tables": tables})
+    gate = check_quality(profiles)
+    quality_path = write_report(profiles, gate, output_path / "data_quality.json")
+    for name, profile in profiles.items():
+        sentinels = sum(profile["value"]["sentinels"].values())
+        print(f"  {name}: {sentinels} sentinel values, {profile['value']['coercion_failures']} unparseable, "
+              f"{profile['conflicting_keys']} conflicting keys, {profile['missing_periods']} missing periods")
+    print(f"  Mixed granularity: {profiles['MER_T01_01']['periods']['has_mixed_granularity']}")
+    print(f"  Saved: {quality_path}")
+    if not gate["passed"]:
+        print("  ERROR: Data quality gate failed:")
+        for failure in gate["failures"]:
+            print(f"    - {failure['table']}: {failure['check']} = {failure['value']} (limit {failure['threshold']})")
+        return 1
 
     # Step 3: Prepare Data
     print("\n[3/5] Preparing data...")
-    df = prepare_full_dataset(energy_df, co2_df)
-    print(f"  Clean dataset: {df.shape[0]} years ({df['Year'].min()}-{df['Year'].max()})")
+
+    def prepare_stage(tables, refreshed, granularity):
+        if refreshed is not None:
+            return refreshed
+        return prepare_full_dataset(tables["MER_T01_01"], tables["MER_T11_01"], granularity=granularity)
+
+    if refresh is not None:
+        print(f"  Recomputed {len(refresh['periods'])} changed periods")
+    df = runner.run(
+        "prepare", prepare_stage,
+        inputs={"tables": tables, "refreshed": refresh["df"] if refresh is not None else None},
+        params={"granularity": granularity}
+    )
+    unit = "months" if granularity == "monthly" else "years"
+    time_col = "Period" if granularity == "monthly" else "Year"
+    print(f"  Clean dataset: {df.shape[0]} {unit} ({df['Year'].min()}-{df['Year'].max()})")
+
+    validation = validate_dataset(df)
+    checked = validation["table"][validation["table"]["status"] != "skipped"]
+    print(f"  Validation: {(checked['status'] == 'pass').sum()}/{len(checked)} rules passed")
+    for row in checked[checked["status"] != "pass"].itertuples():
+        print(f"    {row.status.upper()}: {row.rule} ({row.failures} rows) - {row.description}")
+        print("      " + validation["samples"][row.rule].to_string(index=False).replace("\n", "\n      "))
+    if not validation["passed"]:
+        print("  ERROR: Prepared data failed validation; not saving or analysing it")
+        return 1
 
     # Save clean data
-    clean_data_path = data_path / "clean_energy_co2_data.csv"
+    if granularity == "monthly":
+        clean_data_path = data_path / "clean_energy_co2_monthly.csv"
+    else:
+        clean_data_path = data_path / "clean_energy_co2_data.csv"
     df.to_csv(clean_data_path, index=False)
     print(f"  Saved: {clean_data_path}")
 
+    merged = runner.run(
+        "merge_sources",
+        lambda tables, granularity: build_source_dataset(tables, granularity),
+        inputs={"tables": tables},
+        params={"granularity": granularity}
+    )
+    # Wide dataset of every registered source, saved next to the clean data
+    merged_path = data_path / f"merged_sources_{'monthly' if granularity == 'monthly' else 'annual'}.csv"
+    merged.to_csv(merged_path, index=False)
+    print(f"  Merged sources: {merged.shape[0]} {unit}, {merged.shape[1]} columns")
+    print(f"  Saved: {merged_path}")
+    for row in source_coverage(merged, granularity).itertuples():
+        print(f"    {row.source}: {row.variables} series, {row.n} {unit} ({row.first}-{row.last})")
+
+    if command == "prepare":
+        return finish_early()
+
+    from src.analysis import run_full_analysis
+    from src.decomposition import build_decomposition_dataset, decompose_co2, summarize_decomposition
+    from src.data_preparation import compute_fuel_emission_factors, FuelFactorLookup
+
     # Step 4: Run Analysis
     print("\n[4/5] Running analysis...")
-    results = run_full_analysis(df)
+    results = runner.run(
+        "analyze",
+        lambda df, ols_statistics, granularity, workers, cv_cache_dir, n_replicates, cross_validate: run_full_analysis(
+            df, granularity=granularity, ols_statistics=ols_statistics, workers=workers,
+            cv_cache_dir=cv_cache_dir, n_replicates=n_replicates, cross_validate=cross_validate
+        ),
+        inputs={"df": df, "ols_statistics": refresh["ols_statistics"] if refresh is not None else None},
+        params={
+            "granularity": granularity, "workers": workers, "cv_cache_dir": str(Path(cache_dir) / "cv"),
+            "n_replicates": n_replicates, "cross_validate": cross_validate
+        }
+    )
 
     print("\n" + "-" * 50)
     print("CORRELATION ANALYSIS")
@@ -96,44 +298,173 @@ def main(output_dir: str = "outputs"):
         sig = "***" if corr_data["p_value"] < 0.001 else "**" if corr_data["p_value"] < 0.01 else "*" if corr_data["p_value"] < 0.05 else ""
         print(f"  {var}: r = {corr_data['correlation']:+.3f} {sig}")
 
+    collinearity = results["multicollinearity"]
+    print("\n" + "-" * 50)
+    print("MULTICOLLINEARITY")
+    print("-" * 50)
+    for row in collinearity["vif"].itertuples():
+        print(f"  {row.variable}: VIF = {row.vif:.1f}{' (redundant)' if row.redundant else ''}")
+    print(f"  Condition number: {collinearity['condition_number']:.1f}")
+    for dependency in collinearity["dependencies"]:
+        print(f"  Near-dependency (condition index {dependency['condition_index']:.1f}): "
+              f"{', '.join(dependency['variables'])}")
+    dropped = results["feature_selection"]["dropped"]
+    print(f"  Model features: {', '.join(results['features'])}"
+          f"{' (dropped ' + ', '.join(item['variable'] for item in dropped) + ')' if dropped else ''}")
+
     print("\n" + "-" * 50)
     print("MODEL PERFORMANCE")
     print("-" * 50)
     print(f"  Full Data Linear Regression: R² = {results['full_model']['metrics']['r2']:.4f}")
     print(f"  Decision Tree: R² = {results['decision_tree']['metrics']['r2']:.4f}")
     print(f"  Time-Split Test: R² = {results['time_split']['r2']:.4f}")
+    rolling = results["rolling_regression"]
+    print(f"  Rolling {rolling['n'].iloc[-1]}-{unit.rstrip('s')} window: R² = {rolling['r2'].min():.4f} to {rolling['r2'].max():.4f}")
+
+    breaks = results["structural_breaks"]
+    break_labels = [period_label(df, row, granularity) for row in breaks["break_rows"]]
 
-    if results["time_split"]["structural_break"]:
+    # Verdict of the Bai-Perron scan (number of breaks chosen by BIC)
+    if breaks["bai_perron"]["n_breaks"] > 0:
+        regimes = [0] + breaks["break_rows"]
+        previous, latest = regimes[-2], regimes[-1]
         print("\n  ** STRUCTURAL BREAK DETECTED **")
-        print(f"  Training mean: {results['time_split']['train_mean']:.2f}")
-        print(f"  Test mean: {results['time_split']['test_mean']:.2f}")
-        print("  CO2 intensity declined faster than model predicted after 2014")
+        print(f"  Bai-Perron breaks (BIC): {', '.join(break_labels)}")
+        print(f"  Mean CO2 intensity {period_label(df, previous, granularity)} to {break_labels[-1]}: "
+              f"{df['CO2Intensity'].iloc[previous:latest].mean():.2f}")
+        print(f"  Mean CO2 intensity since {break_labels[-1]}: {df['CO2Intensity'].iloc[latest:].mean():.2f}")
+
+    intervals = results["confidence_intervals"]
+    if intervals is not None:
+        print("\n" + "-" * 50)
+        print(f"95% BLOCK-BOOTSTRAP INTERVALS ({intervals['n_replicates'].iloc[0]} replicates)")
+        print("-" * 50)
+        for row in intervals.itertuples():
+            p_value = "" if math.isnan(row.perm_p_value) else f", permutation p = {row.perm_p_value:.4f}"
+            print(f"  {row.statistic} {row.term}: {row.estimate:+.3f} [{row.ci_lower:+.3f}, {row.ci_upper:+.3f}]{p_value}")
+
+    if results["cross_validation"] is not None:
+        print("\n" + "-" * 50)
+        print("WALK-FORWARD CROSS-VALIDATION (top 3 by RMSE)")
+        print("-" * 50)
+        for row in results["cross_validation"]["summary"].head(3).itertuples():
+            print(f"  {row.family} {row.params}: RMSE = {row.rmse:.3f}, fit time = {row.fit_seconds * 1000:.1f} ms")
+
+    print("\n" + "-" * 50)
+    print("STRUCTURAL BREAKS")
+    print("-" * 50)
+    chow_label = period_label(df, breaks["chow"]["break_row"], granularity)
+    print(f"  Chow sup-F: {breaks['chow']['sup_f']:.2f} at {chow_label}")
+    print(f"  CUSUM boundary crossed: {breaks['cusum']['crossed']}")
+    print(f"  Bai-Perron breaks (BIC): {', '.join(break_labels) if break_labels else 'none'}")
 
     print("\n" + "-" * 50)
     print("MODEL INTERPRETATION")
     print("-" * 50)
     for var, coef in results["full_model"]["coefficients"].items():
-        print(f"  1% increase in {var} -> {coef:+.3f} change in CO2 Intensity")
+        if var.endswith("Share"):
+            print(f"  1% increase in {var} -> {coef:+.3f} change in CO2 Intensity")
+
+    decomposition = runner.run(
+        "decompose",
+        lambda tables, granularity: decompose_co2(
+            build_decomposition_dataset(list(tables.values()), granularity),
+            granularity, lag=12 if granularity == "monthly" else 1
+        ),
+        inputs={"tables": tables},
+        params={"granularity": granularity}
+    )
+    totals = summarize_decomposition(decomposition)
+    first_period, last_period = period_label(df, 0, granularity), period_label(df, len(df) - 1, granularity)
+    print("\n" + "-" * 50)
+    print(f"LMDI DECOMPOSITION OF TotalCO2 CHANGE ({first_period} -> {last_period})")
+    print("-" * 50)
+    print(f"  Total change: {totals['delta_co2']:+.1f} MMT CO2")
+    print(f"  Activity (total energy): {totals['activity']:+.1f}")
+    print(f"  Structure (fossil share): {totals['structure']:+.1f}")
+    print(f"  Carbon factor (fuel mix): {totals['carbon_factor']:+.1f}")
+
+    factors = runner.run(
+        "fuel_factors",
+        lambda tables, granularity: compute_fuel_emission_factors(
+            tables["MER_T01_01"], tables["MER_T11_01"], granularity
+        ),
+        inputs={"tables": tables},
+        params={"granularity": granularity}
+    )
+    lookup = FuelFactorLookup(factors)
+    latest = lookup.periods[-1]
+    print("\n" + "-" * 50)
+    print(f"FUEL EMISSION FACTORS ({latest}, kg CO2 per MMBtu of fossil energy)")
+    print("-" * 50)
+    for fuel in lookup.fuels:
+        print(f"  {fuel}: {lookup.get(fuel, latest):.2f} "
+              f"(intensity {lookup.get(fuel, latest, 'Intensity'):.2f} per unit of total energy)")
+
+    if screen:
+        from src.screening import screen_panel
+        from src.sources import RAW_SOURCES
+
+        screening = runner.run(
+            "screen",
+            lambda tables, granularity, sources: screen_panel([tables[name] for name in sources], granularity),
+            inputs={"tables": tables},
+            params={
+                "granularity": granularity,
+                "sources": [name for name, source in RAW_SOURCES.items() if source["format"] == "mer_csv"]
+            }
+        )
+        suffix = "_monthly" if granularity == "monthly" else ""
+        screening_path = output_path / f"msn_screening{suffix}.csv"
+        screening.to_csv(screening_path, index=False)
+
+        print("\n" + "-" * 50)
+        print(f"MSN SCREENING (top 5 of {len(screening)} candidates)")
+        print("-" * 50)
+        for row in screening.head(5).itertuples():
+            print(f"  {row.candidate} ({row.kind}): r = {row.pearson:+.3f}, Spearman = {row.spearman:+.3f}")
+        print(f"  Saved: {screening_path}")
+
+    if command == "analyze":
+        return finish_early()
+
+    from src.visualization import generate_all_figures, figure_filename
 
     # Step 5: Generate Visualizations
     print("\n[5/5] Generating visualizations...")
-    set_plot_style()
-    generate_all_figures(df, str(figures_path))
 
-    # Generate final summary figure
-    X = df[["FossilShare", "RenewableShare"]]
-    y = df["CO2Intensity"]
-    model, y_pred, _ = train_linear_regression(X, y)
-    plot_final_summary(df, y_pred, results["full_model"]["metrics"]["r2"],
-                       str(figures_path / "fig12_final_summary.png"))
-    print("  fig12_final_summary.png")
+    # rebuild_cache only forces re-rendering, which does not change the output
+    def visualize_stage(df, results, granularity, dpi, figures_dir, workers):
+        return generate_all_figures(
+            df, figures_dir, granularity=granularity, dpi=dpi, results=results,
+            workers=workers, force=rebuild_cache
+        )
+
+    figure_files = [figures_path / figure_filename(stem, granularity) for stem in FIGURE_STEMS]
+    runner.run(
+        "visualize", visualize_stage,
+        inputs={"df": df, "results": results},
+        params={"granularity": granularity, "dpi": dpi, "figures_dir": str(figures_path), "workers": workers},
+        outputs_exist=[str(path) for path in figure_files]
+    )
+    if runner.log[-1]["status"] == "hit":
+        print("  Figures up to date")
+
+    if command == "plot":
+        return finish_early()
+
+    if incremental:
+        save_state(state_dir, refresh["state"] if refresh is not None else build_state(tables, df, granularity))
+
+    if explain:
+        print_stage_cache(runner)
 
     # Print summary
     print("\n" + "=" * 70)
     print("ANALYSIS COMPLETE")
     print("=" * 70)
     print(f"\nKey Results:")
-    print(f"  - Analysis Period: 1973-2024 ({len(df)} years)")
+    print(f"  - Analysis Period: {df['Year'].min()}-{df['Year'].max()} ({len(df)} {unit})")
     print(f"  - Fossil Share Change: {df['FossilShare'].iloc[0]:.1f}% -> {df['FossilShare'].iloc[-1]:.1f}%")
     print(f"  - Renewable Share Change: {df['RenewableShare'].iloc[0]:.1f}% -> {df['RenewableShare'].iloc[-1]:.1f}%")
     print(f"  - CO2 Intensity Change: {((df['CO2Intensity'].iloc[-1] / df['CO2Intensity'].iloc[0]) - 1) * 100:.1f}%")
@@ -154,11 +485,99 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="CA6003 Energy and CO2 Analysis"
     )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=COMMANDS,
+        default="all",
+        help="Run the pipeline up to this step (default: all)"
+    )
     parser.add_argument(
         "--output-dir",
         default="outputs",
         help="Directory for output files (default: outputs)"
     )
+    parser.add_argument(
+        "--cache-dir",
+        default="data/cache",
+        help="Directory for cached parsed raw data (default: data/cache)"
+    )
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Ignore cached raw tables and stage outputs and re-run everything"
+    )
+    parser.add_argument(
+        "--granularity",
+        choices=["annual", "monthly"],
+        default="annual",
+        help="Analyse annual totals or the monthly series (default: annual)"
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Recompute only periods changed since the last incremental run"
+    )
+
+    parser.add_argument(
+        "--dpi",
+        type=int,
+        default=150,
+        help="Resolution of saved figures (default: 150)"
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Show which pipeline stages hit or missed the cache"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes for figures and cross-validation (default: 1)"
+    )
+    parser.add_argument(
+        "--replicates",
+        type=int,
+        default=10_000,
+        help="Bootstrap/permutation replicates for the confidence intervals; 0 skips them (default: 10000)"
+    )
+    parser.add_argument(
+        "--no-cv",
+        action="store_true",
+        help="Skip the walk-forward cross-validation sweep"
+    )
+    parser.add_argument(
+        "--screen",
+        action="store_true",
+        help="Rank every MSN series, share and intensity against CO2 intensity"
+    )
+
+    parser.add_argument(
+        "--trace",
+        help="Write per-stage time, memory and shape records as JSON lines to this file"
+    )
+    parser.add_argument(
+        "--chrome-trace",
+        help="Write the stage records in Chrome trace format (chrome://tracing, Perfetto)"
+    )
 
     args = parser.parse_args()
-    sys.exit(main(args.output_dir))
+    if args.trace or args.chrome_trace:
+        instrumentation.enable()
+    code = main(
+        args.output_dir, args.cache_dir, args.rebuild_cache, args.granularity,
+        args.incremental, args.dpi, args.explain, args.workers, args.screen, args.command,
+        args.replicates, not args.no_cv
+    )
+    recorder = instrumentation.disable()
+    if recorder is not None:
+        if args.trace:
+            instrumentation.write_jsonl(recorder.records, args.trace)
+        if args.chrome_trace:
+            instrumentation.write_chrome_trace(recorder.records, args.chrome_trace)
+        print("\nStage timings:")
+        print(instrumentation.summarize(recorder.records))
+    sys.exit(code)
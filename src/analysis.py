@@ -2,27 +2,170 @@
 Analysis Module
 Statistical analysis and machine learning models.
 
+Usage:
+    python -m src.analysis
+
 Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
 """
 
+import warnings
 import pandas as pd
 import numpy as np
-from scipy import stats
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
-from sklearn.preprocessing import StandardScaler
-from typing import Dict, List, Tuple, Any
+from typing import TYPE_CHECKING, Dict, List, Tuple, Any, Optional
+
+from .regression import (
+    solve_sufficient_statistics,
+    fit_ols_batch,
+    best_subsets,
+    window_regression
+)
+from .structural_breaks import detect_structural_breaks
+from .model_selection import cross_validate_models, QUICK_SEARCH_SPACE
+from .resampling import resampling_intervals
+from .instrumentation import span
+
+# scipy and scikit-learn are imported by the functions that use them, so
+# importing this module (e.g. for the incremental refresh) stays cheap
+if TYPE_CHECKING:
+    from sklearn.tree import DecisionTreeRegressor
+
+
+# Rolling regression window length (rows) per granularity
+ROLLING_WINDOWS = {"annual": 10, "monthly": 120}
+
+
+# Correlation methods supported by correlation_matrix
+CORRELATION_METHODS = ("pearson", "spearman")
+
+# Share variables correlated with the target; they sum to ~100%
+SHARE_VARIABLES = ["FossilShare", "RenewableShare", "NuclearShare"]
+
+# Variance inflation factor above which a predictor is redundant
+VIF_THRESHOLD = 10.0
+
+# Condition index above which a near-dependency is reported (Belsley, Kuh and Welsch, 1980)
+CONDITION_INDEX_THRESHOLD = 30.0
+
+# Eigenvalues and residual variances below this (relative) size count as zero
+COLLINEARITY_TOLERANCE = 1e-10
+
+
+def correlation_matrix(
+    X: pd.DataFrame,
+    Y: pd.DataFrame,
+    method: str = "pearson"
+) -> Dict[str, np.ndarray]:
+    """
+    Correlate every column of X with every column of Y in one pass.
+
+    Columns are centred and scaled once; the pairwise sums needed for each
+    (x, y) pair are then obtained from a handful of matrix products over the
+    non-missing masks, so missing values are excluded pair by pair.
+    P-values come from the t-distribution with n - 2 degrees of freedom.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Predictor columns
+    Y : pd.DataFrame
+        Target columns (same rows as X)
+    method : str
+        "pearson" or "spearman"; Spearman ranks each column once over its
+        non-missing values
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Predictor x target arrays of correlation (r), pair counts (n) and
+        two-sided p-values (p_value)
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method: {method}")
+
+    if method == "spearman":
+        X, Y = X.rank(), Y.rank()
+
+    def standardize(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        values = frame.to_numpy(dtype=np.float64)
+        mask = ~np.isnan(values)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = (values - np.nanmean(values, axis=0)) / np.nanstd(values, axis=0)
+        return np.where(mask, values, 0.0), mask.astype(np.float64)
+
+    x, x_mask = standardize(X)
+    y, y_mask = standardize(Y)
+
+    # Pairwise counts, sums and sums of squares restricted to rows where both are present
+    n = x_mask.T @ y_mask
+    sum_x = x.T @ y_mask
+    sum_y = x_mask.T @ y
+    sum_xx = (x * x).T @ y_mask
+    sum_yy = x_mask.T @ (y * y)
+    sum_xy = x.T @ y
+
+    from scipy import stats
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (n * sum_xy - sum_x * sum_y) / np.sqrt((n * sum_xx - sum_x ** 2) * (n * sum_yy - sum_y ** 2))
+        r = np.clip(r, -1.0, 1.0)
+        dof = n - 2
+        t_stat = r * np.sqrt(dof / (1.0 - r ** 2))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
+    p_value[np.abs(r) == 1.0] = 0.0
+    p_value[dof < 1] = np.nan
+
+    return {"r": r, "n": n.astype(np.int64), "p_value": p_value}
+
+
+def correlation_table(
+    df: pd.DataFrame,
+    targets: List[str],
+    predictors: List[str],
+    method: str = "pearson",
+    alpha: float = 0.05
+) -> pd.DataFrame:
+    """
+    Screen predictors against targets and return a tidy correlation table.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data to analyze
+    targets : List[str]
+        Target variable names
+    predictors : List[str]
+        Predictor variable names
+    method : str
+        "pearson" or "spearman"
+    alpha : float
+        Significance level
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (predictor, target) pair with method, n, correlation,
+        p_value and significant
+    """
+    matrix = correlation_matrix(df[predictors], df[targets], method)
+
+    return pd.DataFrame({
+        "predictor": np.repeat(predictors, len(targets)),
+        "target": np.tile(targets, len(predictors)),
+        "method": method,
+        "n": matrix["n"].ravel(),
+        "correlation": matrix["r"].ravel(),
+        "p_value": matrix["p_value"].ravel(),
+        "significant": matrix["p_value"].ravel() < alpha
+    })
 
 
 def calculate_correlations(
     df: pd.DataFrame,
     target: str,
-    predictors: List[str]
+    predictors: List[str],
+    method: str = "pearson"
 ) -> Dict[str, Dict[str, float]]:
     """
-    Calculate Pearson correlations between predictors and target.
+    Calculate correlations between predictors and target.
 
     Parameters
     ----------
@@ -32,29 +175,37 @@ def calculate_correlations(
         Target variable name
     predictors : List[str]
         List of predictor variable names
+    method : str
+        "pearson" or "spearman"
 
     Returns
     -------
     Dict[str, Dict[str, float]]
         Dictionary with correlation coefficient and p-value for each predictor
     """
-    results = {}
-
-    for var in predictors:
-        r, p_value = stats.pearsonr(df[var], df[target])
-        results[var] = {
-            "correlation": r,
-            "p_value": p_value,
-            "significant": p_value < 0.05
-        }
+    return correlations_from_table(correlation_table(df, [target], predictors, method), target)
 
-    return results
+
+def correlations_from_table(table: pd.DataFrame, target: str) -> Dict[str, Dict[str, float]]:
+    """Convert the rows of a correlation table for one target into the per-predictor dictionary."""
+    rows = table[table["target"] == target]
+    return {
+        row.predictor: {
+            "correlation": row.correlation,
+            "p_value": row.p_value,
+            "significant": bool(row.significant)
+        }
+        for row in rows.itertuples(index=False)
+    }
 
 
 def check_multicollinearity(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
     """
     Check for multicollinearity among predictor variables.
 
+    Kept for compatibility; see collinearity_diagnostics for VIFs and
+    condition indices.
+
     Parameters
     ----------
     df : pd.DataFrame
@@ -67,7 +218,151 @@ def check_multicollinearity(df: pd.DataFrame, columns: List[str]) -> pd.DataFram
     pd.DataFrame
         Correlation matrix
     """
-    return df[columns].corr()
+    return collinearity_diagnostics(df, columns)["correlation"]
+
+
+def collinearity_diagnostics(
+    df: pd.DataFrame,
+    columns: List[str],
+    vif_threshold: float = VIF_THRESHOLD,
+    condition_threshold: float = CONDITION_INDEX_THRESHOLD
+) -> Dict[str, Any]:
+    """
+    VIF, condition-index and variance-decomposition diagnostics from one eigendecomposition.
+
+    With R = V diag(w) V' the correlation matrix of the predictors,
+    VIF_j = [R^-1]_jj = sum_k V_jk^2 / w_k, the condition indices are
+    sqrt(max(w) / w_k), and V_jk^2 / w_k / VIF_j is the share of
+    predictor j's variance tied to component k. No auxiliary regressions
+    are fitted, so hundreds of predictors cost one p x p decomposition.
+    Exact dependencies (zero eigenvalues) give infinite VIFs.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data to analyze
+    columns : List[str]
+        Predictor columns (missing values are excluded pair by pair)
+    vif_threshold : float
+        VIF above which a predictor is flagged as redundant
+    condition_threshold : float
+        Condition index above which a component is reported as a dependency
+
+    Returns
+    -------
+    Dict[str, Any]
+        correlation (DataFrame), vif table (variable, vif, tolerance,
+        redundant), eigenvalues table (eigenvalue, condition_index,
+        smallest first), variance_proportions (components x variables),
+        condition_number and dependencies (condition index and the
+        variables with over half their variance in each near-singular
+        component)
+    """
+    R = correlation_matrix(df[columns], df[columns])["r"]
+    # Constant columns have no defined correlation: treat as uncorrelated here
+    R = np.where(np.isnan(R), 0.0, R)
+    np.fill_diagonal(R, 1.0)
+
+    eigenvalues, vectors = np.linalg.eigh(R)
+    eigenvalues = np.where(eigenvalues > COLLINEARITY_TOLERANCE * eigenvalues.max(), eigenvalues, 0.0)
+
+    squared = vectors ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        contributions = np.where(squared > COLLINEARITY_TOLERANCE, squared / eigenvalues, 0.0)
+        vif = contributions.sum(axis=1)
+        proportions = contributions / vif[:, None]
+        condition_index = np.sqrt(eigenvalues.max() / eigenvalues)
+    proportions = np.where(np.isnan(proportions), np.isinf(contributions).astype(float), proportions)
+
+    vif_table = pd.DataFrame({
+        "variable": columns,
+        "vif": vif,
+        "tolerance": 1 / vif,
+        "redundant": vif > vif_threshold
+    })
+
+    dependencies = []
+    for k in np.flatnonzero(condition_index > condition_threshold):
+        involved = [columns[j] for j in np.flatnonzero(proportions[:, k] > 0.5)]
+        dependencies.append({"condition_index": float(condition_index[k]), "variables": involved})
+
+    return {
+        "correlation": pd.DataFrame(R, index=columns, columns=columns),
+        "vif": vif_table,
+        "eigenvalues": pd.DataFrame({"eigenvalue": eigenvalues, "condition_index": condition_index}),
+        "variance_proportions": pd.DataFrame(proportions.T, columns=columns),
+        "condition_number": float(condition_index.max()),
+        "dependencies": dependencies
+    }
+
+
+def drop_redundant_features(
+    df: pd.DataFrame,
+    columns: List[str],
+    vif_threshold: float = VIF_THRESHOLD
+) -> Dict[str, Any]:
+    """
+    Remove predictors until every remaining VIF is at most vif_threshold.
+
+    A forward pass adds columns in the given order while keeping the
+    inverse correlation matrix up to date by a block (Schur complement)
+    update, skipping columns that are exact linear combinations of those
+    already kept. A backward pass then repeatedly drops the largest-VIF
+    column, downdating the same inverse. Each step costs O(p^2), so no
+    matrix is ever re-inverted.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data to analyze
+    columns : List[str]
+        Candidate predictors, most important first
+    vif_threshold : float
+        Largest VIF allowed among the kept predictors
+
+    Returns
+    -------
+    Dict[str, Any]
+        kept columns, dropped columns (with the VIF at the time they were
+        dropped, infinite for exact dependencies) and final vif per kept
+        column
+    """
+    R = correlation_matrix(df[columns], df[columns])["r"]
+    R = np.where(np.isnan(R), 0.0, R)
+    np.fill_diagonal(R, 1.0)
+
+    kept: List[int] = []
+    dropped: List[Dict[str, Any]] = []
+    inverse = np.zeros((0, 0))
+    for j in range(len(columns)):
+        b = R[kept, j]
+        pb = inverse @ b
+        residual = R[j, j] - b @ pb
+        if residual <= COLLINEARITY_TOLERANCE:
+            dropped.append({"variable": columns[j], "vif": np.inf})
+            continue
+        inverse = np.block([
+            [inverse + np.outer(pb, pb) / residual, -pb[:, None] / residual],
+            [-pb[None, :] / residual, np.array([[1 / residual]])]
+        ])
+        kept.append(j)
+
+    while len(kept) > 1:
+        vif = np.diag(inverse)
+        worst = int(np.argmax(vif))
+        if vif[worst] <= vif_threshold:
+            break
+        dropped.append({"variable": columns[kept[worst]], "vif": float(vif[worst])})
+        rest = np.arange(len(kept)) != worst
+        column = inverse[rest, worst]
+        inverse = inverse[np.ix_(rest, rest)] - np.outer(column, column) / inverse[worst, worst]
+        kept.pop(worst)
+
+    return {
+        "kept": [columns[j] for j in kept],
+        "dropped": dropped,
+        "vif": dict(zip([columns[j] for j in kept], np.diag(inverse)))
+    }
 
 
 def check_autocorrelation(series: pd.Series, lag: int = 1) -> float:
@@ -93,9 +388,9 @@ def train_linear_regression(
     X: pd.DataFrame,
     y: pd.Series,
     scale: bool = False
-) -> Tuple[LinearRegression, np.ndarray, Dict[str, float]]:
+) -> Tuple[pd.DataFrame, np.ndarray, Dict[str, float]]:
     """
-    Train a linear regression model.
+    Train a linear regression model (OLS with intercept, see fit_ols_batch).
 
     Parameters
     ----------
@@ -104,37 +399,33 @@ def train_linear_regression(
     y : pd.Series
         Target variable
     scale : bool
-        Whether to scale features
+        Whether to standardize features first (constant columns are left
+        unscaled, as sklearn's StandardScaler does)
 
     Returns
     -------
-    Tuple[LinearRegression, np.ndarray, Dict[str, float]]
-        Model, predictions, and metrics
+    Tuple[pd.DataFrame, np.ndarray, Dict[str, float]]
+        Coefficient table (term, coefficient, std_error, t_stat, p_value),
+        predictions, and metrics
     """
     if scale:
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-    else:
-        X_scaled = X.values
+        X = (X - X.mean()) / X.std(ddof=0).replace(0, 1)
 
-    model = LinearRegression()
-    model.fit(X_scaled, y)
-    y_pred = model.predict(X_scaled)
+    fit = fit_ols_batch(X, y)
+    coefficients = fit["coefficients"].drop(columns="model")
+    beta = coefficients["coefficient"].to_numpy()
+    y_pred = beta[0] + X.to_numpy(dtype=np.float64) @ beta[1:]
 
-    metrics = {
-        "r2": r2_score(y, y_pred),
-        "rmse": np.sqrt(mean_squared_error(y, y_pred)),
-        "mae": mean_absolute_error(y, y_pred)
-    }
+    metrics = {key: float(fit["fits"][key].iloc[0]) for key in ("r2", "rmse", "mae")}
 
-    return model, y_pred, metrics
+    return coefficients, y_pred, metrics
 
 
 def train_decision_tree(
     X: pd.DataFrame,
     y: pd.Series,
     max_depth: int = 4
-) -> Tuple[DecisionTreeRegressor, np.ndarray, Dict[str, float]]:
+) -> Tuple["DecisionTreeRegressor", np.ndarray, Dict[str, float]]:
     """
     Train a decision tree regressor.
 
@@ -152,6 +443,9 @@ def train_decision_tree(
     Tuple[DecisionTreeRegressor, np.ndarray, Dict[str, float]]
         Model, predictions, and metrics
     """
+    from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+    from sklearn.tree import DecisionTreeRegressor
+
     model = DecisionTreeRegressor(max_depth=max_depth, random_state=42)
     model.fit(X, y)
     y_pred = model.predict(X)
@@ -187,13 +481,16 @@ def evaluate_time_split(
     Dict[str, Any]
         Split information and metrics
     """
+    from sklearn.metrics import r2_score, mean_squared_error
+    from sklearn.model_selection import train_test_split
+
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=test_size, shuffle=False, random_state=42
     )
 
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
+    fit = fit_ols_batch(X, y, windows=[(0, len(X_train))])["coefficients"]
+    beta = fit["coefficient"].to_numpy()
+    y_pred = beta[0] + X_test.to_numpy(dtype=np.float64) @ beta[1:]
 
     results = {
         "train_size": len(X_train),
@@ -201,69 +498,245 @@ def evaluate_time_split(
         "train_mean": y_train.mean(),
         "test_mean": y_test.mean(),
         "r2": r2_score(y_test, y_pred),
-        "rmse": np.sqrt(mean_squared_error(y_test, y_pred)),
-        "structural_break": y_train.mean() - y_test.mean() > 5  # Significant difference
+        "rmse": np.sqrt(mean_squared_error(y_test, y_pred))
     }
 
     return results
 
 
-def run_full_analysis(df: pd.DataFrame) -> Dict[str, Any]:
+def compare_models_time_split(
+    X: pd.DataFrame,
+    y: pd.Series,
+    test_size: float = 0.2,
+    max_depth: int = 4
+) -> Dict[str, Any]:
+    """
+    Compare baseline, scaled linear and decision tree models on a time split.
+
+    Both linear models are fitted on the training rows with fit_ols_batch;
+    the scaled one standardizes the features with the training means and
+    standard deviations first (as sklearn's StandardScaler would).
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Feature matrix
+    y : pd.Series
+        Target variable
+    test_size : float
+        Proportion of data for testing
+    max_depth : int
+        Maximum depth of the decision tree
+
+    Returns
+    -------
+    Dict[str, Any]
+        Test targets, per-model test predictions and metrics, and the
+        fitted decision tree
+    """
+    from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+    from sklearn.model_selection import train_test_split
+    from sklearn.tree import DecisionTreeRegressor
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, shuffle=False, random_state=42
+    )
+
+    def predict_ols(features: pd.DataFrame) -> np.ndarray:
+        fit = fit_ols_batch(features, y, windows=[(0, len(X_train))])["coefficients"]
+        beta = fit["coefficient"].to_numpy()
+        return beta[0] + features.iloc[len(X_train):].to_numpy(dtype=np.float64) @ beta[1:]
+
+    # Constant training columns are left unscaled, as StandardScaler does
+    scale = X_train.std(ddof=0).replace(0, 1)
+    scaled = (X - X_train.mean()) / scale
+
+    tree = DecisionTreeRegressor(max_depth=max_depth, random_state=42).fit(X_train, y_train)
+
+    predictions = {
+        "Baseline LR (No Scaling)": predict_ols(X),
+        "Full LR (With Scaling)": predict_ols(scaled),
+        "Decision Tree": tree.predict(X_test)
+    }
+
+    metrics = {
+        name: {
+            "r2": r2_score(y_test, y_pred),
+            "rmse": np.sqrt(mean_squared_error(y_test, y_pred)),
+            "mae": mean_absolute_error(y_test, y_pred)
+        }
+        for name, y_pred in predictions.items()
+    }
+
+    return {
+        "y_test": y_test.to_numpy(),
+        "predictions": predictions,
+        "metrics": metrics,
+        "decision_tree": tree,
+        "features": list(X.columns)
+    }
+
+
+def get_model_features(granularity: str = "annual") -> List[str]:
+    """Return the regression features used for the given granularity."""
+    features = ["FossilShare", "RenewableShare"]
+    if granularity == "monthly":
+        features = features + ["MonthSin", "MonthCos"]
+    return features
+
+
+def run_full_analysis(
+    df: pd.DataFrame,
+    granularity: str = "annual",
+    ols_statistics: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+    cv_cache_dir: Optional[str] = None,
+    n_replicates: int = 10_000,
+    cross_validate: bool = True
+) -> Dict[str, Any]:
     """
     Run complete analysis pipeline.
 
+    Model features whose VIF exceeds VIF_THRESHOLD (see
+    drop_redundant_features) are dropped with a warning before fitting.
+
     Parameters
     ----------
     df : pd.DataFrame
         Prepared dataset
+    granularity : str
+        "annual" or "monthly"; monthly models also use the seasonal
+        MonthSin/MonthCos features
+    ols_statistics : Optional[Dict[str, Any]]
+        Up-to-date sufficient statistics for the full linear model (see
+        ols_sufficient_statistics); when given, the model is solved from
+        them instead of being refitted
+    workers : int
+        Number of processes for the cross-validation sweep and resampling
+    cv_cache_dir : Optional[str]
+        Directory caching cross-validation fold results
+    n_replicates : int
+        Bootstrap and permutation replicates for the confidence intervals
+        (0 skips them; confidence_intervals is then None)
+    cross_validate : bool
+        Run the walk-forward cross-validation sweep (cross_validation is
+        None otherwise)
 
     Returns
     -------
     Dict[str, Any]
         Complete analysis results
     """
-    features = ["FossilShare", "RenewableShare"]
     target = "CO2Intensity"
 
+    # Drop model features that are (near) linear combinations of the others
+    feature_selection = drop_redundant_features(df, get_model_features(granularity))
+    features = feature_selection["kept"]
+    if feature_selection["dropped"]:
+        dropped = ", ".join(f"{item['variable']} (VIF {item['vif']:.1f})" for item in feature_selection["dropped"])
+        warnings.warn(f"Dropped redundant model features: {dropped}")
+
     X = df[features]
     y = df[target]
 
-    results = {}
+    results = {"granularity": granularity, "features": features, "feature_selection": feature_selection}
 
     # Correlation analysis
-    results["correlations"] = calculate_correlations(
-        df, target, ["FossilShare", "RenewableShare", "NuclearShare"]
-    )
+    with span("analysis.correlations"):
+        results["correlation_table"] = correlation_table(df, [target], SHARE_VARIABLES)
+        results["correlations"] = correlations_from_table(results["correlation_table"], target)
+
+    # VIF, condition-index and eigenvalue diagnostics of the share variables
+    with span("analysis.collinearity"):
+        results["multicollinearity"] = collinearity_diagnostics(df, SHARE_VARIABLES)
+
+    # Full data model (solved from up-to-date sufficient statistics when given,
+    # unless features were dropped after those statistics were accumulated)
+    with span("analysis.full_model"):
+        if ols_statistics is not None and not feature_selection["dropped"]:
+            solution = solve_sufficient_statistics(ols_statistics, features)
+            coefficients = solution["coefficients"]
+            intercept = solution["intercept"]
+            standard_errors = solution["standard_errors"]
+            t_stats = solution["t_stats"]
+        else:
+            fit = fit_ols_batch(X, y)["coefficients"].set_index("term")
+            coefficients = fit["coefficient"].drop("Intercept").to_dict()
+            intercept = fit.loc["Intercept", "coefficient"]
+            standard_errors = fit["std_error"].to_dict()
+            t_stats = fit["t_stat"].to_dict()
+
+        y_pred = intercept + X.to_numpy(dtype=np.float64) @ np.array([coefficients[f] for f in features])
+        residuals = y.to_numpy() - y_pred
+        results["full_model"] = {
+            "metrics": {
+                "r2": 1 - (residuals @ residuals) / ((y - y.mean()) @ (y - y.mean())),
+                "rmse": np.sqrt(np.mean(residuals ** 2)),
+                "mae": np.mean(np.abs(residuals))
+            },
+            "coefficients": coefficients,
+            "intercept": intercept,
+            "standard_errors": standard_errors,
+            "t_stats": t_stats,
+            "predictions": y_pred
+        }
 
-    # Check multicollinearity
-    results["multicollinearity"] = check_multicollinearity(
-        df, ["FossilShare", "RenewableShare", "NuclearShare"]
-    ).to_dict()
+    # Block-bootstrap intervals and permutation p-values
+    results["confidence_intervals"] = None
+    if n_replicates > 0:
+        with span("analysis.confidence_intervals"):
+            results["confidence_intervals"] = resampling_intervals(
+                df, target, SHARE_VARIABLES, features, n_replicates=n_replicates, workers=workers
+            )
 
-    # Full data model
-    model, y_pred, metrics = train_linear_regression(X, y)
-    results["full_model"] = {
-        "metrics": metrics,
-        "coefficients": dict(zip(features, model.coef_)),
-        "intercept": model.intercept_
-    }
+    # Exhaustive search over subsets of the share variables
+    with span("analysis.subset_search"):
+        results["subset_search"] = best_subsets(df[SHARE_VARIABLES], y)
 
     # Decision tree
-    dt_model, dt_pred, dt_metrics = train_decision_tree(X, y)
-    results["decision_tree"] = {
-        "metrics": dt_metrics,
-        "feature_importance": dict(zip(features, dt_model.feature_importances_))
-    }
+    with span("analysis.decision_tree"):
+        dt_model, dt_pred, dt_metrics = train_decision_tree(X, y)
+        results["decision_tree"] = {
+            "metrics": dt_metrics,
+            "feature_importance": dict(zip(features, dt_model.feature_importances_)),
+            "model": dt_model,
+            "predictions": np.asarray(dt_pred)
+        }
+
+    # Coefficients and fit over rolling and expanding windows
+    with span("analysis.window_regression"):
+        time_col = "Period" if granularity == "monthly" else "Year"
+        results["rolling_regression"] = window_regression(
+            X, y, window=ROLLING_WINDOWS[granularity], labels=df[time_col]
+        )
+        results["expanding_regression"] = window_regression(X, y, labels=df[time_col])
+
+    # Structural breaks over every candidate date
+    with span("analysis.structural_breaks"):
+        results["structural_breaks"] = detect_structural_breaks(X, y, labels=df[time_col])
+
+    # Walk-forward cross-validation of tree depths/leaf sizes and linear models
+    results["cross_validation"] = None
+    if cross_validate:
+        with span("analysis.cross_validation"):
+            results["cross_validation"] = cross_validate_models(
+                X, y, QUICK_SEARCH_SPACE, workers=workers, cache_dir=cv_cache_dir
+            )
 
     # Time-based split evaluation
-    results["time_split"] = evaluate_time_split(X, y)
+    with span("analysis.time_split"):
+        results["time_split"] = evaluate_time_split(X, y)
+
+    # Model comparison on the same time split (figures 8-11)
+    with span("analysis.model_comparison"):
+        results["model_comparison"] = compare_models_time_split(X, y)
 
     return results
 
 
 if __name__ == "__main__":
-    from data_loader import load_raw_data
-    from data_preparation import prepare_full_dataset
+    from .data_loader import load_raw_data
+    from .data_preparation import prepare_full_dataset
 
     # Load and prepare data
     energy_df, co2_df = load_raw_data()
@@ -276,4 +749,4 @@ if __name__ == "__main__":
     print(f"  Full Model R²: {results['full_model']['metrics']['r2']:.4f}")
     print(f"  Decision Tree R²: {results['decision_tree']['metrics']['r2']:.4f}")
     print(f"  Time Split R²: {results['time_split']['r2']:.4f}")
-    print(f"  Structural Break Detected: {results['time_split']['structural_break']}")
+    print(f"  Bai-Perron Breaks: {results['structural_breaks']['break_dates']}")
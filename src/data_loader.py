@@ -2,74 +2,473 @@
 Data Loading Module
 Handles loading and initial validation of EIA energy and CO2 data.
 
+Usage:
+    python -m src.data_loader
+
 Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
 """
 
+import hashlib
+import html.parser
+import importlib.util
+import json
+import re
+import warnings
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, List, Any, Iterable, Optional, Union
+
+from .instrumentation import instrument
+
+
+# Declared column types for EIA Monthly Energy Review (MER) CSV files
+MER_DTYPES = {
+    "MSN": "category",
+    "YYYYMM": "int32",
+    "Value": "float64",
+    "Column_Order": "int16",
+    "Description": "category",
+    "Unit": "category"
+}
+
+# Placeholder strings EIA uses in the Value column instead of numbers
+MER_SENTINELS = ["Not Available", "Not Meaningful", "Withheld", "No Data Reported"]
+
+# Month code used by EIA for annual totals (YYYY13)
+ANNUAL_MONTH_CODE = 13
+
+GRANULARITIES = ("annual", "monthly")
 
+# Raw file formats understood by load_table
+FILE_FORMATS = ("mer_csv", "html_table")
 
-def load_raw_data(data_dir: str = "data/raw") -> Tuple[pd.DataFrame, pd.DataFrame]:
+# Cell markers in EIA HTML tables: values treated as missing, and values
+# below half a unit ("(s)"), treated as zero
+HTML_MISSING = {"", "NA", "W", "--"}
+HTML_SMALL = "(s)"
+
+CATEGORICAL_COLUMNS = [col for col, dtype in MER_DTYPES.items() if dtype == "category"]
+
+
+def decode_yyyymm(yyyymm: Union[pd.Series, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
-    Load raw energy and CO2 data from EIA CSV files.
+    Decode EIA YYYYMM period codes with integer arithmetic.
 
     Parameters
     ----------
-    data_dir : str
-        Path to directory containing raw data files
+    yyyymm : pd.Series or np.ndarray
+        Period codes (integers, or strings of digits)
 
     Returns
     -------
-    Tuple[pd.DataFrame, pd.DataFrame]
-        Energy data and CO2 data DataFrames
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        Year (int32), month code (int8, 13 = annual total) and is-annual mask
 
     Example
     -------
-    >>> energy_df, co2_df = load_raw_data("data/raw")
+    >>> year, month, is_annual = decode_yyyymm(df["YYYYMM"])
     """
-    data_path = Path(data_dir)
+    codes = np.asarray(yyyymm)
+    if codes.dtype.kind not in "iu":
+        codes = pd.to_numeric(pd.Series(codes)).to_numpy()
+    codes = codes.astype(np.int32, copy=False)
 
-    energy_df = pd.read_csv(data_path / "MER_T01_01.csv")
-    co2_df = pd.read_csv(data_path / "MER_T11_01.csv")
+    year = codes // 100
+    month = (codes % 100).astype(np.int8)
+    is_annual = month == ANNUAL_MONTH_CODE
 
-    return energy_df, co2_df
+    return year, month, is_annual
 
 
-def profile_data(df: pd.DataFrame, name: str = "Data") -> Dict[str, Any]:
+def read_mer_csv(
+    path: Union[str, Path],
+    msns: Optional[Iterable[str]] = None,
+    granularity: Optional[str] = None,
+    chunksize: int = 100_000
+) -> pd.DataFrame:
     """
-    Profile a DataFrame to identify data quality issues.
+    Read an EIA MER CSV file with declared dtypes in filtered chunks.
+
+    MSN, Description and Unit are stored as categoricals and Value as float
+    (EIA placeholder strings become NaN). Rows outside the MSN allow-list or
+    the requested granularity are dropped chunk by chunk, so memory grows
+    with the rows kept rather than with the size of the file.
 
     Parameters
     ----------
-    df : pd.DataFrame
-        DataFrame to profile
-    name : str
-        Name for logging purposes
+    path : str or Path
+        Path to the MER CSV file
+    msns : Optional[Iterable[str]]
+        MSN codes to keep (all codes if None)
+    granularity : Optional[str]
+        "annual" keeps month code 13, "monthly" keeps 01-12, None keeps both
+    chunksize : int
+        Number of rows parsed per chunk
+
+    Returns
+    -------
+    pd.DataFrame
+        Typed MER data
+    """
+    if granularity is not None and granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {GRANULARITIES}, got {granularity!r}")
+
+    allowed = set(msns) if msns is not None else None
+
+    reader = pd.read_csv(
+        path,
+        dtype=MER_DTYPES,
+        na_values=MER_SENTINELS,
+        chunksize=chunksize
+    )
+
+    chunks = []
+    for chunk in reader:
+        mask = None
+        if allowed is not None:
+            mask = chunk["MSN"].isin(allowed).to_numpy()
+        if granularity is not None:
+            _, _, is_annual = decode_yyyymm(chunk["YYYYMM"])
+            keep = is_annual if granularity == "annual" else ~is_annual
+            mask = keep if mask is None else mask & keep
+        if mask is not None:
+            chunk = chunk[mask]
+        chunks.append(chunk)
+
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in MER_DTYPES.items()})
+
+    # Chunks carry their own category sets; unify them before concatenating
+    columns = {}
+    for col in chunks[0].columns:
+        if col in CATEGORICAL_COLUMNS:
+            columns[col] = union_categoricals(
+                [chunk[col] for chunk in chunks], ignore_order=True
+            ).remove_unused_categories()
+        else:
+            columns[col] = pd.concat([chunk[col] for chunk in chunks], ignore_index=True)
+
+    return pd.DataFrame(columns)
+
+
+class _TableGridParser(html.parser.HTMLParser):
+    """Collect the text of every table cell, with its colspan and rowspan, row by row."""
+
+    def __init__(self):
+        super().__init__()
+        self.rows: List[List[Tuple[str, int, int]]] = []
+        self._row: Optional[List[Tuple[str, int, int]]] = None
+        self._cell: Optional[List[str]] = None
+        self._span = (1, 1)
+        self._in_sup = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+        elif tag in ("td", "th"):
+            attrs = dict(attrs)
+            self._cell = []
+            self._span = (int(attrs.get("colspan") or 1), int(attrs.get("rowspan") or 1))
+        elif tag == "sup":
+            # Footnote markers
+            self._in_sup = True
+        elif tag == "br" and self._cell is not None:
+            self._cell.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None and self._row is not None:
+            self._row.append((" ".join("".join(self._cell).split()), *self._span))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+        elif tag == "sup":
+            self._in_sup = False
+
+    def handle_data(self, data):
+        if self._cell is not None and not self._in_sup:
+            self._cell.append(data)
+
+
+def read_html_table(path: Union[str, Path], encoding: str = "latin-1") -> pd.DataFrame:
+    """
+    Read an annual EIA HTML table (e.g. the legacy stb1101.xls) in MER long format.
+
+    Older EIA "xls" downloads are HTML tables with multi-level, spanning
+    headers, a value column and a revision-flag column per series, and
+    footnote rows. Spans are expanded into a grid, each series is labelled
+    by its stacked header text (e.g. "Petroleum Total"), and data rows are
+    those whose first cell is a year ("2011P" is read as 2011). Only the
+    standard library parser is used.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the HTML table
+    encoding : str
+        Text encoding of the file
+
+    Returns
+    -------
+    pd.DataFrame
+        MSN (the header label), YYYYMM (year with month code 13), Value,
+        Column_Order, Description (the header label) and Unit (from the
+        table title)
+    """
+    parser = _TableGridParser()
+    parser.feed(Path(path).read_text(encoding=encoding))
+
+    # Expand row and column spans into a (row, column) -> text grid
+    grid: Dict[Tuple[int, int], str] = {}
+    width = 0
+    for r, row in enumerate(parser.rows):
+        c = 0
+        for text, colspan, rowspan in row:
+            while (r, c) in grid:
+                c += 1
+            for dr in range(rowspan):
+                for dc in range(colspan):
+                    grid[(r + dr, c + dc)] = text
+            c += colspan
+        width = max(width, c)
+
+    is_year = [bool(re.fullmatch(r"\d{4}P?", grid.get((r, 0), ""))) for r in range(len(parser.rows))]
+    data_rows = [r for r, year in enumerate(is_year) if year]
+    if not data_rows:
+        raise ValueError(f"No year rows found in {path}")
+    header_rows = range(data_rows[0])
+
+    title = grid.get((0, 0), "")
+    unit = re.search(r"\(([^()]*)\)\s*$", title)
+    unit = unit.group(1).strip() if unit else ""
+
+    # A series label stacks the header cells above its first column;
+    # cells spanning the full width (the title) are not headers
+    labels: Dict[str, int] = {}
+    for c in range(1, width):
+        parts = []
+        for r in header_rows:
+            text = grid.get((r, c), "")
+            spans_table = all(grid.get((r, other)) == text for other in range(width))
+            if text and not spans_table and (not parts or parts[-1] != text):
+                parts.append(text)
+        # Undo words hyphenated across header line breaks ("Kero- sene")
+        label = re.sub(r"(?<=\w)- (?=[a-z])", "", " ".join(parts))
+        if label and label not in labels:
+            labels[label] = c
+
+    records = []
+    for order, (label, c) in enumerate(labels.items(), start=1):
+        for r in data_rows:
+            text = grid.get((r, c), "").replace(",", "")
+            if text == HTML_SMALL:
+                value = 0.0
+            elif text in HTML_MISSING:
+                value = np.nan
+            else:
+                value = float(text)
+            year = int(grid[(r, 0)][:4])
+            records.append((label, year * 100 + ANNUAL_MONTH_CODE, value, order, label, unit))
+
+    return pd.DataFrame(records, columns=list(MER_DTYPES)).astype(MER_DTYPES)
+
+
+def file_fingerprint(path: Union[str, Path], known: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Fingerprint a source file by size, modification time and content hash.
+
+    The SHA-256 hash is only recomputed when size or mtime differ from a
+    previously stored fingerprint, so unchanged files are not re-read.
+
+    Parameters
+    ----------
+    path : str or Path
+        File to fingerprint
+    known : Optional[Dict[str, Any]]
+        Previously stored fingerprint for the same file
 
     Returns
     -------
     Dict[str, Any]
-        Dictionary containing profiling results
+        Dictionary with size, mtime_ns and sha256
+    """
+    stat = Path(path).stat()
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    if known and known.get("size") == stat.st_size and known.get("mtime_ns") == stat.st_mtime_ns:
+        fingerprint["sha256"] = known["sha256"]
+        return fingerprint
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    fingerprint["sha256"] = digest.hexdigest()
+
+    return fingerprint
+
+
+@instrument()
+def load_table(
+    path: Union[str, Path],
+    typed: bool = False,
+    msns: Optional[Iterable[str]] = None,
+    granularity: Optional[str] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+    rebuild_cache: bool = False,
+    file_format: str = "mer_csv"
+) -> pd.DataFrame:
+    """
+    Load one MER table, using a Parquet cache keyed by source fingerprint.
+
+    The cached table is reused only when the source file's size, mtime and
+    content hash and the reader options all match; a replaced MER file is
+    therefore re-parsed automatically. Cache files are named after the
+    file stem and a hash of the resolved path, so same-named files in
+    different directories do not share entries. Categorical dtypes survive
+    the round-trip. Caching needs pyarrow and is skipped with a warning if
+    it is not installed.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the MER CSV file
+    typed : bool
+        Use read_mer_csv instead of a plain pd.read_csv
+    msns : Optional[Iterable[str]]
+        MSN allow-list (typed mode only)
+    granularity : Optional[str]
+        "annual" or "monthly" filter (typed mode only)
+    cache_dir : Optional[str or Path]
+        Directory for cached tables (no caching if None)
+    rebuild_cache : bool
+        Ignore any cached copy and re-parse the CSV
+    file_format : str
+        "mer_csv", or "html_table" for EIA HTML tables (see read_html_table)
+
+    Returns
+    -------
+    pd.DataFrame
+        Parsed table
     """
-    profile = {
-        "name": name,
-        "shape": df.shape,
-        "columns": df.columns.tolist(),
-        "dtypes": df.dtypes.to_dict(),
-        "missing_values": df.isnull().sum().to_dict(),
-        "not_available_count": (df == "Not Available").sum().sum() if df.dtypes.apply(lambda x: x == object).any() else 0,
+    path = Path(path)
+    msns = list(msns) if msns is not None else None
+
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"file_format must be one of {FILE_FORMATS}, got {file_format!r}")
+    if not typed and (msns is not None or granularity is not None):
+        raise ValueError("msns and granularity filters require typed=True")
+    if file_format != "mer_csv" and typed:
+        raise ValueError("typed reading applies to MER CSV files only")
+
+    def parse() -> pd.DataFrame:
+        if file_format == "html_table":
+            return read_html_table(path)
+        if typed:
+            return read_mer_csv(path, msns=msns, granularity=granularity)
+        return pd.read_csv(path)
+
+    if cache_dir is None:
+        return parse()
+
+    if importlib.util.find_spec("pyarrow") is None:
+        warnings.warn("pyarrow is not installed; raw data cache disabled")
+        return parse()
+
+    cache_path = Path(cache_dir)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    # Files of the same name in different directories get separate entries
+    source_key = f"{path.stem}-{hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:8]}"
+    manifest_file = cache_path / f"{source_key}.json"
+    options = {
+        "typed": typed,
+        "msns": sorted(msns) if msns is not None else None,
+        "granularity": granularity
     }
+    if file_format != "mer_csv":
+        options["file_format"] = file_format
+    options_key = hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+    table_file = cache_path / f"{source_key}-{options_key}.parquet"
+
+    manifest = {}
+    if manifest_file.exists():
+        manifest = json.loads(manifest_file.read_text())
+
+    fingerprint = file_fingerprint(path, manifest.get("source"))
+    entry = manifest.get("tables", {}).get(options_key)
+    source_unchanged = manifest.get("source", {}).get("sha256") == fingerprint["sha256"]
 
-    # Check for YYYYMM format
-    if "YYYYMM" in df.columns:
-        df_temp = df.copy()
-        df_temp["YYYYMM"] = df_temp["YYYYMM"].astype(str)
-        df_temp["MonthCode"] = df_temp["YYYYMM"].str[-2:]
-        profile["month_codes"] = df_temp["MonthCode"].value_counts().to_dict()
-        profile["has_mixed_granularity"] = len(df_temp["MonthCode"].unique()) > 1
+    if not rebuild_cache and source_unchanged and entry and table_file.exists():
+        if manifest["source"] != fingerprint:
+            # Same content, new mtime (e.g. file touched): refresh the key
+            manifest["source"] = fingerprint
+            manifest_file.write_text(json.dumps(manifest, indent=2))
+        return pd.read_parquet(table_file)
 
-    return profile
+    df = parse()
+    df.to_parquet(table_file, index=False)
+
+    tables = manifest.get("tables", {}) if source_unchanged else {}
+    tables[options_key] = options
+    manifest = {"source": fingerprint, "tables": tables}
+    manifest_file.write_text(json.dumps(manifest, indent=2))
+
+    return df
+
+
+@instrument()
+def load_raw_data(
+    data_dir: str = "data/raw",
+    typed: bool = False,
+    msns: Optional[Iterable[str]] = None,
+    granularity: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    rebuild_cache: bool = False
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load raw energy and CO2 data from EIA CSV files.
+
+    Parameters
+    ----------
+    data_dir : str
+        Path to directory containing raw data files
+    typed : bool
+        Use the typed, chunked reader (see read_mer_csv) instead of a plain
+        pd.read_csv of the whole file
+    msns : Optional[Iterable[str]]
+        MSN allow-list applied while reading (typed mode only)
+    granularity : Optional[str]
+        "annual" or "monthly" filter applied while reading (typed mode only)
+    cache_dir : Optional[str]
+        Directory for the Parquet cache of parsed tables (see load_table)
+    rebuild_cache : bool
+        Force the cached tables to be rebuilt from the CSV files
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, pd.DataFrame]
+        Energy data and CO2 data DataFrames
+
+    Example
+    -------
+    >>> energy_df, co2_df = load_raw_data("data/raw")
+    >>> energy_df, co2_df = load_raw_data("data/raw", typed=True, granularity="annual")
+    """
+    data_path = Path(data_dir)
+    options = {
+        "typed": typed,
+        "msns": list(msns) if msns is not None else None,
+        "granularity": granularity,
+        "cache_dir": cache_dir,
+        "rebuild_cache": rebuild_cache
+    }
+
+    energy_df = load_table(data_path / "MER_T01_01.csv", **options)
+    co2_df = load_table(data_path / "MER_T11_01.csv", **options)
+
+    return energy_df, co2_df
 
 
 def get_available_variables(df: pd.DataFrame) -> pd.DataFrame:
@@ -97,7 +496,3 @@ if __name__ == "__main__":
     energy_df, co2_df = load_raw_data()
     print(f"Energy data: {energy_df.shape}")
     print(f"CO2 data: {co2_df.shape}")
-
-    # Profile data
-    energy_profile = profile_data(energy_df, "Energy")
-    print(f"\nEnergy profile: {energy_profile}")
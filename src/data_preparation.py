@@ -2,12 +2,18 @@
 Data Preparation Module
 Handles cleaning, transformation, and feature engineering for EIA data.
 
+Usage:
+    python -m src.data_preparation
+
 Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
 """
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
+
+from .data_loader import GRANULARITIES, decode_yyyymm
+from .instrumentation import instrument
 
 
 # Variable mappings for EIA data
@@ -22,6 +28,32 @@ CO2_VARIABLES = {
     "TETCEUS": "TotalCO2"          # Total Energy CO2 Emissions
 }
 
+# Per-fuel CO2 series in MER_T11_01 ("AllFuels" is the total)
+FUEL_CO2_VARIABLES = {
+    "CKTCEUS": "Coal",             # Coal CO2 Emissions
+    "NNTCEUS": "NaturalGas",       # Natural Gas CO2 Emissions
+    "PMTCEUS": "Petroleum",        # Petroleum CO2 Emissions
+    "TETCEUS": "AllFuels"          # Total Energy CO2 Emissions
+}
+
+# Consumption series in MER_T01_01 used as emission-factor denominators
+FUEL_CONSUMPTION_VARIABLES = {
+    "FFTCBUS": "Fossil",           # Total Fossil Fuels Consumption
+    "TETCBUS": "Total"             # Total Primary Energy Consumption
+}
+
+# Denominator of each fuel's emission factor; MER_T01_01 has no per-fuel
+# consumption, so fuel emissions are expressed per unit of fossil energy
+FUEL_DENOMINATORS = {
+    "Coal": "Fossil",
+    "NaturalGas": "Fossil",
+    "Petroleum": "Fossil",
+    "AllFuels": "Fossil"
+}
+
+# Level variables summed over trailing 12 months in monthly mode
+ROLLING_VARIABLES = ["TotalEnergy", "FossilEnergy", "RenewableEnergy", "NuclearEnergy", "TotalCO2"]
+
 
 def filter_annual_data(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -41,23 +73,12 @@ def filter_annual_data(df: pd.DataFrame) -> pd.DataFrame:
     pd.DataFrame
         Filtered annual data with Year column
     """
-    df_clean = df.copy()
-
-    # Convert YYYYMM to string for parsing
-    df_clean["YYYYMM"] = df_clean["YYYYMM"].astype(str)
-
-    # Extract year and month code
-    df_clean["Year"] = df_clean["YYYYMM"].str[:4].astype(int)
-    df_clean["MonthCode"] = df_clean["YYYYMM"].str[-2:]
+    year, _, is_annual = decode_yyyymm(df["YYYYMM"])
 
-    # Filter to annual data only
-    df_annual = df_clean[df_clean["MonthCode"] == "13"].copy()
-
-    # Drop temporary columns
-    df_annual = df_annual.drop(["YYYYMM", "MonthCode"], axis=1)
-
-    if "Column_Order" in df_annual.columns:
-        df_annual = df_annual.drop("Column_Order", axis=1)
+    # Select annual rows and the kept columns in one indexing step
+    keep_cols = [col for col in df.columns if col not in ("YYYYMM", "Column_Order")]
+    df_annual = df.loc[is_annual, keep_cols]
+    df_annual["Year"] = year[is_annual]
 
     return df_annual
 
@@ -119,7 +140,8 @@ def pivot_to_wide_format(
         index=index_col,
         columns=msn_col,
         values=value_col,
-        aggfunc="first"
+        aggfunc="first",
+        observed=True
     ).reset_index()
 
     # Rename columns
@@ -128,7 +150,125 @@ def pivot_to_wide_format(
     return df_pivot
 
 
-def calculate_energy_shares(df: pd.DataFrame) -> pd.DataFrame:
+def build_wide_dataset(
+    tables: Sequence[pd.DataFrame],
+    variable_mapping: Dict[str, str],
+    index_col: str = "Year",
+    granularity: str = "annual"
+) -> pd.DataFrame:
+    """
+    Build the wide period x variable dataset from any number of MER tables.
+
+    Each table is reduced to the rows of the requested granularity for the
+    mapped MSN codes, the kept (period, variable, value) triples are
+    concatenated once, and values are scattered into a preallocated NumPy
+    matrix. In annual mode the result matches running filter_annual_data,
+    convert_to_numeric and pivot_to_wide_format on every table and
+    inner-merging on Year, without the intermediate frame copies.
+
+    Parameters
+    ----------
+    tables : Sequence[pd.DataFrame]
+        Raw EIA tables with MSN, YYYYMM and Value columns
+    variable_mapping : Dict[str, str]
+        Mapping from MSN codes to column names
+    index_col : str
+        Name of the year column in the result
+    granularity : str
+        "annual" (one row per year) or "monthly" (one row per month, with
+        Year, Month, Date and fractional-year Period columns)
+
+    Returns
+    -------
+    pd.DataFrame
+        Wide-format DataFrame with one row per period present in every
+        table that holds at least one mapped MSN
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {GRANULARITIES}, got {granularity!r}")
+
+    monthly = granularity == "monthly"
+    msn_index = pd.Index(list(variable_mapping.keys()))
+
+    periods, var_idx, values = [], [], []
+    column_order = []
+    common_periods = None
+    for table in tables:
+        year, month, is_annual = decode_yyyymm(table["YYYYMM"])
+        if monthly:
+            # Sortable integer period key, i.e. YYYYMM itself
+            period = year * 100 + month
+            in_granularity = ~is_annual
+        else:
+            period = year
+            in_granularity = is_annual
+
+        msn = table["MSN"]
+        if isinstance(msn.dtype, pd.CategoricalDtype):
+            # Look up each category once, then index by the integer codes
+            lookup = np.append(msn_index.get_indexer(msn.cat.categories), -1)
+            idx = lookup[msn.cat.codes.to_numpy()]
+        else:
+            idx = msn_index.get_indexer(msn)
+
+        keep = in_granularity & (idx >= 0)
+        value = pd.to_numeric(table["Value"].to_numpy()[keep], errors="coerce")
+        value = np.asarray(value, dtype=np.float64)
+        valid = ~np.isnan(value)
+
+        table_periods = period[keep][valid]
+        table_vars = idx[keep][valid]
+        periods.append(table_periods)
+        var_idx.append(table_vars)
+        values.append(value[valid])
+
+        # Columns follow table order, MSN codes sorted within each table
+        present = set(np.unique(table_vars).tolist()) - set(column_order)
+        column_order.extend(sorted(present, key=lambda i: msn_index[i]))
+
+        # Tables holding none of the mapped MSNs do not restrict the join
+        if len(table_vars) == 0:
+            continue
+        table_period_set = np.unique(table_periods)
+        if common_periods is None:
+            common_periods = table_period_set
+        else:
+            common_periods = np.intersect1d(common_periods, table_period_set)
+
+    periods = np.concatenate(periods)
+    if common_periods is None:
+        common_periods = np.unique(periods)
+    var_idx = np.concatenate(var_idx)
+    values = np.concatenate(values)
+
+    # Inner join: keep only periods present in every table
+    in_common = np.isin(periods, common_periods)
+    row_idx = np.searchsorted(common_periods, periods[in_common])
+    var_idx = var_idx[in_common]
+    values = values[in_common]
+
+    matrix = np.full((len(common_periods), len(msn_index)), np.nan)
+    # Assign in reverse so the first occurrence of a duplicate key wins
+    matrix[row_idx[::-1], var_idx[::-1]] = values[::-1]
+
+    if monthly:
+        years = common_periods // 100
+        months = common_periods % 100
+        columns = {
+            index_col: years,
+            "Month": months.astype(np.int8),
+            "Date": ((years - 1970) * 12 + months - 1).astype("datetime64[M]").astype("datetime64[ns]"),
+            "Period": years + (months - 1) / 12
+        }
+    else:
+        columns = {index_col: common_periods}
+    for i in column_order:
+        columns[variable_mapping[msn_index[i]]] = matrix[:, i]
+
+    return pd.DataFrame(columns)
+
+
+def calculate_energy_shares(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Calculate energy source shares as percentage of total.
 
@@ -136,13 +276,15 @@ def calculate_energy_shares(df: pd.DataFrame) -> pd.DataFrame:
     ----------
     df : pd.DataFrame
         DataFrame with TotalEnergy, FossilEnergy, RenewableEnergy, NuclearEnergy
+    inplace : bool
+        Add the columns to df instead of a copy
 
     Returns
     -------
     pd.DataFrame
         DataFrame with added share columns
     """
-    df_result = df.copy()
+    df_result = df if inplace else df.copy()
 
     required_cols = ["TotalEnergy", "FossilEnergy", "RenewableEnergy", "NuclearEnergy"]
     for col in required_cols:
@@ -156,7 +298,7 @@ def calculate_energy_shares(df: pd.DataFrame) -> pd.DataFrame:
     return df_result
 
 
-def calculate_co2_intensity(df: pd.DataFrame) -> pd.DataFrame:
+def calculate_co2_intensity(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
     Calculate CO2 emission intensity (CO2 per unit energy).
 
@@ -167,13 +309,15 @@ def calculate_co2_intensity(df: pd.DataFrame) -> pd.DataFrame:
     ----------
     df : pd.DataFrame
         DataFrame with TotalCO2 and TotalEnergy columns
+    inplace : bool
+        Add the column to df instead of a copy
 
     Returns
     -------
     pd.DataFrame
         DataFrame with added CO2Intensity column
     """
-    df_result = df.copy()
+    df_result = df if inplace else df.copy()
 
     if "TotalCO2" not in df.columns or "TotalEnergy" not in df.columns:
         raise ValueError("Missing required columns: TotalCO2 and/or TotalEnergy")
@@ -183,9 +327,208 @@ def calculate_co2_intensity(df: pd.DataFrame) -> pd.DataFrame:
     return df_result
 
 
+def add_seasonal_features(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    """
+    Add cyclical month-of-year features for monthly data.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Monthly data with a Month column (1-12)
+    inplace : bool
+        Add the columns to df instead of a copy
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with added MonthSin and MonthCos columns
+    """
+    df_result = df if inplace else df.copy()
+
+    if "Month" not in df.columns:
+        raise ValueError("Missing required column: Month")
+
+    angle = 2 * np.pi * (df_result["Month"].to_numpy() - 1) / 12
+    df_result["MonthSin"] = np.sin(angle)
+    df_result["MonthCos"] = np.cos(angle)
+
+    return df_result
+
+
+def add_rolling_aggregates(
+    df: pd.DataFrame,
+    columns: List[str] = ROLLING_VARIABLES,
+    window: int = 12,
+    inplace: bool = False
+) -> pd.DataFrame:
+    """
+    Add trailing-window sums and the shares/intensity derived from them.
+
+    Rolling sums remove the seasonal cycle from monthly data; the 12-month
+    shares and CO2 intensity are computed from the summed levels, so they
+    are comparable to the annual figures.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Monthly data sorted by period, without gaps
+    columns : List[str]
+        Level columns to sum
+    window : int
+        Window length in rows (months)
+    inplace : bool
+        Add the columns to df instead of a copy
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with added <column>{window}M columns
+    """
+    df_result = df if inplace else df.copy()
+    suffix = f"{window}M"
+
+    for col in columns:
+        if col not in df.columns:
+            raise ValueError(f"Missing required column: {col}")
+        df_result[col + suffix] = df_result[col].rolling(window, min_periods=window).sum()
+
+    total = df_result["TotalEnergy" + suffix]
+    for source in ("Fossil", "Renewable", "Nuclear"):
+        if f"{source}Energy" in columns:
+            df_result[f"{source}Share{suffix}"] = df_result[f"{source}Energy{suffix}"] / total * 100
+    if "TotalCO2" in columns:
+        df_result["CO2Intensity" + suffix] = df_result["TotalCO2" + suffix] / total
+
+    return df_result
+
+
+def long_series(
+    df: pd.DataFrame,
+    variable_mapping: Dict[str, str],
+    granularity: str = "annual"
+) -> pd.DataFrame:
+    """
+    Reduce a raw MER table to (Period, Key, Value) rows for the mapped MSNs.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Raw EIA data
+    variable_mapping : Dict[str, str]
+        Mapping from MSN codes to keys
+    granularity : str
+        "annual" (period = year) or "monthly" (period = YYYYMM)
+
+    Returns
+    -------
+    pd.DataFrame
+        Long-format rows with numeric values, missing values dropped
+    """
+    year, month, is_annual = decode_yyyymm(df["YYYYMM"])
+    in_granularity = is_annual if granularity == "annual" else ~is_annual
+    key = df["MSN"].astype(str).map(variable_mapping).to_numpy()
+    keep = in_granularity & pd.notna(key)
+
+    period = year if granularity == "annual" else year.astype(np.int64) * 100 + month
+    value = pd.to_numeric(pd.Series(df["Value"].to_numpy()[keep]), errors="coerce").to_numpy(dtype=np.float64)
+    long = pd.DataFrame({"Period": period[keep], "Key": key[keep], "Value": value})
+    return long[~np.isnan(value)]
+
+
+@instrument()
+def compute_fuel_emission_factors(
+    energy_df: pd.DataFrame,
+    co2_df: pd.DataFrame,
+    granularity: str = "annual"
+) -> pd.DataFrame:
+    """
+    Compute per-fuel emission factors and intensities for every period.
+
+    Fuel CO2 rows are joined to their consumption denominator on a
+    (Period, Key) index and to total energy on Period, without pivoting.
+
+    Parameters
+    ----------
+    energy_df : pd.DataFrame
+        Raw energy data from EIA (MER_T01_01)
+    co2_df : pd.DataFrame
+        Raw CO2 data from EIA (MER_T11_01)
+    granularity : str
+        "annual" (Period = year) or "monthly" (Period = YYYYMM)
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by (Period, Fuel) with CO2 (MMT), Consumption (quad Btu of
+        the denominator), EmissionFactor (CO2 per unit of denominator
+        consumption, equal to kg CO2 per MMBtu) and Intensity (CO2 per
+        unit of total primary energy)
+    """
+    co2 = long_series(co2_df, FUEL_CO2_VARIABLES, granularity).rename(columns={"Key": "Fuel", "Value": "CO2"})
+    consumption = long_series(energy_df, FUEL_CONSUMPTION_VARIABLES, granularity)
+    consumption = consumption.set_index(["Period", "Key"])["Value"]
+
+    denominator = pd.MultiIndex.from_arrays([co2["Period"], co2["Fuel"].map(FUEL_DENOMINATORS)])
+    total = pd.MultiIndex.from_arrays([co2["Period"], np.full(len(co2), "Total")])
+
+    factors = pd.DataFrame({
+        "Period": co2["Period"].to_numpy(),
+        "Fuel": co2["Fuel"].to_numpy(),
+        "CO2": co2["CO2"].to_numpy(),
+        "Consumption": consumption.reindex(denominator).to_numpy(),
+        "TotalEnergy": consumption.reindex(total).to_numpy()
+    })
+    factors["EmissionFactor"] = factors["CO2"] / factors["Consumption"]
+    factors["Intensity"] = factors["CO2"] / factors["TotalEnergy"]
+
+    factors = factors.dropna(subset=["Consumption", "TotalEnergy"])
+    return factors.set_index(["Period", "Fuel"]).sort_index()
+
+
+class FuelFactorLookup:
+    """
+    Constant-time lookup of fuel-level values by (fuel, period).
+
+    Values are held in dense period x fuel arrays with dictionaries from
+    period and fuel to array positions, so a query is two dictionary
+    lookups and an array index.
+
+    Parameters
+    ----------
+    factors : pd.DataFrame
+        Output of compute_fuel_emission_factors
+    """
+
+    def __init__(self, factors: pd.DataFrame):
+        periods = factors.index.get_level_values("Period")
+        fuels = factors.index.get_level_values("Fuel")
+        self.periods = np.unique(periods)
+        self.fuels = list(pd.unique(fuels))
+        self._period_pos = {period: i for i, period in enumerate(self.periods.tolist())}
+        self._fuel_pos = {fuel: j for j, fuel in enumerate(self.fuels)}
+
+        rows = np.searchsorted(self.periods, periods)
+        cols = np.array([self._fuel_pos[fuel] for fuel in fuels])
+        self.values: Dict[str, np.ndarray] = {}
+        for column in factors.columns:
+            matrix = np.full((len(self.periods), len(self.fuels)), np.nan)
+            matrix[rows, cols] = factors[column].to_numpy()
+            self.values[column] = matrix
+
+    def get(self, fuel: str, period: int, field: str = "EmissionFactor") -> float:
+        """Return one field for a fuel and period (Year, or YYYYMM for monthly data)."""
+        return float(self.values[field][self._period_pos[period], self._fuel_pos[fuel]])
+
+    def series(self, fuel: str, field: str = "EmissionFactor") -> pd.Series:
+        """Return one field for a fuel over all periods."""
+        return pd.Series(self.values[field][:, self._fuel_pos[fuel]], index=self.periods, name=f"{fuel}{field}")
+
+
+@instrument()
 def prepare_full_dataset(
     energy_df: pd.DataFrame,
-    co2_df: pd.DataFrame
+    co2_df: pd.DataFrame,
+    granularity: str = "annual"
 ) -> pd.DataFrame:
     """
     Complete data preparation pipeline: clean, merge, and engineer features.
@@ -196,34 +539,33 @@ def prepare_full_dataset(
         Raw energy data from EIA
     co2_df : pd.DataFrame
         Raw CO2 data from EIA
+    granularity : str
+        "annual" (month code 13) or "monthly" (months 01-12, with seasonal
+        features and rolling 12-month aggregates)
 
     Returns
     -------
     pd.DataFrame
         Clean, merged dataset with engineered features
     """
-    # Process energy data
-    energy_annual = filter_annual_data(energy_df)
-    energy_annual = convert_to_numeric(energy_annual)
-    energy_pivot = pivot_to_wide_format(energy_annual, ENERGY_VARIABLES)
-
-    # Process CO2 data
-    co2_annual = filter_annual_data(co2_df)
-    co2_annual = convert_to_numeric(co2_annual)
-    co2_pivot = pivot_to_wide_format(co2_annual, CO2_VARIABLES)
-
-    # Merge on Year
-    df = pd.merge(energy_pivot, co2_pivot, on="Year", how="inner")
+    # Filter, convert and pivot both tables in one pass
+    df = build_wide_dataset(
+        [energy_df, co2_df], {**ENERGY_VARIABLES, **CO2_VARIABLES}, granularity=granularity
+    )
 
     # Feature engineering
-    df = calculate_energy_shares(df)
-    df = calculate_co2_intensity(df)
+    calculate_energy_shares(df, inplace=True)
+    calculate_co2_intensity(df, inplace=True)
+
+    if granularity == "monthly":
+        add_seasonal_features(df, inplace=True)
+        add_rolling_aggregates(df, inplace=True)
 
     return df
 
 
 if __name__ == "__main__":
-    from data_loader import load_raw_data
+    from .data_loader import load_raw_data
 
     # Load and prepare data
     energy_df, co2_df = load_raw_data()
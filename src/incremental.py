@@ -0,0 +1,310 @@
+"""
+Incremental Refresh Module
+Recomputes only the periods touched by a new MER release.
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import pickle
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional
+
+from .data_loader import decode_yyyymm
+from .data_preparation import (
+    ENERGY_VARIABLES,
+    CO2_VARIABLES,
+    ROLLING_VARIABLES,
+    build_wide_dataset,
+    calculate_energy_shares,
+    calculate_co2_intensity,
+    add_seasonal_features,
+    add_rolling_aggregates
+)
+from .analysis import get_model_features
+from .regression import ols_sufficient_statistics, update_sufficient_statistics
+
+
+STATE_FILENAME = "incremental_state.pkl"
+
+
+def snapshot_raw_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce a raw MER table to the (MSN, YYYYMM, Value) triples used for diffing.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Raw EIA data
+
+    Returns
+    -------
+    pd.DataFrame
+        Compact snapshot with numeric Value
+    """
+    return pd.DataFrame({
+        "MSN": df["MSN"].astype(str).to_numpy(),
+        "YYYYMM": np.asarray(df["YYYYMM"], dtype=np.int32),
+        "Value": pd.to_numeric(df["Value"], errors="coerce").to_numpy(dtype=np.float64)
+    })
+
+
+def diff_raw_tables(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Find (MSN, YYYYMM) keys that were added, removed or revised.
+
+    Parameters
+    ----------
+    old : pd.DataFrame
+        Previous snapshot (see snapshot_raw_table)
+    new : pd.DataFrame
+        Current snapshot
+
+    Returns
+    -------
+    pd.DataFrame
+        Changed keys with a change column ("added", "removed" or "revised")
+    """
+    merged = old.merge(new, on=["MSN", "YYYYMM"], how="outer", suffixes=("_old", "_new"), indicator=True)
+
+    value_old = merged["Value_old"].to_numpy()
+    value_new = merged["Value_new"].to_numpy()
+    same_value = (value_old == value_new) | (np.isnan(value_old) & np.isnan(value_new))
+
+    change = np.select(
+        [merged["_merge"].to_numpy() == "right_only", merged["_merge"].to_numpy() == "left_only", ~same_value],
+        ["added", "removed", "revised"],
+        default=""
+    )
+    changed = change != ""
+
+    return pd.DataFrame({
+        "MSN": merged["MSN"].to_numpy()[changed],
+        "YYYYMM": merged["YYYYMM"].to_numpy()[changed].astype(np.int32),
+        "change": change[changed]
+    })
+
+
+def affected_periods(
+    changes: pd.DataFrame,
+    msns: Iterable[str],
+    granularity: str = "annual",
+    window: int = 12
+) -> np.ndarray:
+    """
+    Map changed raw keys to the rows of the wide dataset they affect.
+
+    Parameters
+    ----------
+    changes : pd.DataFrame
+        Output of diff_raw_tables
+    msns : Iterable[str]
+        MSN codes that feed the wide dataset
+    granularity : str
+        "annual" (rows keyed by Year) or "monthly" (rows keyed by YYYYMM)
+    window : int
+        Rolling window of the monthly aggregates; a changed month also
+        affects the window - 1 months after it
+
+    Returns
+    -------
+    np.ndarray
+        Sorted unique period keys
+    """
+    relevant = changes[changes["MSN"].isin(list(msns))]
+    year, month, is_annual = decode_yyyymm(relevant["YYYYMM"])
+
+    if granularity == "annual":
+        return np.unique(year[is_annual])
+
+    # Month index since year 0, expanded over the rolling window
+    month_index = year[~is_annual].astype(np.int64) * 12 + month[~is_annual] - 1
+    expanded = (month_index[:, None] + np.arange(window)).ravel()
+    return np.unique((expanded // 12) * 100 + expanded % 12 + 1)
+
+
+def period_keys(df: pd.DataFrame, granularity: str = "annual") -> np.ndarray:
+    """Return the period key of each row of a wide dataset (Year or YYYYMM)."""
+    if granularity == "monthly":
+        return df["Year"].to_numpy().astype(np.int64) * 100 + df["Month"].to_numpy()
+    return df["Year"].to_numpy()
+
+
+def refresh_wide_dataset(
+    previous: pd.DataFrame,
+    tables: Iterable[pd.DataFrame],
+    periods: np.ndarray,
+    granularity: str = "annual"
+) -> pd.DataFrame:
+    """
+    Recompute only the given periods of a prepared dataset.
+
+    Parameters
+    ----------
+    previous : pd.DataFrame
+        Dataset from the previous run (prepare_full_dataset output)
+    tables : Iterable[pd.DataFrame]
+        Current raw EIA tables
+    periods : np.ndarray
+        Period keys to recompute (see affected_periods)
+    granularity : str
+        "annual" or "monthly"
+
+    Returns
+    -------
+    pd.DataFrame
+        Dataset equal to a full prepare_full_dataset run on the new tables
+    """
+    subsets = []
+    for table in tables:
+        year, month, _ = decode_yyyymm(table["YYYYMM"])
+        key = year if granularity == "annual" else year * 100 + month
+        subsets.append(table[np.isin(key, periods)])
+
+    mapping = {**ENERGY_VARIABLES, **CO2_VARIABLES}
+    updated = build_wide_dataset(subsets, mapping, granularity=granularity)
+    calculate_energy_shares(updated, inplace=True)
+    calculate_co2_intensity(updated, inplace=True)
+    if granularity == "monthly":
+        add_seasonal_features(updated, inplace=True)
+
+    kept = previous[~np.isin(period_keys(previous, granularity), periods)]
+    df = pd.concat([kept, updated[updated.columns.intersection(kept.columns)]], ignore_index=True)
+    df = df.sort_values("Period" if granularity == "monthly" else "Year", ignore_index=True)
+
+    if granularity == "monthly":
+        # Rolling sums are a cheap vectorised pass over the whole series
+        add_rolling_aggregates(df, ROLLING_VARIABLES, inplace=True)
+
+    return df
+
+
+def load_state(state_dir: str) -> Optional[Dict[str, Any]]:
+    """Load the state saved by the previous incremental run, if any."""
+    path = Path(state_dir) / STATE_FILENAME
+    if not path.exists():
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def save_state(state_dir: str, state: Dict[str, Any]):
+    """Save the state for the next incremental run."""
+    path = Path(state_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / STATE_FILENAME, "wb") as f:
+        pickle.dump(state, f)
+
+
+def build_state(
+    tables: Dict[str, pd.DataFrame],
+    df: pd.DataFrame,
+    granularity: str = "annual",
+    ols_statistics: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Assemble the state needed by the next incremental run.
+
+    Parameters
+    ----------
+    tables : Dict[str, pd.DataFrame]
+        Raw EIA tables by name
+    df : pd.DataFrame
+        Prepared dataset
+    granularity : str
+        "annual" or "monthly"
+    ols_statistics : Optional[Dict[str, Any]]
+        Sufficient statistics of the full linear model (computed if None)
+
+    Returns
+    -------
+    Dict[str, Any]
+        State dictionary for save_state
+    """
+    features = get_model_features(granularity)
+    if ols_statistics is None:
+        ols_statistics = ols_sufficient_statistics(df[features], df["CO2Intensity"])
+
+    return {
+        "granularity": granularity,
+        "raw": {name: snapshot_raw_table(table) for name, table in tables.items()},
+        "prepared": df,
+        "ols_statistics": ols_statistics
+    }
+
+
+def incremental_refresh(
+    state: Dict[str, Any],
+    tables: Dict[str, pd.DataFrame],
+    granularity: str = "annual"
+) -> Dict[str, Any]:
+    """
+    Bring a previous run's dataset and regression statistics up to date.
+
+    Raw tables are diffed per (MSN, YYYYMM) against the stored snapshot;
+    only the affected periods of the wide dataset are recomputed, and the
+    full-model OLS statistics are updated by removing the old rows and
+    adding the new ones.
+
+    Parameters
+    ----------
+    state : Dict[str, Any]
+        State from the previous run (see build_state)
+    tables : Dict[str, pd.DataFrame]
+        Current raw EIA tables by name
+    granularity : str
+        "annual" or "monthly"; must match the stored state
+
+    Returns
+    -------
+    Dict[str, Any]
+        Refreshed dataset (df), whether anything changed (changed), the
+        recomputed period keys (periods), updated OLS statistics and the
+        new state
+    """
+    if state["granularity"] != granularity or set(state["raw"]) != set(tables):
+        raise ValueError("Stored incremental state does not match this run; rebuild it")
+
+    msns = list(ENERGY_VARIABLES) + list(CO2_VARIABLES)
+    snapshots = {name: snapshot_raw_table(table) for name, table in tables.items()}
+    periods = np.unique(np.concatenate([
+        affected_periods(diff_raw_tables(state["raw"][name], snapshots[name]), msns, granularity)
+        for name in tables
+    ]))
+
+    previous = state["prepared"]
+    if len(periods) == 0:
+        return {
+            "df": previous,
+            "changed": False,
+            "periods": periods,
+            "ols_statistics": state["ols_statistics"],
+            "state": state
+        }
+
+    df = refresh_wide_dataset(previous, tables.values(), periods, granularity)
+
+    features = get_model_features(granularity)
+    old_rows = previous[np.isin(period_keys(previous, granularity), periods)]
+    new_rows = df[np.isin(period_keys(df, granularity), periods)]
+    ols_statistics = update_sufficient_statistics(
+        state["ols_statistics"],
+        X_add=new_rows[features], y_add=new_rows["CO2Intensity"],
+        X_remove=old_rows[features], y_remove=old_rows["CO2Intensity"]
+    )
+
+    new_state = {
+        "granularity": granularity,
+        "raw": snapshots,
+        "prepared": df,
+        "ols_statistics": ols_statistics
+    }
+
+    return {
+        "df": df,
+        "changed": True,
+        "periods": periods,
+        "ols_statistics": ols_statistics,
+        "state": new_state
+    }
@@ -0,0 +1,319 @@
+"""
+Instrumentation Module
+Wall time, CPU time, memory and shape records for pipeline stages.
+
+Spans are opened with the span() context manager or the instrument()
+decorator. Nothing is recorded, and tracemalloc is not started, until
+enable() is called; while disabled, span() returns a shared no-op context
+and instrumented functions only pay one global lookup. Tracing memory
+slows allocation-heavy code (e.g. plotting) several-fold, so wall times
+are only comparable between runs with the same trace_memory setting.
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# Recorder of the current run (None while instrumentation is disabled)
+_RECORDER = None
+
+# Returned by span() while disabled
+_NULL_SPAN = nullcontext()
+
+# ru_maxrss is reported in kilobytes on Linux
+RSS_UNIT_MB = 1 / 1024
+
+
+def describe_shape(value: Any) -> Any:
+    """Summarise the shape of a stage input or output (None if it has none)."""
+    if hasattr(value, "shape"):
+        return list(value.shape)
+    if isinstance(value, (list, tuple)):
+        shapes = [describe_shape(item) for item in value]
+        return shapes if any(shape is not None for shape in shapes) else None
+    if isinstance(value, dict):
+        shapes = {str(key): describe_shape(item) for key, item in value.items()}
+        shapes = {key: shape for key, shape in shapes.items() if shape is not None}
+        return shapes or None
+    return None
+
+
+class Recorder:
+    """
+    Collect finished spans of one run.
+
+    Memory peaks come from tracemalloc: when a child span starts, the
+    traced peak so far is credited to its parent and the peak is reset,
+    so every span reports the peak reached while it was open (relative to
+    the memory traced when it started). tracemalloc is process-wide, so
+    only spans on the main thread measure memory; spans on other threads
+    (e.g. loader pools) have no peak and are nested under the innermost
+    span open on the main thread. If other code stops tracemalloc, it is
+    restarted and spans open at the time report no peak.
+
+    Parameters
+    ----------
+    trace_memory : bool
+        Record memory peaks (peak_memory_mb is None otherwise)
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.origin = time.perf_counter()
+        self.records: List[Dict[str, Any]] = []
+        self.trace_memory = trace_memory
+        self._local = threading.local()
+        self._main_stack: List[Dict[str, Any]] = []
+        self._main_thread = threading.main_thread().ident
+        self._started_tracemalloc = trace_memory and not tracemalloc.is_tracing()
+        # Incremented whenever tracing is (re)started; peaks are only
+        # comparable within one session
+        self._session = 0
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        if threading.get_ident() == self._main_thread:
+            return self._main_stack
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _traced_memory(self) -> Tuple[int, int]:
+        """Current and peak traced memory, restarting tracing if it was stopped."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+            self._session += 1
+        return tracemalloc.get_traced_memory()
+
+    def credit_peak(self):
+        """Credit the traced peak so far to the open main-thread span, then reset it."""
+        if self._main_stack and self._main_stack[-1]["session"] is not None:
+            _, peak = self._traced_memory()
+            self._main_stack[-1]["peak"] = max(self._main_stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+
+    def open(self, name: str, inputs: Any = None) -> Dict[str, Any]:
+        stack = self._stack()
+        on_main = stack is self._main_stack
+        if stack:
+            parent, depth = stack[-1]["name"], stack[-1]["depth"] + 1
+        elif not on_main and self._main_stack:
+            parent, depth = self._main_stack[-1]["name"], self._main_stack[-1]["depth"] + 1
+        else:
+            parent, depth = None, 0
+
+        current, session = 0, None
+        if self.trace_memory and on_main:
+            self.credit_peak()
+            current, _ = self._traced_memory()
+            session = self._session
+
+        frame = {
+            "name": name,
+            "parent": parent,
+            "depth": depth,
+            "inputs": inputs,
+            "start": time.perf_counter(),
+            "cpu_start": time.process_time(),
+            "session": session,
+            "memory_start": current,
+            "peak": current
+        }
+        stack.append(frame)
+        return frame
+
+    def close(self, frame: Dict[str, Any], output: Any = None):
+        end, cpu_end = time.perf_counter(), time.process_time()
+        stack = self._stack()
+        stack.pop()
+
+        peak_mb = None
+        if frame["session"] is not None:
+            _, peak = self._traced_memory()
+            if frame["session"] == self._session:
+                frame["peak"] = max(frame["peak"], peak)
+                peak_mb = (frame["peak"] - frame["memory_start"]) / 2 ** 20
+                if stack and stack[-1]["session"] == self._session:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+
+        self.records.append({
+            "name": frame["name"],
+            "parent": frame["parent"],
+            "depth": frame["depth"],
+            "start_seconds": frame["start"] - self.origin,
+            "wall_seconds": end - frame["start"],
+            "cpu_seconds": cpu_end - frame["cpu_start"],
+            "peak_memory_mb": peak_mb,
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT_MB if resource else None,
+            "inputs": describe_shape(frame["inputs"]),
+            "output": describe_shape(output),
+            "thread": threading.get_ident()
+        })
+
+    def stop(self):
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class _Span:
+    """Context manager recording one span; set .output to record an output shape."""
+
+    def __init__(self, recorder: Recorder, name: str, inputs: Any):
+        self.recorder = recorder
+        self.name = name
+        self.inputs = inputs
+        self.output = None
+
+    def __enter__(self):
+        self.frame = self.recorder.open(self.name, self.inputs)
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.close(self.frame, self.output)
+        return False
+
+
+def enable(trace_memory: bool = True) -> Recorder:
+    """Start recording spans (and, if trace_memory, memory allocations)."""
+    global _RECORDER
+    if _RECORDER is None:
+        _RECORDER = Recorder(trace_memory)
+    return _RECORDER
+
+
+def disable() -> Optional[Recorder]:
+    """Stop recording and return the recorder with the spans collected so far."""
+    global _RECORDER
+    recorder, _RECORDER = _RECORDER, None
+    if recorder is not None:
+        recorder.stop()
+    return recorder
+
+
+def reset_memory_peak():
+    """
+    Reset the tracemalloc peak without losing it for the open spans.
+
+    Code measuring its own peak while tracing is already on (e.g.
+    model_selection.fit_fold) calls this instead of tracemalloc.reset_peak().
+    """
+    if _RECORDER is not None and threading.get_ident() == _RECORDER._main_thread:
+        _RECORDER.credit_peak()
+    else:
+        tracemalloc.reset_peak()
+
+
+def is_enabled() -> bool:
+    """Whether spans are currently recorded."""
+    return _RECORDER is not None
+
+
+def span(name: str, inputs: Any = None):
+    """
+    Record a block of code as a span.
+
+    Parameters
+    ----------
+    name : str
+        Span name
+    inputs : Any
+        Objects whose shapes are recorded as the span's inputs
+
+    Example
+    -------
+    >>> with span("fit", inputs=X) as s:
+    ...     s.output = model.predict(X)
+    """
+    if _RECORDER is None:
+        return _NULL_SPAN
+    return _Span(_RECORDER, name, inputs)
+
+
+def instrument(name: Optional[str] = None) -> Callable:
+    """
+    Decorate a function so each call is recorded as a span.
+
+    Shapes of array-like positional arguments and of the return value are
+    recorded. While disabled the wrapper calls the function directly.
+
+    Parameters
+    ----------
+    name : Optional[str]
+        Span name (default: the function's qualified name)
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _RECORDER
+            if recorder is None:
+                return func(*args, **kwargs)
+            frame = recorder.open(span_name, [arg for arg in args if hasattr(arg, "shape")])
+            output = None
+            try:
+                output = func(*args, **kwargs)
+                return output
+            finally:
+                recorder.close(frame, output)
+
+        return wrapper
+    return decorator
+
+
+def write_jsonl(records: List[Dict[str, Any]], path: Union[str, Path]) -> Path:
+    """Write span records as JSON lines, in start order."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for record in sorted(records, key=lambda r: r["start_seconds"]):
+            f.write(json.dumps(record) + "\n")
+    return path
+
+
+def write_chrome_trace(records: List[Dict[str, Any]], path: Union[str, Path]) -> Path:
+    """Write span records in Chrome trace-event format (chrome://tracing, Perfetto)."""
+    events = [
+        {
+            "name": record["name"],
+            "ph": "X",
+            "ts": record["start_seconds"] * 1e6,
+            "dur": record["wall_seconds"] * 1e6,
+            "pid": os.getpid(),
+            "tid": record["thread"],
+            "args": {key: record[key] for key in ("cpu_seconds", "peak_memory_mb", "max_rss_mb", "inputs", "output")}
+        }
+        for record in records
+    ]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+    return path
+
+
+def summarize(records: List[Dict[str, Any]], max_depth: int = 0) -> str:
+    """Return a table of spans up to max_depth, in start order."""
+    lines = [f"  {'Span':<32} {'Wall (s)':>9} {'CPU (s)':>9} {'Peak (MB)':>10}"]
+    for record in sorted(records, key=lambda r: r["start_seconds"]):
+        if record["depth"] <= max_depth:
+            label = "  " * record["depth"] + record["name"]
+            peak = "-" if record["peak_memory_mb"] is None else f"{record['peak_memory_mb']:.1f}"
+            lines.append(
+                f"  {label:<32} {record['wall_seconds']:>9.3f} {record['cpu_seconds']:>9.3f} {peak:>10}"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,285 @@
+"""
+Model Selection Module
+Walk-forward cross-validation and hyperparameter sweeps with cached folds.
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import importlib
+import itertools
+import pickle
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from .instrumentation import reset_memory_peak
+from .pipeline import fingerprint_object
+
+
+# Model families available to the sweep; estimators are imported on first use
+MODEL_FAMILIES = {
+    "linear": "sklearn.linear_model.LinearRegression",
+    "ridge": "sklearn.linear_model.Ridge",
+    "decision_tree": "sklearn.tree.DecisionTreeRegressor",
+    "random_forest": "sklearn.ensemble.RandomForestRegressor",
+    "gradient_boosting": "sklearn.ensemble.GradientBoostingRegressor"
+}
+
+# Hyperparameter grid per family; fixed settings are single-value lists
+DEFAULT_SEARCH_SPACE = {
+    "linear": {},
+    "ridge": {"alpha": [0.1, 1.0, 10.0]},
+    "decision_tree": {
+        "max_depth": [2, 3, 4, 6, None],
+        "min_samples_leaf": [1, 3, 5],
+        "random_state": [42]
+    },
+    "random_forest": {
+        "n_estimators": [50],
+        "max_depth": [3, None],
+        "min_samples_leaf": [1, 3],
+        "random_state": [42]
+    },
+    "gradient_boosting": {
+        "n_estimators": [100],
+        "max_depth": [2, 3],
+        "learning_rate": [0.1],
+        "random_state": [42]
+    }
+}
+
+# Single-tree and linear families only: the sweep run by run_full_analysis
+QUICK_SEARCH_SPACE = {
+    family: DEFAULT_SEARCH_SPACE[family] for family in ("linear", "ridge", "decision_tree")
+}
+
+
+def model_class(family: str) -> type:
+    """Import and return the estimator class of a model family."""
+    module, _, name = MODEL_FAMILIES[family].rpartition(".")
+    return getattr(importlib.import_module(module), name)
+
+
+def expand_search_space(search_space: Dict[str, Dict[str, List[Any]]]) -> List[Dict[str, Any]]:
+    """
+    List every (family, parameters) configuration of a search space.
+
+    Parameters
+    ----------
+    search_space : Dict[str, Dict[str, List[Any]]]
+        Family name -> parameter name -> candidate values
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        Configurations with family and params
+    """
+    configs = []
+    for family, grid in search_space.items():
+        names = sorted(grid)
+        for values in itertools.product(*(grid[name] for name in names)):
+            configs.append({"family": family, "params": dict(zip(names, values))})
+    return configs
+
+
+def walk_forward_folds(n_rows: int, n_splits: int = 5) -> List[Dict[str, int]]:
+    """
+    Expanding-window train/test folds in time order (TimeSeriesSplit).
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of observations
+    n_splits : int
+        Number of folds
+
+    Returns
+    -------
+    List[Dict[str, int]]
+        Folds with train_stop and test_start/test_stop row positions
+    """
+    folds = []
+    from sklearn.model_selection import TimeSeriesSplit
+
+    for train, test in TimeSeriesSplit(n_splits=n_splits).split(np.arange(n_rows)):
+        folds.append({"train_stop": int(train[-1]) + 1, "test_start": int(test[0]), "test_stop": int(test[-1]) + 1})
+    return folds
+
+
+def fit_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fit one configuration on one fold and score it out of sample.
+
+    Wall-clock and CPU time cover the fit and prediction only. Peak
+    traced memory is measured on a second fit of a fresh model, so the
+    tracing overhead does not inflate the times; when tracemalloc is
+    already tracing (e.g. under main.py --trace) its peak is reset and
+    measured against the memory traced before the fit.
+
+    Parameters
+    ----------
+    task : Dict[str, Any]
+        family, params, X_train, y_train, X_test, y_test
+
+    Returns
+    -------
+    Dict[str, Any]
+        Out-of-sample r2, rmse and mae, fit_seconds, cpu_seconds and
+        peak_memory_mb
+    """
+    from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+
+    estimator = model_class(task["family"])
+
+    model = estimator(**task["params"])
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    model.fit(task["X_train"], task["y_train"])
+    y_pred = model.predict(task["X_test"])
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    else:
+        reset_memory_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    model = estimator(**task["params"])
+    model.fit(task["X_train"], task["y_train"])
+    model.predict(task["X_test"])
+    _, peak = tracemalloc.get_traced_memory()
+    if started:
+        tracemalloc.stop()
+
+    y_test = task["y_test"]
+    return {
+        "r2": r2_score(y_test, y_pred) if len(y_test) > 1 else np.nan,
+        "rmse": np.sqrt(mean_squared_error(y_test, y_pred)),
+        "mae": mean_absolute_error(y_test, y_pred),
+        "fit_seconds": wall,
+        "cpu_seconds": cpu,
+        "peak_memory_mb": (peak - baseline) / 2 ** 20
+    }
+
+
+def cross_validate_models(
+    X: pd.DataFrame,
+    y: pd.Series,
+    search_space: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+    n_splits: int = 5,
+    workers: int = 1,
+    cache_dir: Optional[str] = None,
+    keep: int = 5
+) -> Dict[str, pd.DataFrame]:
+    """
+    Walk-forward cross-validation of every configuration in a search space.
+
+    Each (configuration, fold) fit is keyed by a fingerprint of the model
+    family, parameters, fold data and scikit-learn version. Results found
+    in cache_dir are reused; the remaining fits run in parallel processes
+    when workers > 1. After the sweep the cache is pruned to the most
+    recently used keep x (configurations x folds) entries, so it holds
+    about the last keep sweeps however often the data is revised.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Feature matrix, in time order
+    y : pd.Series
+        Target variable
+    search_space : Optional[Dict[str, Dict[str, List[Any]]]]
+        Family -> parameter grid (default: DEFAULT_SEARCH_SPACE)
+    n_splits : int
+        Number of walk-forward folds
+    workers : int
+        Number of worker processes (1 fits in this process)
+    cache_dir : Optional[str]
+        Directory for cached fold results (caching disabled if None)
+    keep : int
+        Number of sweeps' worth of fold results kept in cache_dir
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        folds (one row per configuration and fold) and summary (mean
+        out-of-sample metrics and cost per configuration, best RMSE first)
+    """
+    import sklearn
+
+    configs = expand_search_space(search_space if search_space is not None else DEFAULT_SEARCH_SPACE)
+    folds = walk_forward_folds(len(X), n_splits)
+    values = X.to_numpy(dtype=np.float64)
+    target = np.asarray(y, dtype=np.float64)
+    cache_path = Path(cache_dir) if cache_dir is not None else None
+
+    tasks, keys = [], []
+    for config_id, config in enumerate(configs):
+        for fold_id, fold in enumerate(folds):
+            task = {
+                "family": config["family"],
+                "params": config["params"],
+                "X_train": values[:fold["train_stop"]],
+                "y_train": target[:fold["train_stop"]],
+                "X_test": values[fold["test_start"]:fold["test_stop"]],
+                "y_test": target[fold["test_start"]:fold["test_stop"]]
+            }
+            tasks.append((config_id, fold_id, task))
+            keys.append(fingerprint_object({**task, "sklearn": sklearn.__version__}))
+
+    results: Dict[int, Dict[str, Any]] = {}
+    if cache_path is not None:
+        for i, key in enumerate(keys):
+            entry = cache_path / f"{key[:20]}.pkl"
+            if entry.exists():
+                with open(entry, "rb") as f:
+                    results[i] = {**pickle.load(f), "cached": True}
+                # Mark as recently used, so pruning keeps it
+                entry.touch()
+
+    pending = [i for i in range(len(tasks)) if i not in results]
+    pending_tasks = [tasks[i][2] for i in pending]
+    if workers <= 1 or len(pending) <= 1:
+        fitted = [fit_fold(task) for task in pending_tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            fitted = list(pool.map(fit_fold, pending_tasks, chunksize=max(1, len(pending) // (4 * workers))))
+
+    for i, result in zip(pending, fitted):
+        results[i] = {**result, "cached": False}
+        if cache_path is not None:
+            cache_path.mkdir(parents=True, exist_ok=True)
+            with open(cache_path / f"{keys[i][:20]}.pkl", "wb") as f:
+                pickle.dump(result, f)
+
+    if cache_path is not None and cache_path.exists():
+        entries = sorted(cache_path.glob("*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in entries[keep * len(keys):]:
+            old.unlink()
+
+    records = []
+    for i, (config_id, fold_id, task) in enumerate(tasks):
+        records.append({
+            "config": config_id,
+            "family": task["family"],
+            "params": repr(task["params"]),
+            "fold": fold_id,
+            "train_size": len(task["y_train"]),
+            "test_size": len(task["y_test"]),
+            **results[i]
+        })
+    fold_table = pd.DataFrame(records)
+
+    summary = fold_table.groupby(["config", "family", "params"], as_index=False).agg(
+        r2=("r2", "mean"),
+        rmse=("rmse", "mean"),
+        mae=("mae", "mean"),
+        rmse_std=("rmse", "std"),
+        fit_seconds=("fit_seconds", "sum"),
+        cpu_seconds=("cpu_seconds", "sum"),
+        peak_memory_mb=("peak_memory_mb", "max")
+    ).sort_values("rmse", ignore_index=True)
+
+    return {"folds": fold_table, "summary": summary}
@@ -0,0 +1,300 @@
+"""
+Pipeline Module
+Stage runner with content-addressed caching of stage outputs.
+
+Usage:
+    python -m src.pipeline
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import hashlib
+import inspect
+import pickle
+import sys
+import types
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .instrumentation import span
+
+
+def fingerprint_object(obj: Any) -> str:
+    """
+    Compute a content hash of a stage input or output.
+
+    DataFrames and Series are hashed by values, index, column names and
+    dtypes (or pickled when they hold unhashable cells such as lists);
+    arrays by their bytes; containers recursively; anything else by its
+    pickle.
+
+    Parameters
+    ----------
+    obj : Any
+        Object to fingerprint
+
+    Returns
+    -------
+    str
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+
+    def update_values(value: Any):
+        try:
+            digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        except TypeError:
+            digest.update(pickle.dumps(value))
+
+    def update(value: Any):
+        if isinstance(value, pd.DataFrame):
+            digest.update(b"DataFrame")
+            digest.update(repr(list(value.columns)).encode())
+            digest.update(repr(value.dtypes.astype(str).tolist()).encode())
+            update_values(value)
+        elif isinstance(value, pd.Series):
+            digest.update(b"Series")
+            digest.update(repr((value.name, str(value.dtype))).encode())
+            update_values(value)
+        elif isinstance(value, np.ndarray):
+            digest.update(b"ndarray")
+            digest.update(repr((value.dtype.str, value.shape)).encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, dict):
+            digest.update(b"dict")
+            for key in sorted(value, key=repr):
+                digest.update(repr(key).encode())
+                update(value[key])
+        elif isinstance(value, (list, tuple)):
+            digest.update(type(value).__name__.encode())
+            for item in value:
+                update(item)
+        elif isinstance(value, (str, bytes, int, float, bool, type(None))):
+            digest.update(repr(value).encode())
+        else:
+            digest.update(pickle.dumps(value))
+
+    update(obj)
+    return digest.hexdigest()
+
+
+# Top-level package of this module; code in its modules is fingerprinted
+_PACKAGE = __name__.split(".")[0]
+
+# Module name -> source hash, computed once per process
+_MODULE_SOURCES: Dict[str, str] = {}
+
+
+def _project_module(obj: Any) -> Optional[types.ModuleType]:
+    """Return the module defining obj if it is a module of this project's package."""
+    if isinstance(obj, types.ModuleType):
+        module = obj
+    elif isinstance(obj, (types.FunctionType, type)):
+        module = sys.modules.get(obj.__module__)
+    else:
+        return None
+    if module is None or module.__name__.split(".")[0] != _PACKAGE:
+        return None
+    path = getattr(module, "__file__", None)
+    return module if path is not None and Path(path).is_file() else None
+
+
+def _referenced(code: types.CodeType, namespace: Dict[str, Any]) -> List[Any]:
+    """Objects a code object (and the code nested in it) looks up by global name."""
+    found = [namespace[name] for name in code.co_names if name in namespace]
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            found += _referenced(const, namespace)
+    return found
+
+
+def _function_source(func: Callable[..., Any]) -> str:
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return getattr(func, "__qualname__", repr(func))
+
+
+def _dependencies(func: Callable[..., Any]) -> List[Any]:
+    """Objects a function closes over or references by global name."""
+    found = list((func.__closure__ and [cell.cell_contents for cell in func.__closure__]) or [])
+    if hasattr(func, "__code__"):
+        found += _referenced(func.__code__, func.__globals__)
+    return found
+
+
+def code_fingerprint(func: Callable[..., Any]) -> str:
+    """
+    Hash the source code a stage function depends on.
+
+    Covers the function's own source and the source of every project
+    module reachable from it: the modules of the functions, classes and
+    modules it references by global name or closes over, and
+    transitively the project objects those modules hold. Functions of the
+    script being run (e.g. the stages defined in main.py) contribute only
+    their own source and what they reference, so unrelated edits to the
+    script do not invalidate every stage. Third-party modules are not
+    included.
+
+    Parameters
+    ----------
+    func : Callable
+        Stage function
+
+    Returns
+    -------
+    str
+        Hex SHA-256 digest
+    """
+    pending = _dependencies(func)
+    module = _project_module(func)
+    if module is not None:
+        pending.append(module)
+
+    script_sources, seen = [], {id(func)}
+    modules: Dict[str, types.ModuleType] = {}
+    while pending:
+        obj = pending.pop()
+        if isinstance(obj, types.FunctionType) and obj.__module__ == "__main__":
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                script_sources.append(_function_source(obj))
+                pending += _dependencies(obj)
+            continue
+        module = _project_module(obj)
+        if module is None or module.__name__ in modules:
+            continue
+        modules[module.__name__] = module
+        pending += list(vars(module).values())
+
+    sources = {}
+    for name, module in modules.items():
+        if name not in _MODULE_SOURCES:
+            _MODULE_SOURCES[name] = hashlib.sha256(Path(module.__file__).read_bytes()).hexdigest()
+        sources[name] = _MODULE_SOURCES[name]
+    return fingerprint_object({
+        "source": _function_source(func),
+        "script": sorted(script_sources),
+        "modules": sources
+    })
+
+
+class StageRunner:
+    """
+    Run named pipeline stages, reusing cached outputs when inputs are unchanged.
+
+    A stage's cache key combines its name, version, parameters, the
+    fingerprints of its inputs and the fingerprint of its code (see
+    code_fingerprint), so editing the stage or any project module it uses
+    invalidates its cache. Outputs of upstream stages are passed as
+    inputs downstream, so a change propagates only to the stages that
+    actually depend on it. Stage functions should take all configuration
+    through inputs and params: values they close over are not hashed.
+
+    Parameters
+    ----------
+    cache_dir : Optional[str]
+        Directory for cached stage outputs (caching disabled if None)
+    force : bool
+        Ignore cached outputs and re-run every stage
+    keep : int
+        Number of cached entries kept per stage
+    """
+
+    def __init__(self, cache_dir: Optional[str] = "data/cache/stages", force: bool = False, keep: int = 5):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.force = force
+        self.keep = keep
+        self.log: List[Dict[str, Any]] = []
+        # id -> (object, fingerprint); the object is held so its id stays unique
+        self._output_fingerprints: Dict[int, Any] = {}
+
+    def _fingerprint(self, value: Any) -> str:
+        # Outputs of earlier stages are fingerprinted once and remembered
+        known = self._output_fingerprints.get(id(value))
+        return known[1] if known is not None else fingerprint_object(value)
+
+    def run(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        inputs: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        version: str = "1",
+        outputs_exist: Optional[Sequence[str]] = None
+    ) -> Any:
+        """
+        Run a stage or return its cached output.
+
+        Parameters
+        ----------
+        name : str
+            Stage name
+        func : Callable
+            Stage function, called as func(**inputs, **params)
+        inputs : Optional[Dict[str, Any]]
+            Data inputs (usually outputs of earlier stages)
+        params : Optional[Dict[str, Any]]
+            Configuration parameters
+        version : str
+            Bump to invalidate cached outputs for reasons the code
+            fingerprint does not see (e.g. a third-party library change)
+        outputs_exist : Optional[Sequence[str]]
+            Files the stage writes; a cache hit also requires them to exist
+
+        Returns
+        -------
+        Any
+            Stage output
+        """
+        inputs = inputs or {}
+        params = params or {}
+
+        # Cache hits are recorded too, so traces show where time was saved
+        with span(f"stage:{name}", inputs):
+            key_parts = {
+                "stage": name,
+                "version": version,
+                "code": code_fingerprint(func),
+                "params": fingerprint_object(params),
+                "inputs": {arg: self._fingerprint(value) for arg, value in inputs.items()}
+            }
+            key = fingerprint_object(key_parts)
+            entry = self.cache_dir / f"{name}-{key[:20]}.pkl" if self.cache_dir is not None else None
+
+            files_present = all(Path(path).exists() for path in (outputs_exist or []))
+            if entry is not None and not self.force and files_present and entry.exists():
+                with open(entry, "rb") as f:
+                    cached = pickle.load(f)
+                output = cached["output"]
+                self._output_fingerprints[id(output)] = (output, cached["fingerprint"])
+                self.log.append({"stage": name, "status": "hit", "key": key[:12]})
+                return output
+
+            output = func(**inputs, **params)
+            output_fingerprint = fingerprint_object(output)
+            self._output_fingerprints[id(output)] = (output, output_fingerprint)
+            self.log.append({"stage": name, "status": "miss", "key": key[:12]})
+
+            if entry is not None:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                with open(entry, "wb") as f:
+                    pickle.dump({"output": output, "fingerprint": output_fingerprint}, f)
+                self._prune(name)
+
+            return output
+
+    def _prune(self, name: str):
+        entries = sorted(self.cache_dir.glob(f"{name}-*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in entries[self.keep:]:
+            old.unlink()
+
+    def explain(self) -> str:
+        """Return a table of which stages hit or missed the cache."""
+        width = max([len("Stage")] + [len(record["stage"]) for record in self.log])
+        lines = [f"  {'Stage':<{width}} {'Cache':<6} Key"]
+        for record in self.log:
+            lines.append(f"  {record['stage']:<{width}} {record['status']:<6} {record['key']}")
+        return "\n".join(lines)
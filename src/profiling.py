@@ -0,0 +1,334 @@
+"""
+Profiling Module
+Single-pass, chunk-wise data-quality profiling of raw MER tables with a
+machine-readable report and a quality gate.
+
+Usage:
+    python -m src.profiling
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Union
+
+from .data_loader import MER_SENTINELS, ANNUAL_MONTH_CODE, decode_yyyymm
+from .instrumentation import instrument
+
+
+# Gate thresholds: a table fails when a measure exceeds its threshold;
+# None reports the measure without gating on it
+QUALITY_THRESHOLDS = {
+    "coercion_failure_rate": 0.0,   # Values that are neither numbers nor EIA sentinels
+    "invalid_periods": 0,           # YYYYMM codes that are not YYYY01-YYYY13
+    "duplicate_keys": None,         # Repeated (MSN, YYYYMM) keys (e.g. NUETBUS in two columns)
+    "conflicting_keys": 0,          # Repeated keys whose values disagree
+    "missing_periods": None         # Internal gaps in an MSN's annual or monthly series
+}
+
+# Examples of duplicate keys and gaps kept in the report
+MAX_EXAMPLES = 5
+
+# Multiplier packing (MSN id, YYYYMM) into one integer key
+KEY_BASE = 1_000_000
+
+
+class TableProfiler:
+    """
+    Accumulate data-quality statistics over chunks of one MER table.
+
+    Each column of a chunk is scanned once: string values are factorized,
+    and sentinel matching and numeric coercion run on the distinct values
+    only. Per-key state is one packed (MSN, YYYYMM) integer per row, so
+    duplicates and gaps are found across chunk boundaries.
+
+    Parameters
+    ----------
+    name : str
+        Table name used in the report
+    """
+
+    def __init__(self, name: str = "Data"):
+        self.name = name
+        self.rows = 0
+        self.columns: Dict[str, Dict[str, Any]] = {}
+        self.sentinels = dict.fromkeys(MER_SENTINELS, 0)
+        self.numeric = 0
+        self.coercion_failures = 0
+        self.failure_examples: List[str] = []
+        self.min = np.inf
+        self.max = -np.inf
+        self.invalid_periods = 0
+        self.month_counts = np.zeros(ANNUAL_MONTH_CODE + 1, dtype=np.int64)
+        self._msn_ids: Dict[str, int] = {}
+        self._keys: List[np.ndarray] = []
+        self._values: List[np.ndarray] = []
+
+    def update(self, chunk: pd.DataFrame):
+        """Add one chunk of rows (MSN, YYYYMM and Value columns, any dtypes)."""
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            entry = self.columns.setdefault(col, {"dtype": str(chunk[col].dtype), "nulls": 0})
+            entry["nulls"] += int(chunk[col].isna().sum())
+
+        value = self._profile_values(chunk["Value"])
+
+        codes = pd.to_numeric(chunk["YYYYMM"], errors="coerce").to_numpy(dtype=np.float64)
+        valid = ~np.isnan(codes)
+        year, month, _ = decode_yyyymm(np.where(valid, codes, 0).astype(np.int64))
+        valid &= (month >= 1) & (month <= ANNUAL_MONTH_CODE)
+        self.invalid_periods += int((~valid).sum())
+        self.month_counts += np.bincount(month[valid], minlength=ANNUAL_MONTH_CODE + 1)
+
+        msn_codes, msn_uniques = pd.factorize(chunk["MSN"])
+        ids = np.array([self._msn_ids.setdefault(str(m), len(self._msn_ids)) for m in msn_uniques] + [-1])
+        msn_id = ids[msn_codes]
+        keep = valid & (msn_id >= 0)
+
+        self._keys.append(msn_id[keep].astype(np.int64) * KEY_BASE + (year[keep] * 100 + month[keep]))
+        self._values.append(value[keep])
+
+    def _profile_values(self, raw: pd.Series) -> np.ndarray:
+        """Count sentinels and coercion failures and track min/max; return the numeric values."""
+        if raw.dtype.kind in "fiub":
+            value = raw.to_numpy(dtype=np.float64)
+        else:
+            codes, uniques = pd.factorize(raw)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            numeric = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+            text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+
+            for sentinel in MER_SENTINELS:
+                self.sentinels[sentinel] += int(counts[(text == sentinel).to_numpy()].sum())
+            failed = np.isnan(numeric) & ~text.isin(MER_SENTINELS).to_numpy()
+            self.coercion_failures += int(counts[failed].sum())
+            room = MAX_EXAMPLES - len(self.failure_examples)
+            self.failure_examples.extend(text[failed].tolist()[:max(room, 0)])
+
+            value = np.append(numeric, np.nan)[codes]
+
+        present = value[~np.isnan(value)]
+        self.numeric += len(present)
+        if len(present):
+            self.min = min(self.min, float(present.min()))
+            self.max = max(self.max, float(present.max()))
+        return value
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarise everything seen so far.
+
+        Returns
+        -------
+        Dict[str, Any]
+            JSON-serialisable report with rows, columns (dtype, nulls),
+            value statistics (numeric count, sentinels, coercion failures,
+            min/max), period statistics, duplicate and conflicting keys
+            (conflicting examples first) and per-MSN coverage (years,
+            months, gaps)
+        """
+        keys = np.concatenate(self._keys) if self._keys else np.zeros(0, dtype=np.int64)
+        values = np.concatenate(self._values) if self._values else np.zeros(0)
+
+        order = np.argsort(keys, kind="stable")
+        keys, values = keys[order], values[order]
+        unique, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        values_per_key = np.bincount(
+            np.repeat(np.arange(len(unique)), counts), weights=~np.isnan(values), minlength=len(unique)
+        ) > 0
+        duplicates = unique[counts > 1]
+        if len(unique):
+            # Lowest and highest non-missing value of each key (fmin/fmax skip NaN)
+            with np.errstate(invalid="ignore"):
+                low, high = np.fmin.reduceat(values, starts), np.fmax.reduceat(values, starts)
+            conflicting = unique[(counts > 1) & (low != high) & ~np.isnan(low)]
+        else:
+            conflicting = unique
+
+        msn_names = np.array(list(self._msn_ids), dtype=object)
+        msn_id = unique // KEY_BASE
+        period = unique % KEY_BASE
+        year, month = period // 100, period % 100
+        annual = month == ANNUAL_MONTH_CODE
+
+        coverage = {}
+        missing_periods = 0
+        for kind, mask, index in (
+            ("years", annual, year),
+            ("months", ~annual, year * 12 + month - 1)
+        ):
+            ids, idx, per = msn_id[mask], index[mask], period[mask]
+            # Keys are sorted by MSN, then period: gaps are steps > 1 within an MSN
+            step = np.diff(idx)
+            gap = (np.diff(ids) == 0) & (step > 1)
+            missing = np.bincount(ids[1:][gap], weights=step[gap] - 1, minlength=len(msn_names))
+            present = np.bincount(ids, minlength=len(msn_names))
+            with_value = np.bincount(ids, weights=values_per_key[mask], minlength=len(msn_names))
+            missing_periods += int(missing.sum())
+
+            gap_rows = np.flatnonzero(gap)
+            first_rows = np.searchsorted(ids, np.arange(len(msn_names)))
+            for i in np.flatnonzero(present):
+                first, last = first_rows[i], first_rows[i] + present[i] - 1
+                entry = coverage.setdefault(msn_names[i], {})
+                entry[kind] = {
+                    "count": int(present[i]),
+                    "with_value": int(with_value[i]),
+                    "first": int(per[first]),
+                    "last": int(per[last]),
+                    "missing": int(missing[i]),
+                    "gaps": [
+                        [int(per[j]), int(per[j + 1])]
+                        for j in gap_rows[ids[gap_rows] == i][:MAX_EXAMPLES]
+                    ]
+                }
+
+        present_months = np.flatnonzero(self.month_counts)
+        return {
+            "name": self.name,
+            "rows": self.rows,
+            "columns": self.columns,
+            "value": {
+                "numeric": self.numeric,
+                "sentinels": {key: count for key, count in self.sentinels.items() if count},
+                "coercion_failures": self.coercion_failures,
+                "coercion_failure_rate": self.coercion_failures / self.rows if self.rows else 0.0,
+                "failure_examples": self.failure_examples,
+                "min": self.min if self.numeric else None,
+                "max": self.max if self.numeric else None
+            },
+            "periods": {
+                "invalid_periods": self.invalid_periods,
+                "month_codes": {f"{code:02d}": int(self.month_counts[code]) for code in present_months},
+                "has_mixed_granularity": len(present_months) > 1,
+                "first": int(period.min()) if len(period) else None,
+                "last": int(period.max()) if len(period) else None
+            },
+            "duplicate_keys": int(len(duplicates)),
+            "conflicting_keys": int(len(conflicting)),
+            "duplicate_examples": [
+                [msn_names[key // KEY_BASE], int(key % KEY_BASE)]
+                for key in (conflicting if len(conflicting) else duplicates)[:MAX_EXAMPLES]
+            ],
+            "missing_periods": missing_periods,
+            "msns": coverage
+        }
+
+
+def iterate_chunks(
+    source: Union[str, Path, pd.DataFrame],
+    chunksize: int = 100_000
+) -> Iterable[pd.DataFrame]:
+    """Yield a table in chunks: CSV files are streamed as text, DataFrames are sliced."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    else:
+        yield from pd.read_csv(source, dtype=str, chunksize=chunksize)
+
+
+@instrument()
+def profile_table(
+    source: Union[str, Path, pd.DataFrame],
+    name: Optional[str] = None,
+    chunksize: int = 100_000
+) -> Dict[str, Any]:
+    """
+    Profile one MER table in a single pass over its chunks.
+
+    Parameters
+    ----------
+    source : str, Path or pd.DataFrame
+        MER CSV file (streamed as text, so sentinels and malformed values
+        are seen as written) or an already loaded table
+    name : Optional[str]
+        Table name used in the report (default: file stem)
+    chunksize : int
+        Rows per chunk
+
+    Returns
+    -------
+    Dict[str, Any]
+        Report (see TableProfiler.report)
+
+    Example
+    -------
+    >>> report = profile_table("data/raw/MER_T08_01.csv")
+    """
+    if name is None:
+        name = Path(source).stem if not isinstance(source, pd.DataFrame) else "Data"
+    profiler = TableProfiler(name)
+    for chunk in iterate_chunks(source, chunksize):
+        profiler.update(chunk)
+    return profiler.report()
+
+
+def profile_sources(
+    tables: Dict[str, Union[str, Path, pd.DataFrame]],
+    chunksize: int = 100_000
+) -> Dict[str, Dict[str, Any]]:
+    """Profile every table (file path or DataFrame) by name."""
+    return {name: profile_table(source, name, chunksize) for name, source in tables.items()}
+
+
+def check_quality(
+    reports: Dict[str, Dict[str, Any]],
+    thresholds: Optional[Dict[str, Optional[float]]] = None
+) -> Dict[str, Any]:
+    """
+    Gate profiling reports against quality thresholds.
+
+    Parameters
+    ----------
+    reports : Dict[str, Dict[str, Any]]
+        Reports by table name (see profile_sources)
+    thresholds : Optional[Dict[str, Optional[float]]]
+        Measure -> largest acceptable value (default: QUALITY_THRESHOLDS)
+
+    Returns
+    -------
+    Dict[str, Any]
+        passed flag and failures (table, check, value, threshold)
+    """
+    thresholds = thresholds if thresholds is not None else QUALITY_THRESHOLDS
+
+    failures = []
+    for name, report in reports.items():
+        measures = {
+            "coercion_failure_rate": report["value"]["coercion_failure_rate"],
+            "invalid_periods": report["periods"]["invalid_periods"],
+            "duplicate_keys": report["duplicate_keys"],
+            "conflicting_keys": report["conflicting_keys"],
+            "missing_periods": report["missing_periods"]
+        }
+        for check, limit in thresholds.items():
+            if limit is not None and measures[check] > limit:
+                failures.append({"table": name, "check": check, "value": measures[check], "threshold": limit})
+
+    return {"passed": not failures, "failures": failures}
+
+
+def write_report(
+    reports: Dict[str, Dict[str, Any]],
+    gate: Dict[str, Any],
+    path: Union[str, Path]
+) -> Path:
+    """Write the profiling reports and gate result as one JSON document."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"gate": gate, "tables": reports}, indent=2))
+    return path
+
+
+if __name__ == "__main__":
+    raw = Path("data/raw")
+    reports = profile_sources({path.stem: path for path in sorted(raw.glob("MER_*.csv"))})
+    gate = check_quality(reports)
+    for name, report in reports.items():
+        print(f"{name}: {report['rows']} rows, sentinels {report['value']['sentinels']}, "
+              f"{report['duplicate_keys']} duplicate keys ({report['conflicting_keys']} conflicting), "
+              f"{report['missing_periods']} missing periods")
+    print(f"Quality gate passed: {gate['passed']}")
@@ -0,0 +1,516 @@
+"""
+Regression Module
+Closed-form OLS from cross-product matrices, batched over feature subsets
+and sample windows.
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple, Any, Optional, Sequence
+
+
+def ols_sufficient_statistics(X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
+    """
+    Compute the sufficient statistics of an OLS fit with intercept.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Feature matrix
+    y : pd.Series
+        Target variable
+
+    Returns
+    -------
+    Dict[str, Any]
+        Dictionary with X'X and X'y (intercept column first), y'y and n
+    """
+    Z = np.column_stack([np.ones(len(X)), np.asarray(X, dtype=np.float64)])
+    y = np.asarray(y, dtype=np.float64)
+
+    return {"xtx": Z.T @ Z, "xty": Z.T @ y, "yty": float(y @ y), "n": len(y)}
+
+
+def update_sufficient_statistics(
+    statistics: Dict[str, Any],
+    X_add: Optional[pd.DataFrame] = None,
+    y_add: Optional[pd.Series] = None,
+    X_remove: Optional[pd.DataFrame] = None,
+    y_remove: Optional[pd.Series] = None
+) -> Dict[str, Any]:
+    """
+    Add and/or remove observations from OLS sufficient statistics.
+
+    Parameters
+    ----------
+    statistics : Dict[str, Any]
+        Statistics from ols_sufficient_statistics
+    X_add, y_add : Optional
+        Observations to add
+    X_remove, y_remove : Optional
+        Observations to remove (must have been included before)
+
+    Returns
+    -------
+    Dict[str, Any]
+        Updated statistics (the input is not modified)
+    """
+    updated = {
+        "xtx": statistics["xtx"].copy(),
+        "xty": statistics["xty"].copy(),
+        "yty": statistics["yty"],
+        "n": statistics["n"]
+    }
+
+    for X, y, sign in ((X_add, y_add, 1), (X_remove, y_remove, -1)):
+        if X is None or len(X) == 0:
+            continue
+        delta = ols_sufficient_statistics(X, y)
+        updated["xtx"] += sign * delta["xtx"]
+        updated["xty"] += sign * delta["xty"]
+        updated["yty"] += sign * delta["yty"]
+        updated["n"] += sign * delta["n"]
+
+    return updated
+
+
+def solve_sufficient_statistics(
+    statistics: Dict[str, Any],
+    feature_names: List[str]
+) -> Dict[str, Any]:
+    """
+    Solve OLS from sufficient statistics.
+
+    Parameters
+    ----------
+    statistics : Dict[str, Any]
+        Statistics from ols_sufficient_statistics
+    feature_names : List[str]
+        Names of the features, in column order
+
+    Returns
+    -------
+    Dict[str, Any]
+        Coefficients, intercept, standard errors, t-statistics, R-squared
+        and RMSE
+    """
+    solution = solve_ols_batch(
+        statistics["xtx"], statistics["xty"], statistics["yty"], statistics["n"]
+    )
+    beta = solution["beta"]
+    names = ["Intercept"] + list(feature_names)
+
+    return {
+        "coefficients": dict(zip(feature_names, beta[1:])),
+        "intercept": beta[0],
+        "standard_errors": dict(zip(names, solution["se"])),
+        "t_stats": dict(zip(names, solution["t"])),
+        "r2": float(solution["r2"]),
+        "rmse": float(solution["rmse"])
+    }
+
+
+def batched_inverse(A: np.ndarray, tolerance: float = 1e-10) -> np.ndarray:
+    """
+    Invert a stack of symmetric positive definite matrices via Cholesky.
+
+    Matrices that are singular or numerically so (e.g. perfectly collinear
+    features) get an all-NaN inverse instead of failing the whole batch.
+
+    Parameters
+    ----------
+    A : np.ndarray
+        Array of shape (..., k, k)
+    tolerance : float
+        A matrix is treated as singular when a squared Cholesky pivot falls
+        below this fraction of the matching diagonal entry
+
+    Returns
+    -------
+    np.ndarray
+        Inverses, same shape as A
+    """
+    k = A.shape[-1]
+    flat = A.reshape(-1, k, k)
+    diagonal = np.diagonal(flat, axis1=-2, axis2=-1)
+
+    def invert(matrix: np.ndarray, diag: np.ndarray) -> np.ndarray:
+        L = np.linalg.cholesky(matrix)
+        L_inv = np.linalg.inv(L)
+        inverse = np.swapaxes(L_inv, -1, -2) @ L_inv
+        pivots = np.diagonal(L, axis1=-2, axis2=-1) ** 2
+        singular = (pivots <= tolerance * diag).any(axis=-1)
+        inverse[singular] = np.nan
+        return inverse
+
+    try:
+        inverse = invert(flat, diagonal)
+    except np.linalg.LinAlgError:
+        inverse = np.full_like(flat, np.nan)
+        for i in range(len(flat)):
+            try:
+                inverse[i] = invert(flat[i:i + 1], diagonal[i:i + 1])[0]
+            except np.linalg.LinAlgError:
+                continue
+
+    return inverse.reshape(A.shape)
+
+
+def solve_ols_batch(
+    xtx: np.ndarray,
+    xty: np.ndarray,
+    yty: Any,
+    n: Any
+) -> Dict[str, np.ndarray]:
+    """
+    Solve a batch of OLS problems from their cross-product matrices.
+
+    The first column of each design is the intercept, so xty[..., 0] is
+    the sum of y. All outputs broadcast over the leading batch dimensions.
+
+    Parameters
+    ----------
+    xtx : np.ndarray
+        Z'Z matrices, shape (..., k, k)
+    xty : np.ndarray
+        Z'y vectors, shape (..., k)
+    yty : array-like
+        y'y, shape (...)
+    n : array-like
+        Number of observations, shape (...)
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        beta, covariance (cov), standard errors (se), t-statistics (t),
+        p-values (p_value), sse, dof, r2, adj_r2 and rmse
+    """
+    xtx = np.asarray(xtx, dtype=np.float64)
+    xty = np.asarray(xty, dtype=np.float64)
+    yty = np.asarray(yty, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    k = xtx.shape[-1]
+
+    inverse = batched_inverse(xtx)
+    beta = np.einsum("...ij,...j->...i", inverse, xty)
+
+    sse = np.maximum(yty - np.einsum("...i,...i->...", beta, xty), 0.0)
+    sst = yty - xty[..., 0] ** 2 / n
+    dof = n - k
+
+    from scipy import stats
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sigma2 = sse / dof
+        cov = inverse * sigma2[..., None, None]
+        se = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+        t_stat = beta / se
+        p_value = 2 * stats.t.sf(np.abs(t_stat), dof[..., None])
+        r2 = 1 - sse / sst
+        adj_r2 = 1 - (1 - r2) * (n - 1) / dof
+        rmse = np.sqrt(sse / n)
+
+    return {
+        "beta": beta,
+        "cov": cov,
+        "se": se,
+        "t": t_stat,
+        "p_value": p_value,
+        "sse": sse,
+        "dof": dof,
+        "r2": r2,
+        "adj_r2": adj_r2,
+        "rmse": rmse
+    }
+
+
+def prefix_cross_products(Z: np.ndarray, y: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Cumulative cross-products of a design matrix, for O(1) window statistics.
+
+    Entry i holds the sums over rows [0, i), so the statistics of rows
+    [start, stop) are prefix[stop] - prefix[start].
+
+    Parameters
+    ----------
+    Z : np.ndarray
+        Design matrix (n, k), intercept column first
+    y : np.ndarray
+        Target (n,)
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        xtx (n + 1, k, k), xty (n + 1, k), yty (n + 1,) and n (n + 1,)
+    """
+    def cumulative(values: np.ndarray) -> np.ndarray:
+        zero = np.zeros((1,) + values.shape[1:])
+        return np.concatenate([zero, np.cumsum(values, axis=0)])
+
+    return {
+        "xtx": cumulative(Z[:, :, None] * Z[:, None, :]),
+        "xty": cumulative(Z * y[:, None]),
+        "yty": cumulative(y * y),
+        "n": np.arange(len(y) + 1, dtype=np.float64)
+    }
+
+
+def uncentre_solution(
+    solution: Dict[str, np.ndarray],
+    x_mean: np.ndarray,
+    y_mean: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Map a solve_ols_batch solution on mean-centred data back to the original scale.
+
+    Slopes are unchanged; the intercept becomes b0 + mean(y) - mean(x)'b
+    and its variance follows from cov = T V T'.
+
+    Parameters
+    ----------
+    solution : Dict[str, np.ndarray]
+        Output of solve_ols_batch on centred columns
+    x_mean : np.ndarray
+        Feature means, shape (..., k - 1), broadcastable to the batch
+    y_mean : float
+        Target mean
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Coefficients, standard errors, t-statistics and p-values
+    """
+    k = solution["beta"].shape[-1]
+    transform = np.broadcast_to(np.eye(k), x_mean.shape[:-1] + (k, k)).copy()
+    transform[..., 0, 1:] = -x_mean
+
+    beta = np.einsum("...ij,...j->...i", transform, solution["beta"])
+    beta[..., 0] += y_mean
+    cov = transform @ solution["cov"] @ np.swapaxes(transform, -1, -2)
+
+    from scipy import stats
+    with np.errstate(invalid="ignore"):
+        se = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+        t_stat = beta / se
+        p_value = 2 * stats.t.sf(np.abs(t_stat), solution["dof"][..., None])
+
+    return beta, se, t_stat, p_value
+
+
+def fit_ols_batch(
+    X: pd.DataFrame,
+    y: pd.Series,
+    subsets: Optional[Sequence[Sequence[str]]] = None,
+    windows: Optional[Sequence[Tuple[int, int]]] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Fit OLS with intercept for every (feature subset, sample window) pair.
+
+    Cross-products are accumulated once over all candidate features; each
+    window's statistics are a difference of prefix sums and each subset's
+    are a sub-block, so the fits reduce to batched Cholesky solves of small
+    k x k systems. Columns are centred on their overall means first, which
+    keeps the systems well conditioned; coefficients and covariances are
+    transformed back to the original scale.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Candidate features
+    y : pd.Series
+        Target variable
+    subsets : Optional[Sequence[Sequence[str]]]
+        Feature subsets to fit (default: all columns of X)
+    windows : Optional[Sequence[Tuple[int, int]]]
+        Row ranges [start, stop) to fit on (default: all rows)
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        fits (one row per model: model, features, start, stop, n, r2,
+        adj_r2, rmse, mae) and coefficients (one row per model term: model,
+        term, coefficient, std_error, t_stat, p_value)
+    """
+    columns = list(X.columns)
+    subsets = [tuple(subset) for subset in (subsets if subsets is not None else [columns])]
+    windows = list(windows) if windows is not None else [(0, len(X))]
+
+    values = X.to_numpy(dtype=np.float64)
+    target = np.asarray(y, dtype=np.float64)
+    x_mean = values.mean(axis=0)
+    y_mean = target.mean()
+
+    Z = np.column_stack([np.ones(len(values)), values - x_mean])
+    prefix = prefix_cross_products(Z, target - y_mean)
+    starts = np.array([start for start, _ in windows])
+    stops = np.array([stop for _, stop in windows])
+    window_stats = {key: prefix[key][stops] - prefix[key][starts] for key in prefix}
+
+    rows = np.arange(len(values))
+    in_window = (rows >= starts[:, None]) & (rows < stops[:, None])
+
+    fit_records, coefficient_records = [], []
+    model_id = 0
+
+    # Subsets of equal size share one batched solve
+    for size in sorted({len(subset) for subset in subsets}):
+        group = [subset for subset in subsets if len(subset) == size]
+        positions = np.array([[0] + [columns.index(col) + 1 for col in subset] for subset in group])
+
+        xtx = window_stats["xtx"][:, positions[:, :, None], positions[:, None, :]]
+        xty = window_stats["xty"][:, positions]
+        solution = solve_ols_batch(
+            xtx, xty, window_stats["yty"][:, None], window_stats["n"][:, None]
+        )
+
+        beta, se, t_stat, p_value = uncentre_solution(solution, x_mean[positions[:, 1:] - 1], y_mean)
+
+        # Residuals for MAE, over every row and masked to each window
+        predictions = beta[..., :1] + np.einsum("nsj,wsj->wsn", values[:, positions[:, 1:] - 1], beta[..., 1:])
+        absolute = np.abs(target - predictions)
+        mae = (absolute * in_window[:, None, :]).sum(axis=-1) / (stops - starts)[:, None]
+
+        for w, (start, stop) in enumerate(windows):
+            for s, subset in enumerate(group):
+                fit_records.append({
+                    "model": model_id,
+                    "features": subset,
+                    "start": start,
+                    "stop": stop,
+                    "n": stop - start,
+                    "r2": solution["r2"][w, s],
+                    "adj_r2": solution["adj_r2"][w, s],
+                    "rmse": solution["rmse"][w, s],
+                    "mae": mae[w, s]
+                })
+                for term, position in zip(("Intercept",) + subset, range(size + 1)):
+                    coefficient_records.append({
+                        "model": model_id,
+                        "term": term,
+                        "coefficient": beta[w, s, position],
+                        "std_error": se[w, s, position],
+                        "t_stat": t_stat[w, s, position],
+                        "p_value": p_value[w, s, position]
+                    })
+                model_id += 1
+
+    return {
+        "fits": pd.DataFrame(fit_records),
+        "coefficients": pd.DataFrame(coefficient_records)
+    }
+
+
+def best_subsets(
+    X: pd.DataFrame,
+    y: pd.Series,
+    max_size: Optional[int] = None,
+    criterion: str = "adj_r2"
+) -> pd.DataFrame:
+    """
+    Fit every non-empty subset of the candidate features and rank them.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Candidate features
+    y : pd.Series
+        Target variable
+    max_size : Optional[int]
+        Largest subset size (default: all features)
+    criterion : str
+        Column of the fits table to rank by ("adj_r2", "r2", "rmse" or "mae")
+
+    Returns
+    -------
+    pd.DataFrame
+        Fits table (see fit_ols_batch), best model first
+    """
+    columns = list(X.columns)
+    max_size = max_size or len(columns)
+    subsets = [
+        subset
+        for size in range(1, max_size + 1)
+        for subset in itertools.combinations(columns, size)
+    ]
+
+    fits = fit_ols_batch(X, y, subsets)["fits"]
+    ascending = criterion in ("rmse", "mae")
+    return fits.sort_values(criterion, ascending=ascending, ignore_index=True)
+
+
+def window_regression(
+    X: pd.DataFrame,
+    y: pd.Series,
+    window: Optional[int] = None,
+    min_periods: Optional[int] = None,
+    labels: Optional[pd.Series] = None
+) -> pd.DataFrame:
+    """
+    Rolling or expanding-window OLS, with a fit ending at every row.
+
+    The cross-products are updated one observation at a time: each step
+    adds the newest row and, for a rolling window, removes the row that
+    falls out, as a difference of running sums. Every step therefore costs
+    O(k^2) regardless of the window length, and all steps are solved in
+    one batch.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Feature matrix, in time order
+    y : pd.Series
+        Target variable
+    window : Optional[int]
+        Rolling window length in rows (None for an expanding window)
+    min_periods : Optional[int]
+        Fewest rows for a fit (default: window, or number of features + 2
+        for an expanding window)
+    labels : Optional[pd.Series]
+        Time label of each row (e.g. Year or Period), used as the index
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per window end with start, n, r2, adj_r2, rmse, the
+        intercept and coefficients, and their standard errors (<name>_se)
+    """
+    features = list(X.columns)
+    values = X.to_numpy(dtype=np.float64)
+    target = np.asarray(y, dtype=np.float64)
+    x_mean = values.mean(axis=0)
+    y_mean = target.mean()
+
+    if min_periods is None:
+        min_periods = window if window is not None else len(features) + 2
+
+    Z = np.column_stack([np.ones(len(values)), values - x_mean])
+    running = prefix_cross_products(Z, target - y_mean)
+
+    stops = np.arange(min_periods, len(values) + 1)
+    starts = np.maximum(stops - window, 0) if window is not None else np.zeros_like(stops)
+    window_stats = {key: running[key][stops] - running[key][starts] for key in running}
+
+    solution = solve_ols_batch(window_stats["xtx"], window_stats["xty"], window_stats["yty"], window_stats["n"])
+    beta, se, _, _ = uncentre_solution(solution, x_mean, y_mean)
+
+    terms = ["Intercept"] + features
+    table = pd.DataFrame({
+        "start": starts,
+        "n": stops - starts,
+        "r2": solution["r2"],
+        "adj_r2": solution["adj_r2"],
+        "rmse": solution["rmse"]
+    })
+    for i, term in enumerate(terms):
+        table[term] = beta[:, i]
+    for i, term in enumerate(terms):
+        table[f"{term}_se"] = se[:, i]
+
+    if labels is not None:
+        table.index = pd.Index(np.asarray(labels)[stops - 1], name=labels.name)
+    else:
+        table.index = pd.Index(stops - 1, name="end")
+
+    return table
@@ -0,0 +1,254 @@
+"""
+Resampling Module
+Block-bootstrap and permutation confidence intervals, evaluated in batches.
+
+Every replicate is one row of a 2-D index array; correlations and OLS fits
+for a whole batch of replicates are computed with batched matrix algebra
+instead of refitting in a loop.
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional
+
+from .regression import solve_ols_batch
+
+
+# Replicates evaluated per batch (bounds memory at about chunk x n x k floats)
+DEFAULT_CHUNK_SIZE = 500
+
+
+def default_block_length(n_rows: int) -> int:
+    """Block length for the moving-block bootstrap (n^(1/3) rule of thumb)."""
+    return max(1, int(round(n_rows ** (1 / 3))))
+
+
+def block_bootstrap_indices(
+    n_rows: int,
+    n_replicates: int,
+    block_length: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Draw moving-block bootstrap samples as one index array.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of observations
+    n_replicates : int
+        Number of bootstrap samples
+    block_length : int
+        Length of each block of consecutive rows
+    rng : np.random.Generator
+        Random generator
+
+    Returns
+    -------
+    np.ndarray
+        (n_replicates, n_rows) row indices
+    """
+    n_blocks = -(-n_rows // block_length)
+    starts = rng.integers(0, n_rows - block_length + 1, size=(n_replicates, n_blocks))
+    indices = (starts[:, :, None] + np.arange(block_length)).reshape(n_replicates, -1)
+    return indices[:, :n_rows]
+
+
+def permutation_indices(n_rows: int, n_replicates: int, rng: np.random.Generator) -> np.ndarray:
+    """Draw random permutations of the rows as one (n_replicates, n_rows) index array."""
+    return rng.permuted(np.broadcast_to(np.arange(n_rows), (n_replicates, n_rows)), axis=1)
+
+
+def batched_correlations(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Pearson correlation of each column of X with y, per replicate.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        (B, n, p) resampled predictors
+    y : np.ndarray
+        (B, n) resampled target
+
+    Returns
+    -------
+    np.ndarray
+        (B, p) correlations
+    """
+    X = X - X.mean(axis=1, keepdims=True)
+    y = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.einsum("bnp,bn->bp", X, y) / np.sqrt(
+            np.einsum("bnp,bnp->bp", X, X) * np.einsum("bn,bn->b", y, y)[:, None]
+        )
+
+
+def batched_ols(Z: np.ndarray, y: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    OLS coefficients and R-squared per replicate from batched cross-products.
+
+    Parameters
+    ----------
+    Z : np.ndarray
+        (B, n, k) or (n, k) design with intercept column first
+    y : np.ndarray
+        (B, n) target
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        beta (B, k) and r2 (B,)
+    """
+    if Z.ndim == 2:
+        xtx = np.broadcast_to(Z.T @ Z, (len(y),) + (Z.shape[1],) * 2)
+        xty = y @ Z
+    else:
+        xtx = np.einsum("bni,bnj->bij", Z, Z)
+        xty = np.einsum("bni,bn->bi", Z, y)
+    solution = solve_ols_batch(xtx, xty, np.einsum("bn,bn->b", y, y), np.full(len(y), y.shape[1]))
+    return {"beta": solution["beta"], "r2": solution["r2"]}
+
+
+def replicate_statistics(task: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Evaluate one chunk of bootstrap and permutation replicates.
+
+    Parameters
+    ----------
+    task : Dict[str, Any]
+        predictors, Z (design), y, n_replicates, block_length and seed
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Bootstrap correlations, coefficients and R-squared, and permutation
+        correlations and R-squared for the chunk
+    """
+    rng = np.random.default_rng(task["seed"])
+    P, Z, y = task["predictors"], task["Z"], task["y"]
+    n, B = len(y), task["n_replicates"]
+
+    boot = block_bootstrap_indices(n, B, task["block_length"], rng)
+    boot_ols = batched_ols(Z[boot], y[boot])
+
+    perm = permutation_indices(n, B, rng)
+    y_perm = y[perm]
+    perm_ols = batched_ols(Z, y_perm)
+
+    return {
+        "boot_correlation": batched_correlations(P[boot], y[boot]),
+        "boot_beta": boot_ols["beta"],
+        "boot_r2": boot_ols["r2"],
+        "perm_correlation": batched_correlations(np.broadcast_to(P, (B,) + P.shape), y_perm),
+        "perm_r2": perm_ols["r2"]
+    }
+
+
+def resampling_intervals(
+    df: pd.DataFrame,
+    target: str,
+    predictors: List[str],
+    features: List[str],
+    n_replicates: int = 10_000,
+    block_length: Optional[int] = None,
+    confidence: float = 0.95,
+    seed: int = 42,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> pd.DataFrame:
+    """
+    Block-bootstrap confidence intervals and permutation p-values.
+
+    Covers the correlation of each predictor with the target and the OLS
+    coefficients and R-squared of the target on the features. Replicates
+    are split into chunks with independent seeds, so results do not
+    depend on the number of workers.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data in time order
+    target : str
+        Target variable name
+    predictors : List[str]
+        Variables correlated with the target
+    features : List[str]
+        Regression features
+    n_replicates : int
+        Number of bootstrap and permutation replicates
+    block_length : Optional[int]
+        Moving-block length (default: n^(1/3))
+    confidence : float
+        Confidence level of the percentile intervals
+    seed : int
+        Random seed
+    workers : int
+        Number of processes evaluating chunks (1 runs in this process)
+    chunk_size : int
+        Replicates per chunk
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per statistic and term with estimate, ci_lower, ci_upper
+        and perm_p_value (NaN for coefficients)
+    """
+    y = df[target].to_numpy(dtype=np.float64)
+    P = df[predictors].to_numpy(dtype=np.float64)
+    Z = np.column_stack([np.ones(len(df)), df[features].to_numpy(dtype=np.float64)])
+    block_length = block_length or default_block_length(len(df))
+
+    sizes = [min(chunk_size, n_replicates - start) for start in range(0, n_replicates, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [
+        {"predictors": P, "Z": Z, "y": y, "n_replicates": size, "block_length": block_length, "seed": chunk_seed}
+        for size, chunk_seed in zip(sizes, seeds)
+    ]
+
+    if workers <= 1 or len(tasks) <= 1:
+        chunks = [replicate_statistics(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            chunks = list(pool.map(replicate_statistics, tasks))
+    replicates = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+
+    observed_correlation = batched_correlations(P[None], y[None])[0]
+    observed_ols = batched_ols(Z, y[None])
+    observed_beta, observed_r2 = observed_ols["beta"][0], observed_ols["r2"][0]
+
+    def permutation_p_value(null: np.ndarray, observed: np.ndarray) -> np.ndarray:
+        exceed = (np.abs(null) >= np.abs(observed)).sum(axis=0)
+        return (exceed + 1) / (len(null) + 1)
+
+    tail = (1 - confidence) / 2 * 100
+    records = []
+
+    lower, upper = np.nanpercentile(replicates["boot_correlation"], [tail, 100 - tail], axis=0)
+    p_values = permutation_p_value(replicates["perm_correlation"], observed_correlation)
+    for i, name in enumerate(predictors):
+        records.append({
+            "statistic": "correlation", "term": name, "estimate": observed_correlation[i],
+            "ci_lower": lower[i], "ci_upper": upper[i], "perm_p_value": p_values[i]
+        })
+
+    lower, upper = np.nanpercentile(replicates["boot_beta"], [tail, 100 - tail], axis=0)
+    for i, name in enumerate(["Intercept"] + features):
+        records.append({
+            "statistic": "coefficient", "term": name, "estimate": observed_beta[i],
+            "ci_lower": lower[i], "ci_upper": upper[i], "perm_p_value": np.nan
+        })
+
+    lower, upper = np.nanpercentile(replicates["boot_r2"], [tail, 100 - tail])
+    records.append({
+        "statistic": "r2", "term": "model", "estimate": observed_r2,
+        "ci_lower": lower, "ci_upper": upper,
+        "perm_p_value": permutation_p_value(replicates["perm_r2"], observed_r2)
+    })
+
+    table = pd.DataFrame(records)
+    table["n_replicates"] = n_replicates
+    table["block_length"] = block_length
+    return table
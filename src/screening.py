@@ -0,0 +1,208 @@
+"""
+Screening Module
+Full-panel screening of every MSN series, share and intensity against
+CO2 intensity.
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Any, Sequence, Tuple
+
+from .data_preparation import build_wide_dataset
+from .analysis import correlation_matrix
+
+
+# Kind of ratio formed from a (numerator unit, denominator unit) pair;
+# pairs of equal units are shares
+RATIO_KINDS = {
+    ("Million Metric Tons of Carbon Dioxide", "Quadrillion Btu"): "intensity"
+}
+
+# Numerator and denominator of the screening target (CO2Intensity)
+DEFAULT_TARGET = ("TETCEUS", "TETCBUS")
+
+# Candidate series evaluated per batch
+DEFAULT_CHUNK_SIZE = 256
+
+
+def build_msn_panel(tables: Sequence[pd.DataFrame], granularity: str = "annual") -> Dict[str, Any]:
+    """
+    Pivot every MSN of the given tables into one wide float32 matrix.
+
+    Parameters
+    ----------
+    tables : Sequence[pd.DataFrame]
+        Raw EIA tables
+    granularity : str
+        "annual" or "monthly"
+
+    Returns
+    -------
+    Dict[str, Any]
+        periods (period columns of the wide dataset), values (periods x
+        MSNs float32 matrix), msns, units and descriptions
+    """
+    info = pd.concat([
+        pd.DataFrame({
+            "MSN": table["MSN"].astype(str).to_numpy(),
+            "Unit": table["Unit"].astype(str).to_numpy(),
+            "Description": table["Description"].astype(str).to_numpy()
+        }).drop_duplicates("MSN")
+        for table in tables
+    ]).drop_duplicates("MSN").set_index("MSN")
+
+    wide = build_wide_dataset(tables, {msn: msn for msn in info.index}, granularity=granularity)
+    period_columns = ["Year", "Month", "Date", "Period"] if granularity == "monthly" else ["Year"]
+    msns = [col for col in wide.columns if col not in period_columns]
+
+    return {
+        "periods": wide[period_columns],
+        "values": wide[msns].to_numpy(dtype=np.float32),
+        "msns": msns,
+        "units": info.loc[msns, "Unit"].tolist(),
+        "descriptions": info.loc[msns, "Description"].tolist()
+    }
+
+
+def candidate_pairs(
+    msns: List[str],
+    units: List[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    List the screening candidates: every series level plus every ratio of compatible units.
+
+    Candidates are generated lazily: the levels first, then the ratios of
+    consecutive blocks of numerators, each block pairing about chunk_size
+    numerator-denominator combinations (at least one numerator), so the
+    full n x n grid of combinations is never held in memory.
+
+    Parameters
+    ----------
+    msns : List[str]
+        MSN codes of the panel columns
+    units : List[str]
+        Unit of each MSN
+    chunk_size : int
+        Approximate number of combinations examined per block
+
+    Yields
+    ------
+    pd.DataFrame
+        numerator and denominator column positions (-1 for levels) and kind
+        ("level", "share" or "intensity")
+    """
+    n = len(msns)
+    unit = np.asarray(units, dtype=object)
+    yield pd.DataFrame({"numerator": np.arange(n), "denominator": -1, "kind": "level"})
+
+    block = max(1, chunk_size // max(n - 1, 1))
+    for start in range(0, n, block):
+        num, den = np.meshgrid(np.arange(start, min(start + block, n)), np.arange(n), indexing="ij")
+        num, den = num.ravel(), den.ravel()
+        off_diagonal = num != den
+        num, den = num[off_diagonal], den[off_diagonal]
+
+        kind = np.where(unit[num] == unit[den], "share", "")
+        for (numerator_unit, denominator_unit), name in RATIO_KINDS.items():
+            kind = np.where((unit[num] == numerator_unit) & (unit[den] == denominator_unit), name, kind)
+        compatible = kind != ""
+        if compatible.any():
+            yield pd.DataFrame({"numerator": num[compatible], "denominator": den[compatible], "kind": kind[compatible]})
+
+
+def candidate_values(values: np.ndarray, pairs: pd.DataFrame) -> np.ndarray:
+    """Compute a batch of candidate series (levels, shares in %, intensities) as float32."""
+    num = pairs["numerator"].to_numpy()
+    den = pairs["denominator"].to_numpy()
+    numerator = values[:, num]
+    denominator = np.where(den >= 0, values[:, np.maximum(den, 0)], np.float32(1))
+    scale = np.where(pairs["kind"].to_numpy() == "share", np.float32(100), np.float32(1))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = numerator / denominator * scale
+    result[~np.isfinite(result)] = np.nan
+    return result.astype(np.float32)
+
+
+def screen_panel(
+    tables: Sequence[pd.DataFrame],
+    granularity: str = "annual",
+    target: Tuple[str, str] = DEFAULT_TARGET,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> pd.DataFrame:
+    """
+    Rank every MSN level, share and intensity by its association with CO2 intensity.
+
+    Candidates are generated (see candidate_pairs) and correlated in
+    batches of chunk_size, so the working memory is bounded by periods x
+    chunk_size floats however many tables are loaded; only the candidate
+    index and result columns grow with the number of candidates.
+
+    Parameters
+    ----------
+    tables : Sequence[pd.DataFrame]
+        Raw EIA tables
+    granularity : str
+        "annual" or "monthly"
+    target : Tuple[str, str]
+        MSN codes of the target's numerator and denominator
+    chunk_size : int
+        Candidates evaluated per batch
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per candidate with candidate, kind, numerator, denominator,
+        the numerator's description, n, pearson, pearson_p_value, spearman, spearman_p_value and r2,
+        sorted by absolute Pearson correlation
+    """
+    panel = build_msn_panel(tables, granularity)
+    msns = panel["msns"]
+    values = panel["values"]
+
+    target_values = values[:, msns.index(target[0])] / values[:, msns.index(target[1])]
+    target_frame = pd.DataFrame({"CO2Intensity": target_values.astype(np.float64)})
+    target_position = (msns.index(target[0]), msns.index(target[1]))
+
+    blocks = []
+    results = {key: [] for key in ("n", "pearson", "pearson_p_value", "spearman", "spearman_p_value")}
+    for block in candidate_pairs(msns, panel["units"], chunk_size):
+        # The target itself is not a candidate
+        is_target = (block["numerator"] == target_position[0]) & (block["denominator"] == target_position[1])
+        block = block[~is_target.to_numpy()].reset_index(drop=True)
+        blocks.append(block)
+
+        for start in range(0, len(block), chunk_size):
+            batch = candidate_values(values, block.iloc[start:start + chunk_size])
+            frame = pd.DataFrame(batch)
+            pearson = correlation_matrix(frame, target_frame, "pearson")
+            spearman = correlation_matrix(frame, target_frame, "spearman")
+            results["n"].append(pearson["n"][:, 0])
+            results["pearson"].append(pearson["r"][:, 0])
+            results["pearson_p_value"].append(pearson["p_value"][:, 0])
+            results["spearman"].append(spearman["r"][:, 0])
+            results["spearman_p_value"].append(spearman["p_value"][:, 0])
+    pairs = pd.concat(blocks, ignore_index=True)
+
+    names = np.asarray(msns, dtype=object)
+    num = pairs["numerator"].to_numpy()
+    den = pairs["denominator"].to_numpy()
+    numerator = names[num]
+    denominator = np.where(den >= 0, names[np.maximum(den, 0)], "")
+    candidate = np.where(den >= 0, numerator + "/" + denominator, numerator)
+
+    table = pd.DataFrame({
+        "candidate": candidate,
+        "kind": pairs["kind"].to_numpy(),
+        "numerator": numerator,
+        "denominator": denominator,
+        "description": np.asarray(panel["descriptions"], dtype=object)[num],
+        **{key: np.concatenate(parts) for key, parts in results.items()}
+    })
+    table["r2"] = table["pearson"] ** 2
+
+    order = np.argsort(-table["pearson"].abs().fillna(-1).to_numpy(), kind="stable")
+    return table.iloc[order].reset_index(drop=True)
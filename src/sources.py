@@ -0,0 +1,216 @@
+"""
+Sources Module
+Registry of raw data sources, loaded concurrently and merged by period.
+
+Each entry of RAW_SOURCES declares a file, its format, the granularities
+it provides and the mapping from its series codes to column names, so a
+new table is added by adding an entry rather than new loading code.
+
+Usage:
+    python -m src.sources
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from .data_loader import GRANULARITIES, load_table
+from .instrumentation import instrument
+from .data_preparation import ENERGY_VARIABLES, CO2_VARIABLES, build_wide_dataset
+
+
+# Raw data sources: file, format (see data_loader.FILE_FORMATS),
+# granularities provided and series code -> column name
+RAW_SOURCES: Dict[str, Dict[str, Any]] = {
+    "MER_T01_01": {
+        "file": "MER_T01_01.csv",
+        "format": "mer_csv",
+        "granularities": GRANULARITIES,
+        "variables": ENERGY_VARIABLES
+    },
+    "MER_T11_01": {
+        "file": "MER_T11_01.csv",
+        "format": "mer_csv",
+        "granularities": GRANULARITIES,
+        "variables": CO2_VARIABLES
+    },
+    "MER_T08_01": {
+        "file": "MER_T08_01.csv",
+        "format": "mer_csv",
+        "granularities": GRANULARITIES,
+        "variables": {
+            "NUOUPUS": "NuclearUnits",            # Total Operable Units
+            "NUGBPUS": "NuclearCapacity",         # Net Summer Capacity (million kW)
+            "NUETPUS": "NuclearGeneration",       # Net Generation (million kWh)
+            "NUCASUS": "NuclearCapacityFactor",   # Capacity Factor (%)
+            "NUETSUS": "NuclearGenerationShare"   # Share of Electricity Net Generation (%)
+        }
+    },
+    "stb1101": {
+        # Legacy Annual Energy Review Table 11.1 (1949-2011); series are
+        # identified by their header labels
+        "file": "stb1101.xls",
+        "format": "html_table",
+        "granularities": ("annual",),
+        "variables": {
+            "Coal": "HistoricalCoalCO2",
+            "Natural Gas": "HistoricalNaturalGasCO2",
+            "Petroleum Total": "HistoricalPetroleumCO2",
+            "Total": "HistoricalTotalCO2",
+            "Biomass Total": "HistoricalBiomassCO2"
+        }
+    }
+}
+
+
+def source_files(data_dir: str = "data/raw", sources: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Path]:
+    """Return the path of every registered source file."""
+    sources = sources if sources is not None else RAW_SOURCES
+    return {name: Path(data_dir) / source["file"] for name, source in sources.items()}
+
+
+@instrument()
+def load_sources(
+    data_dir: str = "data/raw",
+    sources: Optional[Dict[str, Dict[str, Any]]] = None,
+    cache_dir: Optional[str] = None,
+    rebuild_cache: bool = False,
+    workers: Optional[int] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Load every registered source on a thread pool.
+
+    Each file is parsed once and cached as Parquet (see load_table), so
+    later runs read the columnar copy instead of re-parsing CSV or HTML.
+
+    Parameters
+    ----------
+    data_dir : str
+        Directory containing the raw files
+    sources : Optional[Dict[str, Dict[str, Any]]]
+        Source registry (default: RAW_SOURCES)
+    cache_dir : Optional[str]
+        Directory for the Parquet cache (no caching if None)
+    rebuild_cache : bool
+        Re-parse every file
+    workers : Optional[int]
+        Number of loader threads (default: one per source)
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        Raw tables in MER long format, by source name
+    """
+    sources = sources if sources is not None else RAW_SOURCES
+    paths = source_files(data_dir, sources)
+
+    with ThreadPoolExecutor(max_workers=workers or max(1, len(sources))) as pool:
+        futures = {
+            name: pool.submit(
+                load_table, paths[name],
+                cache_dir=cache_dir, rebuild_cache=rebuild_cache, file_format=source["format"]
+            )
+            for name, source in sources.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+@instrument()
+def build_source_dataset(
+    tables: Dict[str, pd.DataFrame],
+    granularity: str = "annual",
+    sources: Optional[Dict[str, Dict[str, Any]]] = None
+) -> pd.DataFrame:
+    """
+    Merge the mapped series of every source into one wide dataset.
+
+    Sources are outer-joined on the period columns, so a source covering
+    a different span (e.g. 1949-2011) adds rows instead of truncating the
+    others. Sources without the requested granularity are skipped.
+
+    Parameters
+    ----------
+    tables : Dict[str, pd.DataFrame]
+        Raw tables by source name (see load_sources)
+    granularity : str
+        "annual" or "monthly"
+    sources : Optional[Dict[str, Dict[str, Any]]]
+        Source registry (default: RAW_SOURCES)
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per period with the period columns and every mapped series
+    """
+    sources = sources if sources is not None else RAW_SOURCES
+    period_columns = ["Year", "Month", "Date", "Period"] if granularity == "monthly" else ["Year"]
+
+    merged = None
+    for name, source in sources.items():
+        if name not in tables or granularity not in source["granularities"]:
+            continue
+        wide = build_wide_dataset([tables[name]], source["variables"], granularity=granularity)
+        if wide.empty:
+            continue
+        merged = wide if merged is None else merged.merge(wide, on=period_columns, how="outer")
+
+    if merged is None:
+        return pd.DataFrame(columns=period_columns)
+    return merged.sort_values(period_columns[-1], ignore_index=True)
+
+
+def source_coverage(
+    df: pd.DataFrame,
+    granularity: str = "annual",
+    sources: Optional[Dict[str, Dict[str, Any]]] = None
+) -> pd.DataFrame:
+    """
+    Summarise the span of each source's series in a merged dataset.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Output of build_source_dataset
+    granularity : str
+        "annual" or "monthly"
+    sources : Optional[Dict[str, Dict[str, Any]]]
+        Source registry (default: RAW_SOURCES)
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per source with variables, n (rows with any value), first
+        and last period (Year, or YYYYMM for monthly data)
+    """
+    sources = sources if sources is not None else RAW_SOURCES
+    if granularity == "monthly":
+        keys = df["Year"].to_numpy().astype(int) * 100 + df["Month"].to_numpy()
+    else:
+        keys = df["Year"].to_numpy()
+
+    records: List[Dict[str, Any]] = []
+    for name, source in sources.items():
+        columns = [col for col in source["variables"].values() if col in df.columns]
+        if not columns:
+            continue
+        present = df[columns].notna().any(axis=1).to_numpy()
+        periods = keys[present]
+        records.append({
+            "source": name,
+            "variables": len(columns),
+            "n": int(present.sum()),
+            "first": int(periods.min()) if len(periods) else None,
+            "last": int(periods.max()) if len(periods) else None
+        })
+    return pd.DataFrame(records)
+
+
+if __name__ == "__main__":
+    tables = load_sources()
+    for granularity in GRANULARITIES:
+        merged = build_source_dataset(tables, granularity)
+        print(f"{granularity}: {merged.shape}")
+        print(source_coverage(merged, granularity).to_string(index=False))
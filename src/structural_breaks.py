@@ -0,0 +1,284 @@
+"""
+Structural Breaks Module
+Chow, CUSUM and Bai-Perron break detection over every candidate date.
+
+All tests share one set of prefix cross-products (see regression.py), so
+the OLS fit of any contiguous segment costs O(1) to set up and the full
+scan over n observations costs O(n^2) small solves at most.
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional
+
+from .regression import prefix_cross_products, solve_ols_batch, batched_inverse
+
+
+# 5% critical value of the CUSUM boundary (Brown, Durbin and Evans, 1975)
+CUSUM_CRITICAL_VALUE = 0.948
+
+
+def centred_design(X: pd.DataFrame, y: pd.Series) -> Dict[str, np.ndarray]:
+    """
+    Build the mean-centred design (intercept first) and its prefix cross-products.
+
+    Centring leaves segment residuals unchanged and keeps the small
+    systems well conditioned.
+    """
+    values = X.to_numpy(dtype=np.float64)
+    target = np.asarray(y, dtype=np.float64)
+    Z = np.column_stack([np.ones(len(values)), values - values.mean(axis=0)])
+    target = target - target.mean()
+    return {"Z": Z, "y": target, "prefix": prefix_cross_products(Z, target)}
+
+
+def segment_sse(prefix: Dict[str, np.ndarray], starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    """Residual sum of squares of the OLS fit on each row range [start, stop)."""
+    window = {key: prefix[key][stops] - prefix[key][starts] for key in prefix}
+    return solve_ols_batch(window["xtx"], window["xty"], window["yty"], window["n"])["sse"]
+
+
+def segment_cost_matrix(prefix: Dict[str, np.ndarray], min_size: int) -> np.ndarray:
+    """
+    SSE of every segment [i, j) with at least min_size rows.
+
+    Parameters
+    ----------
+    prefix : Dict[str, np.ndarray]
+        Prefix cross-products (see prefix_cross_products)
+    min_size : int
+        Shortest allowed segment
+
+    Returns
+    -------
+    np.ndarray
+        (n + 1, n + 1) matrix; entry [i, j] is the SSE of rows [i, j),
+        infinite for segments that are too short or not estimable
+    """
+    n = len(prefix["n"]) - 1
+    cost = np.full((n + 1, n + 1), np.inf)
+
+    # One batched solve per segment start keeps memory at O(n k^2)
+    for start in range(n - min_size + 1):
+        stops = np.arange(start + min_size, n + 1)
+        cost[start, stops] = segment_sse(prefix, np.full_like(stops, start), stops)
+
+    cost[np.isnan(cost)] = np.inf
+    return cost
+
+
+def chow_scan(
+    prefix: Dict[str, np.ndarray],
+    n_params: int,
+    min_size: int,
+    labels: np.ndarray
+) -> Dict[str, Any]:
+    """
+    Chow F-test for a single break at every candidate date.
+
+    Parameters
+    ----------
+    prefix : Dict[str, np.ndarray]
+        Prefix cross-products
+    n_params : int
+        Number of regression parameters (including intercept)
+    min_size : int
+        Shortest regime on either side of the break
+    labels : np.ndarray
+        Time label of each row
+
+    Returns
+    -------
+    Dict[str, Any]
+        Per-candidate table (date, f_stat, p_value), the sup-F statistic,
+        its row and date
+    """
+    n = len(labels)
+    candidates = np.arange(min_size, n - min_size + 1)
+    zeros = np.zeros_like(candidates)
+    ends = np.full_like(candidates, n)
+
+    sse_full = segment_sse(prefix, np.array([0]), np.array([n]))[0]
+    sse_split = segment_sse(prefix, zeros, candidates) + segment_sse(prefix, candidates, ends)
+
+    dof = n - 2 * n_params
+    with np.errstate(invalid="ignore", divide="ignore"):
+        f_stat = ((sse_full - sse_split) / n_params) / (sse_split / dof)
+
+    from scipy import stats
+    p_value = stats.f.sf(f_stat, n_params, dof)
+
+    best = int(np.nanargmax(f_stat))
+    return {
+        "table": pd.DataFrame({"date": labels[candidates], "f_stat": f_stat, "p_value": p_value}),
+        "sup_f": float(f_stat[best]),
+        "break_row": int(candidates[best]),
+        "break_date": labels[candidates[best]]
+    }
+
+
+def cusum_test(design: Dict[str, np.ndarray], labels: np.ndarray) -> Dict[str, Any]:
+    """
+    CUSUM test on recursive residuals.
+
+    The one-step-ahead residual of row t uses the fit on rows [0, t), read
+    off the prefix cross-products, so all recursive fits are one batched
+    inversion.
+
+    Parameters
+    ----------
+    design : Dict[str, np.ndarray]
+        Output of centred_design
+    labels : np.ndarray
+        Time label of each row
+
+    Returns
+    -------
+    Dict[str, Any]
+        Table of the standardised CUSUM path and its 5% boundary, whether
+        the boundary was crossed and the first crossing date
+    """
+    Z, y, prefix = design["Z"], design["y"], design["prefix"]
+    n, k = Z.shape
+    rows = np.arange(k, n)
+
+    inverse = batched_inverse(prefix["xtx"][rows])
+    beta = np.einsum("tij,tj->ti", inverse, prefix["xty"][rows])
+    z = Z[rows]
+    leverage = np.einsum("ti,tij,tj->t", z, inverse, z)
+    recursive = (y[rows] - np.einsum("ti,ti->t", z, beta)) / np.sqrt(1 + leverage)
+
+    valid = np.isfinite(recursive)
+    rows, recursive = rows[valid], recursive[valid]
+    path = np.cumsum(recursive) / recursive.std(ddof=1)
+
+    m = len(recursive)
+    bound = CUSUM_CRITICAL_VALUE * (np.sqrt(m) + 2 * np.arange(1, m + 1) / np.sqrt(m))
+    crossed = np.abs(path) > bound
+
+    return {
+        "table": pd.DataFrame({"date": labels[rows], "cusum": path, "bound": bound}),
+        "crossed": bool(crossed.any()),
+        "first_crossing": labels[rows[np.argmax(crossed)]] if crossed.any() else None
+    }
+
+
+def bai_perron(
+    cost: np.ndarray,
+    n_params: int,
+    max_breaks: int,
+    labels: np.ndarray
+) -> Dict[str, Any]:
+    """
+    Optimal multiple-break segmentation by dynamic programming.
+
+    For m breaks, the best partition of rows [0, j) is the minimum over i
+    of the best (m - 1)-break partition of [0, i) plus the SSE of [i, j),
+    computed for all j at once from the segment cost matrix. The number
+    of breaks is chosen by BIC.
+
+    Parameters
+    ----------
+    cost : np.ndarray
+        Segment cost matrix (see segment_cost_matrix)
+    n_params : int
+        Regression parameters per regime (including intercept)
+    max_breaks : int
+        Largest number of breaks considered
+    labels : np.ndarray
+        Time label of each row
+
+    Returns
+    -------
+    Dict[str, Any]
+        Table with SSR, BIC and break dates for each number of breaks, and
+        the selected break rows and dates
+    """
+    n = cost.shape[0] - 1
+    best = cost[0].copy()
+    choices = []
+    records = []
+
+    for m in range(max_breaks + 1):
+        if m > 0:
+            total = best[:, None] + cost
+            choices.append(np.argmin(total, axis=0))
+            best = total[choices[-1], np.arange(n + 1)]
+
+        if not np.isfinite(best[n]):
+            break
+
+        # Walk the stored choices back from the end of the sample
+        rows, end = [], n
+        for choice in reversed(choices):
+            end = int(choice[end])
+            rows.append(end)
+        rows = rows[::-1]
+
+        ssr = best[n]
+        n_total = (m + 1) * n_params + m
+        records.append({
+            "breaks": m,
+            "ssr": ssr,
+            "bic": n * np.log(ssr / n) + n_total * np.log(n),
+            "rows": rows,
+            "dates": [labels[row] for row in rows]
+        })
+
+    table = pd.DataFrame(records)
+    selected = table.loc[table["bic"].idxmin()]
+
+    return {
+        "table": table,
+        "n_breaks": int(selected["breaks"]),
+        "break_rows": list(selected["rows"]),
+        "break_dates": list(selected["dates"])
+    }
+
+
+def detect_structural_breaks(
+    X: pd.DataFrame,
+    y: pd.Series,
+    labels: Optional[pd.Series] = None,
+    trim: float = 0.15,
+    max_breaks: int = 3
+) -> Dict[str, Any]:
+    """
+    Scan every candidate break date with Chow, CUSUM and Bai-Perron tests.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Feature matrix, in time order
+    y : pd.Series
+        Target variable
+    labels : Optional[pd.Series]
+        Time label of each row (e.g. Year or Period; default: row number)
+    trim : float
+        Shortest regime as a fraction of the sample
+    max_breaks : int
+        Largest number of breaks in the Bai-Perron segmentation
+
+    Returns
+    -------
+    Dict[str, Any]
+        Results of each test (chow, cusum, bai_perron) and the selected
+        break rows and dates (from Bai-Perron)
+    """
+    labels = np.asarray(labels) if labels is not None else np.arange(len(X))
+    n_params = X.shape[1] + 1
+    min_size = max(int(np.floor(trim * len(X))), n_params + 1)
+
+    design = centred_design(X, y)
+    cost = segment_cost_matrix(design["prefix"], min_size)
+    segmentation = bai_perron(cost, n_params, max_breaks, labels)
+
+    return {
+        "chow": chow_scan(design["prefix"], n_params, min_size, labels),
+        "cusum": cusum_test(design, labels),
+        "bai_perron": segmentation,
+        "break_rows": segmentation["break_rows"],
+        "break_dates": segmentation["break_dates"]
+    }
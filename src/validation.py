@@ -0,0 +1,248 @@
+"""
+Validation Module
+Declarative invariant checks on the prepared dataset.
+
+Rules are declared once in VALIDATION_RULES, compiled into functions that
+return a per-row boolean mask, and evaluated together over the wide frame.
+
+Usage:
+    python -m src.validation
+
+Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Any, Callable, Optional
+
+from .instrumentation import instrument
+
+
+SHARE_COLUMNS = ["FossilShare", "RenewableShare", "NuclearShare"]
+
+# Invariants of prepare_full_dataset output. "check" selects a builder in
+# CHECK_BUILDERS; "fail" rules stop the pipeline, "warn" rules are reported
+VALIDATION_RULES = [
+    {
+        "name": "shares_sum_to_100",
+        "check": "sum_between",
+        "columns": SHARE_COLUMNS,
+        "min": 99.0,
+        "max": 101.0,
+        "severity": "fail",
+        "description": "Fossil, renewable and nuclear shares sum to ~100%"
+    },
+    {
+        "name": "shares_within_bounds",
+        "check": "between",
+        "columns": SHARE_COLUMNS,
+        "min": 0.0,
+        "max": 100.0,
+        "severity": "fail",
+        "description": "Each share lies in [0, 100]"
+    },
+    {
+        "name": "co2_intensity_positive",
+        "check": "greater_than",
+        "columns": ["CO2Intensity"],
+        "min": 0.0,
+        "severity": "fail",
+        "description": "CO2 intensity is positive"
+    },
+    {
+        "name": "core_values_present",
+        "check": "not_null",
+        "columns": ["TotalEnergy", "FossilEnergy", "RenewableEnergy", "NuclearEnergy", "TotalCO2"],
+        "severity": "fail",
+        "description": "Energy and CO2 levels are present"
+    },
+    {
+        "name": "intensity_matches_ratio",
+        "check": "ratio_equals",
+        "columns": ["CO2Intensity", "TotalCO2", "TotalEnergy"],
+        "tolerance": 1e-9,
+        "severity": "fail",
+        "description": "CO2Intensity equals TotalCO2 / TotalEnergy"
+    },
+    {
+        "name": "periods_contiguous",
+        "check": "contiguous",
+        "columns": ["Year"],
+        "severity": "fail",
+        "description": "Years (and months) are increasing without gaps"
+    },
+    {
+        "name": "intensity_step",
+        "check": "max_relative_change",
+        "columns": ["CO2Intensity"],
+        "max": 0.10,
+        "severity": "warn",
+        "description": "CO2 intensity changes by at most 10% between consecutive periods"
+    }
+]
+
+SEVERITIES = ("fail", "warn")
+
+# Offending rows kept per rule
+MAX_SAMPLES = 5
+
+
+def _sum_between(rule: Dict[str, Any]) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    def check(values):
+        total = sum(values[col] for col in rule["columns"])
+        return (total >= rule["min"]) & (total <= rule["max"])
+    return check
+
+
+def _between(rule: Dict[str, Any]) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    def check(values):
+        stacked = np.column_stack([values[col] for col in rule["columns"]])
+        return ((stacked >= rule["min"]) & (stacked <= rule["max"])).all(axis=1)
+    return check
+
+
+def _greater_than(rule: Dict[str, Any]) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    def check(values):
+        return np.column_stack([values[col] > rule["min"] for col in rule["columns"]]).all(axis=1)
+    return check
+
+
+def _not_null(rule: Dict[str, Any]) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    def check(values):
+        return ~np.isnan(np.column_stack([values[col] for col in rule["columns"]])).any(axis=1)
+    return check
+
+
+def _ratio_equals(rule: Dict[str, Any]) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    column, numerator, denominator = rule["columns"]
+
+    def check(values):
+        expected = values[numerator] / values[denominator]
+        return np.abs(values[column] - expected) <= rule["tolerance"] * np.abs(expected)
+    return check
+
+
+def _contiguous(rule: Dict[str, Any]) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    def check(values):
+        # Monthly frames carry a Month column; index periods in months
+        index = values["Year"] * 12 + values["Month"] - 1 if "Month" in values else values["Year"]
+        return np.concatenate([[True], np.diff(index) == 1])
+    return check
+
+
+def _max_relative_change(rule: Dict[str, Any]) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    def check(values):
+        series = np.column_stack([values[col] for col in rule["columns"]])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            change = np.abs(np.diff(series, axis=0) / series[:-1])
+        return np.concatenate([[True], ~(change > rule["max"]).any(axis=1)])
+    return check
+
+
+# Check name -> builder of the per-row pass-mask function
+CHECK_BUILDERS = {
+    "sum_between": _sum_between,
+    "between": _between,
+    "greater_than": _greater_than,
+    "not_null": _not_null,
+    "ratio_equals": _ratio_equals,
+    "contiguous": _contiguous,
+    "max_relative_change": _max_relative_change
+}
+
+
+def compile_rules(rules: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Compile declared rules into mask functions.
+
+    Parameters
+    ----------
+    rules : Optional[List[Dict[str, Any]]]
+        Rule declarations (default: VALIDATION_RULES)
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        Rules with a compiled "mask" function added
+    """
+    rules = rules if rules is not None else VALIDATION_RULES
+    compiled = []
+    for rule in rules:
+        if rule["check"] not in CHECK_BUILDERS:
+            raise ValueError(f"Unknown check {rule['check']!r} in rule {rule['name']!r}")
+        if rule["severity"] not in SEVERITIES:
+            raise ValueError(f"Severity must be one of {SEVERITIES}, got {rule['severity']!r}")
+        compiled.append({**rule, "mask": CHECK_BUILDERS[rule["check"]](rule)})
+    return compiled
+
+
+@instrument()
+def validate_dataset(
+    df: pd.DataFrame,
+    rules: Optional[List[Dict[str, Any]]] = None,
+    max_samples: int = MAX_SAMPLES
+) -> Dict[str, Any]:
+    """
+    Evaluate every rule over the whole dataset.
+
+    Each referenced column is converted to a float array once and shared
+    by all rules; a rule whose columns are missing is skipped.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Prepared dataset (see prepare_full_dataset)
+    rules : Optional[List[Dict[str, Any]]]
+        Rule declarations or compiled rules (default: VALIDATION_RULES)
+    max_samples : int
+        Offending rows kept per rule
+
+    Returns
+    -------
+    Dict[str, Any]
+        passed (no "fail" rule violated), table (rule, severity, status,
+        failures, checked, description) and samples (offending rows per
+        violated rule, with period columns)
+    """
+    compiled = rules if rules and "mask" in rules[0] else compile_rules(rules)
+    period_columns = [col for col in ("Year", "Month") if col in df.columns]
+
+    needed = set(period_columns).union(*(rule["columns"] for rule in compiled))
+    values = {col: df[col].to_numpy(dtype=np.float64) for col in needed if col in df.columns}
+
+    records, samples = [], {}
+    for rule in compiled:
+        if any(col not in values for col in rule["columns"]):
+            records.append({
+                "rule": rule["name"], "severity": rule["severity"], "status": "skipped",
+                "failures": 0, "checked": 0, "description": rule["description"]
+            })
+            continue
+
+        failed = np.flatnonzero(~rule["mask"](values))
+        status = "pass" if len(failed) == 0 else rule["severity"]
+        records.append({
+            "rule": rule["name"], "severity": rule["severity"], "status": status,
+            "failures": len(failed), "checked": len(df), "description": rule["description"]
+        })
+        if len(failed):
+            columns = period_columns + [col for col in rule["columns"] if col not in period_columns]
+            samples[rule["name"]] = df.iloc[failed[:max_samples]][columns]
+
+    table = pd.DataFrame(records)
+    return {
+        "passed": not (table["status"] == "fail").any(),
+        "table": table,
+        "samples": samples
+    }
+
+
+if __name__ == "__main__":
+    from .data_loader import load_raw_data
+    from .data_preparation import prepare_full_dataset
+
+    energy_df, co2_df = load_raw_data()
+    for granularity in ("annual", "monthly"):
+        validation = validate_dataset(prepare_full_dataset(energy_df, co2_df, granularity))
+        print(f"{granularity}: passed = {validation['passed']}")
+        print(validation["table"][["rule", "status", "failures"]].to_string(index=False))
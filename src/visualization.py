@@ -2,31 +2,76 @@
 Visualization Module
 Creates all charts and figures for the analysis.
 
+Usage:
+    python -m src.visualization
+
 Authors: Alan (Xiangyu Wu), Zheng Congyun, He Yu, Ma Shuting
 """
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
+import matplotlib
+import matplotlib.style
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
+
+from .pipeline import code_fingerprint, fingerprint_object
+from .instrumentation import instrument
+
+
+# Suffix of the file stored next to each PNG holding its render fingerprint
+FINGERPRINT_SUFFIX = ".fingerprint"
 
 
 def set_plot_style():
     """Set consistent plot style for all visualizations."""
-    plt.style.use("seaborn-v0_8-whitegrid")
-    plt.rcParams["figure.figsize"] = (12, 6)
-    plt.rcParams["font.size"] = 11
-    plt.rcParams["axes.titlesize"] = 14
-    plt.rcParams["axes.labelsize"] = 12
+    matplotlib.style.use("seaborn-v0_8-whitegrid")
+    matplotlib.rcParams["figure.figsize"] = (12, 6)
+    matplotlib.rcParams["font.size"] = 11
+    matplotlib.rcParams["axes.titlesize"] = 14
+    matplotlib.rcParams["axes.labelsize"] = 12
+
+
+def new_figure(figsize: Tuple[float, float]) -> Figure:
+    """
+    Create a figure bound to a non-interactive Agg canvas.
+
+    Figures are created without pyplot, so no global figure state is kept
+    and plot functions can run in worker processes.
+    """
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def plot_kde(ax, values: pd.Series, **kwargs):
+    """
+    Draw a Gaussian KDE curve on an axes.
+
+    Matches pandas' ``Series.plot(kind="kde")`` (1000 points over the data
+    range extended by half the range on each side) without going through
+    pyplot, including the legend label taken from the series name.
+    """
+    from scipy import stats
 
+    kwargs.setdefault("label", values.name)
+    values = values.dropna().to_numpy()
+    kde = stats.gaussian_kde(values)
+    span = values.max() - values.min()
+    x = np.linspace(values.min() - 0.5 * span, values.max() + 0.5 * span, 1000)
+    ax.plot(x, kde(x), **kwargs)
 
+
+@instrument()
 def plot_energy_structure(
     df: pd.DataFrame,
-    save_path: Optional[str] = None
-) -> plt.Figure:
+    save_path: Optional[str] = None,
+    time_col: str = "Year",
+    dpi: int = 150
+) -> Figure:
     """
     Create stacked area chart showing energy structure evolution.
 
@@ -36,16 +81,21 @@ def plot_energy_structure(
         Data with Year, FossilShare, NuclearShare, RenewableShare
     save_path : Optional[str]
         Path to save figure
+    time_col : str
+        Column for the x-axis ("Period" for monthly data)
+    dpi : int
+        Resolution of the saved image
 
     Returns
     -------
-    plt.Figure
+    Figure
         Matplotlib figure object
     """
-    fig, ax = plt.subplots(figsize=(14, 7))
+    fig = new_figure((14, 7))
+    ax = fig.subplots()
 
     ax.stackplot(
-        df["Year"],
+        df[time_col],
         df["FossilShare"],
         df["NuclearShare"],
         df["RenewableShare"],
@@ -56,24 +106,28 @@ def plot_energy_structure(
 
     ax.set_xlabel("Year")
     ax.set_ylabel("Share of Total Energy (%)")
-    ax.set_title("US Energy Structure Evolution (1973-2024)", fontweight="bold")
+    first_year, last_year = int(df[time_col].min()), int(df[time_col].max())
+    ax.set_title(f"US Energy Structure Evolution ({first_year}-{last_year})", fontweight="bold")
     ax.legend(loc="upper right")
-    ax.set_xlim(df["Year"].min(), df["Year"].max())
+    ax.set_xlim(df[time_col].min(), df[time_col].max())
     ax.set_ylim(0, 100)
     ax.grid(True, alpha=0.3)
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     if save_path:
-        plt.savefig(save_path, dpi=150, bbox_inches="tight")
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
 
     return fig
 
 
+@instrument()
 def plot_co2_intensity_trend(
     df: pd.DataFrame,
-    save_path: Optional[str] = None
-) -> plt.Figure:
+    save_path: Optional[str] = None,
+    time_col: str = "Year",
+    dpi: int = 150
+) -> Figure:
     """
     Create dual-axis chart showing CO2 intensity and fossil share trends.
 
@@ -83,30 +137,38 @@ def plot_co2_intensity_trend(
         Data with Year, CO2Intensity, FossilShare
     save_path : Optional[str]
         Path to save figure
+    time_col : str
+        Column for the x-axis ("Period" for monthly data)
+    dpi : int
+        Resolution of the saved image
 
     Returns
     -------
-    plt.Figure
+    Figure
         Matplotlib figure object
     """
-    fig, ax1 = plt.subplots(figsize=(14, 7))
+    fig = new_figure((14, 7))
+    ax1 = fig.subplots()
 
     # CO2 Intensity on primary axis
     color1 = "#1f77b4"
-    ax1.plot(df["Year"], df["CO2Intensity"], color=color1, linewidth=2.5, label="CO2 Intensity")
+    ax1.plot(df[time_col], df["CO2Intensity"], color=color1, linewidth=2.5, label="CO2 Intensity")
     ax1.set_xlabel("Year")
     ax1.set_ylabel("CO2 Intensity (MMT CO2 / Quad BTU)", color=color1)
     ax1.tick_params(axis="y", labelcolor=color1)
 
     # Add trend line
-    z = np.polyfit(df["Year"], df["CO2Intensity"], 1)
+    z = np.polyfit(df[time_col], df["CO2Intensity"], 1)
     p = np.poly1d(z)
-    ax1.plot(df["Year"], p(df["Year"]), "--", color=color1, alpha=0.7, label="Trend")
+    ax1.plot(df[time_col], p(df[time_col]), "--", color=color1, alpha=0.7, label="Trend")
 
     # Fossil share on secondary axis
     ax2 = ax1.twinx()
     color2 = "#d62728"
-    ax2.plot(df["Year"], df["FossilShare"], color=color2, linewidth=2, linestyle=":", label="Fossil Share")
+    if "CO2Intensity12M" in df.columns:
+        ax1.plot(df[time_col], df["CO2Intensity12M"], color="black", linewidth=1.5, label="12-Month Rolling")
+
+    ax2.plot(df[time_col], df["FossilShare"], color=color2, linewidth=2, linestyle=":", label="Fossil Share")
     ax2.set_ylabel("Fossil Fuel Share (%)", color=color2)
     ax2.tick_params(axis="y", labelcolor=color2)
 
@@ -115,22 +177,25 @@ def plot_co2_intensity_trend(
     lines2, labels2 = ax2.get_legend_handles_labels()
     ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper right")
 
-    ax1.set_title("CO2 Intensity vs Fossil Fuel Share (1973-2024)", fontweight="bold")
+    first_year, last_year = int(df[time_col].min()), int(df[time_col].max())
+    ax1.set_title(f"CO2 Intensity vs Fossil Fuel Share ({first_year}-{last_year})", fontweight="bold")
     ax1.grid(True, alpha=0.3)
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     if save_path:
-        plt.savefig(save_path, dpi=150, bbox_inches="tight")
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
 
     return fig
 
 
+@instrument()
 def plot_correlation_matrix(
     df: pd.DataFrame,
     columns: List[str],
-    save_path: Optional[str] = None
-) -> plt.Figure:
+    save_path: Optional[str] = None,
+    dpi: int = 150
+) -> Figure:
     """
     Create correlation matrix heatmap.
 
@@ -142,15 +207,20 @@ def plot_correlation_matrix(
         Columns to include in correlation matrix
     save_path : Optional[str]
         Path to save figure
+    dpi : int
+        Resolution of the saved image
 
     Returns
     -------
-    plt.Figure
+    Figure
         Matplotlib figure object
     """
+    import seaborn as sns
+
     corr_matrix = df[columns].corr()
 
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig = new_figure((10, 8))
+    ax = fig.subplots()
     mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
 
     sns.heatmap(
@@ -162,25 +232,28 @@ def plot_correlation_matrix(
         center=0,
         square=True,
         linewidths=0.5,
-        cbar_kws={"shrink": 0.8}
+        cbar_kws={"shrink": 0.8},
+        ax=ax
     )
 
     ax.set_title("Correlation Matrix: Energy Structure and CO2 Intensity", fontweight="bold")
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     if save_path:
-        plt.savefig(save_path, dpi=150, bbox_inches="tight")
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
 
     return fig
 
 
+@instrument()
 def plot_scatter_with_regression(
     df: pd.DataFrame,
     x_cols: List[str],
     y_col: str,
-    save_path: Optional[str] = None
-) -> plt.Figure:
+    save_path: Optional[str] = None,
+    dpi: int = 150
+) -> Figure:
     """
     Create scatter plots with regression lines.
 
@@ -194,13 +267,18 @@ def plot_scatter_with_regression(
         Y-axis column
     save_path : Optional[str]
         Path to save figure
+    dpi : int
+        Resolution of the saved image
 
     Returns
     -------
-    plt.Figure
+    Figure
         Matplotlib figure object
     """
-    fig, axes = plt.subplots(1, len(x_cols), figsize=(5 * len(x_cols), 5))
+    from scipy import stats
+
+    fig = new_figure((5 * len(x_cols), 5))
+    axes = fig.subplots(1, len(x_cols))
 
     colors = ["#d62728", "#2ca02c", "#ff7f0e"]
     titles = ["Fossil Fuel Share", "Renewable Energy Share", "Nuclear Energy Share"]
@@ -225,19 +303,21 @@ def plot_scatter_with_regression(
         ax.set_title(f"{title} vs CO2 Intensity\nr = {r:.3f}", fontweight="bold")
         ax.grid(True, alpha=0.3)
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     if save_path:
-        plt.savefig(save_path, dpi=150, bbox_inches="tight")
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
 
     return fig
 
 
+@instrument()
 def plot_distributions(
     df: pd.DataFrame,
     columns: List[str],
-    save_path: Optional[str] = None
-) -> plt.Figure:
+    save_path: Optional[str] = None,
+    dpi: int = 150
+) -> Figure:
     """
     Create distribution plots with histograms and KDE.
 
@@ -249,16 +329,19 @@ def plot_distributions(
         Columns to plot
     save_path : Optional[str]
         Path to save figure
+    dpi : int
+        Resolution of the saved image
 
     Returns
     -------
-    plt.Figure
+    Figure
         Matplotlib figure object
     """
     n_cols = len(columns)
     n_rows = (n_cols + 1) // 2
 
-    fig, axes = plt.subplots(n_rows, 2, figsize=(12, 5 * n_rows))
+    fig = new_figure((12, 5 * n_rows))
+    axes = fig.subplots(n_rows, 2)
     axes = axes.flatten()
 
     colors = ["#1f77b4", "#d62728", "#2ca02c", "#ff7f0e"]
@@ -267,7 +350,7 @@ def plot_distributions(
         ax = axes[i]
 
         ax.hist(df[col], bins=15, color=color, alpha=0.7, edgecolor="black", density=True)
-        df[col].plot(kind="kde", ax=ax, color="black", linewidth=2)
+        plot_kde(ax, df[col], color="black", linewidth=2)
 
         mean = df[col].mean()
         skew = df[col].skew()
@@ -282,22 +365,337 @@ def plot_distributions(
     for i in range(len(columns), len(axes)):
         axes[i].set_visible(False)
 
-    plt.tight_layout()
+    fig.tight_layout()
+
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
+
+    return fig
+
+
+@instrument()
+def plot_energy_vs_co2(
+    df: pd.DataFrame,
+    save_path: Optional[str] = None,
+    time_col: str = "Year",
+    dpi: int = 150
+) -> Figure:
+    """
+    Create dual-axis chart of total energy consumption and total CO2 emissions.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data with Year, TotalEnergy, TotalCO2
+    save_path : Optional[str]
+        Path to save figure
+    time_col : str
+        Column for the x-axis ("Period" for monthly data)
+    dpi : int
+        Resolution of the saved image
+
+    Returns
+    -------
+    Figure
+        Matplotlib figure object
+    """
+    fig = new_figure((14, 7))
+    ax1 = fig.subplots()
+
+    # Total Energy
+    color1 = "#2ca02c"
+    ax1.plot(df[time_col], df["TotalEnergy"], color=color1, linewidth=2.5, label="Total Energy")
+    ax1.set_xlabel("Year")
+    ax1.set_ylabel("Total Energy (Quadrillion BTU)", color=color1)
+    ax1.tick_params(axis="y", labelcolor=color1)
+
+    # Total CO2 on secondary axis
+    ax2 = ax1.twinx()
+    color2 = "#d62728"
+    ax2.plot(df[time_col], df["TotalCO2"], color=color2, linewidth=2.5, label="Total CO2")
+    ax2.set_ylabel("Total CO2 (Million Metric Tons)", color=color2)
+    ax2.tick_params(axis="y", labelcolor=color2)
+
+    # Combine legends
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
+
+    first_year, last_year = int(df[time_col].min()), int(df[time_col].max())
+    ax1.set_title(f"Total Energy Consumption vs CO2 Emissions ({first_year}-{last_year})", fontweight="bold")
+    ax1.set_xlim(df[time_col].min(), df[time_col].max())
+    ax1.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
+
+    return fig
+
+
+@instrument()
+def plot_outliers(
+    df: pd.DataFrame,
+    columns: List[str],
+    save_path: Optional[str] = None,
+    dpi: int = 150
+) -> Figure:
+    """
+    Create box plots for outlier detection.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Data to plot
+    columns : List[str]
+        Columns to plot
+    save_path : Optional[str]
+        Path to save figure
+    dpi : int
+        Resolution of the saved image
+
+    Returns
+    -------
+    Figure
+        Matplotlib figure object
+    """
+    fig = new_figure((14, 5))
+    axes = fig.subplots(1, len(columns))
+    axes = np.atleast_1d(axes)
+
+    colors = ["#1f77b4", "#d62728", "#2ca02c", "#ff7f0e"]
+
+    for ax, col, color in zip(axes, columns, colors):
+        bp = ax.boxplot(df[col], patch_artist=True)
+        bp["boxes"][0].set_facecolor(color)
+        bp["boxes"][0].set_alpha(0.7)
+        ax.set_ylabel(col)
+        ax.set_title(f"{col}\nOutliers", fontweight="bold")
+        ax.set_xticklabels([""])
+
+    fig.suptitle("Outlier Detection using Box Plots", fontsize=14, fontweight="bold", y=1.02)
+    fig.tight_layout()
+
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
+
+    return fig
+
+
+@instrument()
+def plot_decision_tree(
+    model: Any,
+    feature_names: List[str],
+    save_path: Optional[str] = None,
+    dpi: int = 150
+) -> Figure:
+    """
+    Draw a fitted decision tree.
+
+    Parameters
+    ----------
+    model : DecisionTreeRegressor
+        Fitted tree
+    feature_names : List[str]
+        Names of the model features
+    save_path : Optional[str]
+        Path to save figure
+    dpi : int
+        Resolution of the saved image
+
+    Returns
+    -------
+    Figure
+        Matplotlib figure object
+    """
+    from sklearn.tree import plot_tree
+
+    fig = new_figure((20, 10))
+    ax = fig.subplots()
+
+    plot_tree(model, feature_names=feature_names, filled=True, rounded=True, fontsize=10, ax=ax)
+    ax.set_title("Decision Tree for CO2 Intensity Prediction", fontweight="bold")
+
+    fig.tight_layout()
+
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
+
+    return fig
+
+
+@instrument()
+def plot_model_comparison(
+    metrics: Dict[str, Dict[str, float]],
+    save_path: Optional[str] = None,
+    dpi: int = 150
+) -> Figure:
+    """
+    Create bar charts comparing R², RMSE and MAE across models.
+
+    Parameters
+    ----------
+    metrics : Dict[str, Dict[str, float]]
+        Metrics per model name (r2, rmse, mae)
+    save_path : Optional[str]
+        Path to save figure
+    dpi : int
+        Resolution of the saved image
+
+    Returns
+    -------
+    Figure
+        Matplotlib figure object
+    """
+    fig = new_figure((15, 5))
+    axes = fig.subplots(1, 3)
+
+    models = list(metrics)
+    panels = [("r2", "R² Score"), ("rmse", "RMSE"), ("mae", "MAE")]
+    colors = ["#1f77b4", "#2ca02c", "#ff7f0e"]
+
+    for ax, (key, label) in zip(axes, panels):
+        values = [metrics[model][key] for model in models]
+        bars = ax.bar(models, values, color=colors)
+        ax.set_ylabel(label)
+        ax.set_title(label, fontweight="bold")
+        ax.tick_params(axis="x", rotation=15)
+
+        # Add value labels on bars
+        for bar, val in zip(bars, values):
+            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.01,
+                    f"{val:.4f}", ha="center", va="bottom", fontsize=10)
+
+    fig.suptitle("Model Performance Comparison", fontsize=14, fontweight="bold", y=1.02)
+    fig.tight_layout()
 
     if save_path:
-        plt.savefig(save_path, dpi=150, bbox_inches="tight")
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
 
     return fig
 
 
+@instrument()
+def plot_actual_vs_predicted(
+    y_test: np.ndarray,
+    predictions: Dict[str, np.ndarray],
+    metrics: Dict[str, Dict[str, float]],
+    save_path: Optional[str] = None,
+    dpi: int = 150
+) -> Figure:
+    """
+    Create actual vs predicted scatter plots for each model.
+
+    Parameters
+    ----------
+    y_test : np.ndarray
+        Actual test values
+    predictions : Dict[str, np.ndarray]
+        Test predictions per model name
+    metrics : Dict[str, Dict[str, float]]
+        Metrics per model name (r2 is shown in the titles)
+    save_path : Optional[str]
+        Path to save figure
+    dpi : int
+        Resolution of the saved image
+
+    Returns
+    -------
+    Figure
+        Matplotlib figure object
+    """
+    fig = new_figure((5 * len(predictions), 5))
+    axes = np.atleast_1d(fig.subplots(1, len(predictions)))
+
+    for ax, (name, pred) in zip(axes, predictions.items()):
+        ax.scatter(y_test, pred, alpha=0.7, s=60)
+
+        # Perfect prediction line
+        min_val = min(y_test.min(), pred.min())
+        max_val = max(y_test.max(), pred.max())
+        ax.plot([min_val, max_val], [min_val, max_val], "r--", linewidth=2, label="Perfect Prediction")
+
+        ax.set_xlabel("Actual CO2 Intensity")
+        ax.set_ylabel("Predicted CO2 Intensity")
+        ax.set_title(f"{name}\nR² = {metrics[name]['r2']:.4f}", fontweight="bold")
+        ax.legend(loc="upper left")
+        ax.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
+
+    return fig
+
+
+@instrument()
+def plot_residual_analysis(
+    y_test: np.ndarray,
+    y_pred: np.ndarray,
+    save_path: Optional[str] = None,
+    dpi: int = 150
+) -> Figure:
+    """
+    Create residual distribution and residuals-vs-predicted plots.
+
+    Parameters
+    ----------
+    y_test : np.ndarray
+        Actual test values
+    y_pred : np.ndarray
+        Model predictions for the test values
+    save_path : Optional[str]
+        Path to save figure
+    dpi : int
+        Resolution of the saved image
+
+    Returns
+    -------
+    Figure
+        Matplotlib figure object
+    """
+    residuals = y_test - y_pred
+
+    fig = new_figure((12, 5))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    # Residual distribution
+    ax1.hist(residuals, bins=10, edgecolor="black", alpha=0.7, color="steelblue")
+    ax1.axvline(0, color="red", linestyle="--", linewidth=2)
+    ax1.set_xlabel("Residual")
+    ax1.set_ylabel("Frequency")
+    ax1.set_title("Residual Distribution", fontweight="bold")
+
+    # Residuals vs Predicted
+    ax2.scatter(y_pred, residuals, alpha=0.7, s=60)
+    ax2.axhline(0, color="red", linestyle="--", linewidth=2)
+    ax2.set_xlabel("Predicted CO2 Intensity")
+    ax2.set_ylabel("Residual")
+    ax2.set_title("Residuals vs Predicted", fontweight="bold")
+    ax2.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+
+    if save_path:
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
+
+    return fig
+
+
+@instrument()
 def plot_final_summary(
     df: pd.DataFrame,
     y_pred: np.ndarray,
     r2: float,
-    save_path: Optional[str] = None
-) -> plt.Figure:
+    save_path: Optional[str] = None,
+    time_col: str = "Year",
+    dpi: int = 150,
+    break_dates: Optional[List[float]] = None
+) -> Figure:
     """
-    Create final summary plot with actual vs predicted and structural break.
+    Create final summary plot with actual vs predicted and structural breaks.
 
     Parameters
     ----------
@@ -309,39 +707,67 @@ def plot_final_summary(
         R-squared score
     save_path : Optional[str]
         Path to save figure
+    time_col : str
+        Column for the x-axis ("Period" for monthly data)
+    dpi : int
+        Resolution of the saved image
+    break_dates : Optional[List[float]]
+        Detected structural break dates (see detect_structural_breaks);
+        the regime after the last break is highlighted
 
     Returns
     -------
-    plt.Figure
+    Figure
         Matplotlib figure object
     """
-    fig, ax = plt.subplots(figsize=(14, 7))
+    fig = new_figure((14, 7))
+    ax = fig.subplots()
 
-    ax.plot(df["Year"], df["CO2Intensity"], "b-", linewidth=2.5, marker="o", markersize=4, label="Actual CO2 Intensity")
-    ax.plot(df["Year"], y_pred, "g--", linewidth=2, label=f"Model Prediction (R²={r2:.3f})")
+    marker = "o" if time_col == "Year" else None
+    ax.plot(df[time_col], df["CO2Intensity"], "b-", linewidth=2.5, marker=marker, markersize=4, label="Actual CO2 Intensity")
+    ax.plot(df[time_col], y_pred, "g--", linewidth=2, label=f"Model Prediction (R²={r2:.3f})")
 
-    # Highlight structural break period
-    ax.axvspan(2014, 2024, alpha=0.2, color="yellow", label="Accelerated Decline Period")
-    ax.axvline(2014, color="orange", linestyle=":", linewidth=2)
+    # Highlight detected structural breaks and the latest regime
+    if break_dates:
+        ax.axvspan(break_dates[-1], df[time_col].max(), alpha=0.2, color="yellow",
+                   label=f"Latest Regime (since {int(break_dates[-1])})")
+        for date in break_dates:
+            ax.axvline(date, color="orange", linestyle=":", linewidth=2)
 
+    first_year, last_year = int(df[time_col].min()), int(df[time_col].max())
     ax.set_xlabel("Year")
     ax.set_ylabel("CO2 Intensity (MMT CO2 / Quad BTU)")
-    ax.set_title("US CO2 Emission Intensity: 52-Year Trend Analysis (1973-2024)", fontweight="bold")
+    ax.set_title(
+        f"US CO2 Emission Intensity: {last_year - first_year + 1}-Year Trend Analysis ({first_year}-{last_year})",
+        fontweight="bold"
+    )
     ax.legend(loc="upper right")
     ax.grid(True, alpha=0.3)
-    ax.set_xlim(1973, 2024)
+    ax.set_xlim(df[time_col].min(), df[time_col].max())
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     if save_path:
-        plt.savefig(save_path, dpi=150, bbox_inches="tight")
+        fig.savefig(save_path, dpi=dpi, bbox_inches="tight")
 
     return fig
 
 
-def generate_all_figures(df: pd.DataFrame, output_dir: str = "outputs/figures"):
+def figure_filename(stem: str, granularity: str = "annual") -> str:
+    """Return the PNG file name for a figure; monthly figures get a suffix."""
+    suffix = "_monthly" if granularity == "monthly" else ""
+    return f"{stem}{suffix}.png"
+
+
+def figure_tasks(
+    df: pd.DataFrame,
+    output_dir: str = "outputs/figures",
+    granularity: str = "annual",
+    dpi: int = 150,
+    results: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
     """
-    Generate all figures for the analysis.
+    List the figures to render as picklable tasks.
 
     Parameters
     ----------
@@ -349,43 +775,230 @@ def generate_all_figures(df: pd.DataFrame, output_dir: str = "outputs/figures"):
         Prepared dataset
     output_dir : str
         Directory to save figures
+    granularity : str
+        "annual" or "monthly"
+    dpi : int
+        Resolution of the saved images
+    results : Optional[Dict[str, Any]]
+        Output of run_full_analysis; adds the model figures (fig8-fig12)
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        Tasks with name, function, args, kwargs and save_path
     """
-    set_plot_style()
     output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+    time_col = "Period" if granularity == "monthly" else "Year"
+    share_cols = ["FossilShare", "RenewableShare", "NuclearShare"]
+    dist_cols = ["CO2Intensity"] + share_cols
+    corr_cols = ["CO2Intensity", "FossilShare", "RenewableShare", "NuclearShare", "TotalEnergy", "TotalCO2"]
 
-    print("Generating visualizations...")
+    specs = [
+        ("fig1_energy_structure", plot_energy_structure, (df[[time_col] + share_cols],), {"time_col": time_col}),
+        ("fig2_co2_intensity_trend", plot_co2_intensity_trend,
+         (df[[col for col in (time_col, "CO2Intensity", "FossilShare", "CO2Intensity12M") if col in df.columns]],),
+         {"time_col": time_col}),
+        ("fig3_energy_vs_co2", plot_energy_vs_co2, (df[[time_col, "TotalEnergy", "TotalCO2"]],), {"time_col": time_col}),
+        ("fig4_correlation_matrix", plot_correlation_matrix, (df[corr_cols], corr_cols), {}),
+        ("fig5_scatter_shares_vs_intensity", plot_scatter_with_regression,
+         (df[share_cols + ["CO2Intensity"]], share_cols, "CO2Intensity"), {}),
+        ("fig6_distributions", plot_distributions, (df[dist_cols], dist_cols), {}),
+        ("fig7_outliers", plot_outliers, (df[dist_cols], dist_cols), {})
+    ]
+
+    if results is not None:
+        comparison = results["model_comparison"]
+        scaled_name = "Full LR (With Scaling)"
+        break_dates = [float(date) for date in results["structural_breaks"]["break_dates"]]
+        specs += [
+            ("fig8_decision_tree", plot_decision_tree,
+             (comparison["decision_tree"], comparison["features"]), {}),
+            ("fig9_model_comparison", plot_model_comparison, (comparison["metrics"],), {}),
+            ("fig10_actual_vs_predicted", plot_actual_vs_predicted,
+             (comparison["y_test"], comparison["predictions"], comparison["metrics"]), {}),
+            ("fig11_residual_analysis", plot_residual_analysis,
+             (comparison["y_test"], comparison["predictions"][scaled_name]), {}),
+            ("fig12_final_summary", plot_final_summary,
+             (df[[time_col, "CO2Intensity"]], results["full_model"]["predictions"],
+              results["full_model"]["metrics"]["r2"]),
+             {"time_col": time_col, "break_dates": break_dates})
+        ]
+
+    tasks = []
+    for stem, func, args, kwargs in specs:
+        name = figure_filename(stem, granularity)
+        tasks.append({
+            "name": name,
+            "function": func,
+            "args": args,
+            "kwargs": {**kwargs, "dpi": dpi},
+            "save_path": str(output_path / name)
+        })
+
+    return tasks
+
+
+def style_params() -> Dict[str, str]:
+    """Return the rcParams set by set_plot_style, without changing the global style."""
+    with matplotlib.rc_context():
+        set_plot_style()
+        return {key: repr(value) for key, value in matplotlib.rcParams.items()}
+
+
+def figure_fingerprint(task: Dict[str, Any], style: Optional[Dict[str, str]] = None) -> str:
+    """
+    Hash everything a figure task's image depends on.
 
-    # Fig 1: Energy Structure
-    plot_energy_structure(df, output_path / "fig1_energy_structure.png")
-    print("  fig1_energy_structure.png")
+    Covers the data slice and parameters passed to the plot function, the
+    source of the function and of the project modules it reaches (see
+    pipeline.code_fingerprint, so edits to shared helpers re-render it),
+    the plot style rcParams and the matplotlib version.
 
-    # Fig 2: CO2 Intensity Trend
-    plot_co2_intensity_trend(df, output_path / "fig2_co2_intensity_trend.png")
-    print("  fig2_co2_intensity_trend.png")
+    Parameters
+    ----------
+    task : Dict[str, Any]
+        Task from figure_tasks
+    style : Optional[Dict[str, str]]
+        Output of style_params (computed if None)
 
-    # Fig 4: Correlation Matrix
-    corr_cols = ["CO2Intensity", "FossilShare", "RenewableShare", "NuclearShare", "TotalEnergy", "TotalCO2"]
-    plot_correlation_matrix(df, corr_cols, output_path / "fig4_correlation_matrix.png")
-    print("  fig4_correlation_matrix.png")
+    Returns
+    -------
+    str
+        Hex SHA-256 digest
+    """
+    func = task["function"]
+    return fingerprint_object({
+        "function": f"{func.__module__}.{func.__qualname__}",
+        "code": code_fingerprint(func),
+        "args": task["args"],
+        "kwargs": task["kwargs"],
+        "style": style if style is not None else style_params(),
+        "matplotlib": matplotlib.__version__
+    })
+
+
+def fingerprint_path(save_path: str) -> Path:
+    """Return the fingerprint file stored next to a figure."""
+    path = Path(save_path)
+    return path.with_name(path.name + FINGERPRINT_SUFFIX)
+
+
+def figure_is_current(task: Dict[str, Any]) -> bool:
+    """Check whether a task's image exists and was rendered from the same fingerprint."""
+    stored = fingerprint_path(task["save_path"])
+    if not Path(task["save_path"]).exists() or not stored.exists():
+        return False
+    return stored.read_text().strip() == task["fingerprint"]
+
+
+def render_figure(task: Dict[str, Any]) -> str:
+    """
+    Render one figure task (see figure_tasks) and return its file name.
+
+    The plot style is applied inside the call, so the image does not depend
+    on rcParams left over in the rendering process. If the task carries a
+    fingerprint it is written next to the image once the image is saved.
+    """
+    set_plot_style()
+    task["function"](*task["args"], save_path=task["save_path"], **task["kwargs"])
+    if task.get("fingerprint"):
+        fingerprint_path(task["save_path"]).write_text(task["fingerprint"] + "\n")
+    return task["name"]
+
+
+def render_figures(tasks: List[Dict[str, Any]], workers: int = 1, force: bool = False) -> Dict[str, str]:
+    """
+    Render figure tasks, skipping those whose image is already up to date.
+
+    Each task is fingerprinted (see figure_fingerprint); a task is skipped
+    when its PNG exists and the fingerprint stored next to it matches.
+    The remaining tasks run in parallel processes when workers > 1.
+
+    Parameters
+    ----------
+    tasks : List[Dict[str, Any]]
+        Tasks from figure_tasks
+    workers : int
+        Number of worker processes (1 renders in this process)
+    force : bool
+        Render every task regardless of stored fingerprints
+
+    Returns
+    -------
+    Dict[str, str]
+        Status ("rendered" or "unchanged") of each figure, in task order
+    """
+    style = style_params()
+    tasks = [{**task, "fingerprint": figure_fingerprint(task, style)} for task in tasks]
+    pending = [task for task in tasks if force or not figure_is_current(task)]
+
+    if workers <= 1 or len(pending) <= 1:
+        rendered = [render_figure(task) for task in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            rendered = list(pool.map(render_figure, pending))
+
+    return {task["name"]: "rendered" if task["name"] in rendered else "unchanged" for task in tasks}
+
+
+def generate_all_figures(
+    df: pd.DataFrame,
+    output_dir: str = "outputs/figures",
+    granularity: str = "annual",
+    dpi: int = 150,
+    results: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+    force: bool = False
+) -> List[str]:
+    """
+    Generate all figures for the analysis.
+
+    Figures whose data, parameters and style are unchanged since they were
+    last rendered are left as they are (see render_figures).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Prepared dataset
+    output_dir : str
+        Directory to save figures
+    granularity : str
+        "annual" or "monthly"; monthly figures are plotted against the
+        fractional-year Period column and saved as fig*_monthly.png
+    dpi : int
+        Resolution of the saved images
+    results : Optional[Dict[str, Any]]
+        Output of run_full_analysis; when given, the model figures
+        (fig8-fig12) are rendered as well
+    workers : int
+        Number of processes rendering figures in parallel
+    force : bool
+        Re-render every figure even if it is up to date
+
+    Returns
+    -------
+    List[str]
+        File names of all figures, rendered or unchanged
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    print("Generating visualizations...")
 
-    # Fig 5: Scatter plots
-    plot_scatter_with_regression(df, ["FossilShare", "RenewableShare", "NuclearShare"], "CO2Intensity",
-                                  output_path / "fig5_scatter_shares_vs_intensity.png")
-    print("  fig5_scatter_shares_vs_intensity.png")
+    tasks = figure_tasks(df, output_dir, granularity, dpi, results)
+    status = render_figures(tasks, workers, force)
+    for name, state in status.items():
+        print(f"  {name}" + (" (unchanged)" if state == "unchanged" else ""))
 
-    # Fig 6: Distributions
-    plot_distributions(df, ["CO2Intensity", "FossilShare", "RenewableShare", "NuclearShare"],
-                       output_path / "fig6_distributions.png")
-    print("  fig6_distributions.png")
+    rendered = sum(state == "rendered" for state in status.values())
+    print(f"All visualizations generated! ({rendered} rendered, {len(status) - rendered} unchanged)")
 
-    plt.close("all")
-    print("All visualizations generated!")
+    return list(status)
 
 
 if __name__ == "__main__":
-    from data_loader import load_raw_data
-    from data_preparation import prepare_full_dataset
+    from .data_loader import load_raw_data
+    from .data_preparation import prepare_full_dataset
 
     # Load and prepare data
     energy_df, co2_df = load_raw_data()